@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Session file downloads with validators, conditional GET and byte ranges.
+
+Each file gets a strong ETag from the SHA-256 of its contents (remembered per
+path, size and mtime, so a file is hashed once rather than on every request).
+If-None-Match answers 304, a single "bytes=" Range answers 206 (If-Range is
+honoured; multi-range requests get the whole file), and Cache-Control makes
+clients revalidate, or reuse the file for LCBO_DOWNLOAD_MAX_AGE seconds.
+"""
+
+import asyncio
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from urllib.parse import quote
+
+from fastapi import Request, Response
+from fastapi.responses import FileResponse, StreamingResponse
+
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+DOWNLOAD_MAX_AGE = int(os.getenv("LCBO_DOWNLOAD_MAX_AGE", "0"))
+# Outputs keep their names when a step is re-run in the same session, so by default clients revalidate.
+CACHE_CONTROL = f"private, max-age={DOWNLOAD_MAX_AGE}" if DOWNLOAD_MAX_AGE > 0 else "private, no-cache"
+
+
+class RangeNotSatisfiable(Exception):
+    pass
+
+
+class FileDigests:
+    """Bounded map of (path, size, mtime) to the file's SHA-256."""
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._digests: OrderedDict[tuple, str] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def digest(self, path: Path, stat: os.stat_result) -> str:
+        key = (str(path), stat.st_size, stat.st_mtime_ns)
+        with self._lock:
+            digest = self._digests.get(key)
+            if digest is not None:
+                self._digests.move_to_end(key)
+                return digest
+
+        sha256 = hashlib.sha256()
+        with open(path, 'rb') as file:
+            for chunk in iter(lambda: file.read(1024 * 1024), b''):
+                sha256.update(chunk)
+        digest = sha256.hexdigest()
+
+        with self._lock:
+            self._digests[key] = digest
+            while len(self._digests) > self.max_entries:
+                self._digests.popitem(last=False)
+        return digest
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    """If-None-Match uses weak comparison: W/ prefixes are ignored."""
+    if header.strip() == '*':
+        return True
+    return any(candidate.strip().removeprefix('W/') == etag for candidate in header.split(','))
+
+
+def parse_range(header: str, size: int) -> tuple[int, int] | None:
+    """Return (start, stop) for a single "bytes=" range, or None to send the whole file.
+
+    Raises RangeNotSatisfiable when the range starts past the end of the file.
+    """
+    unit, _, spec = header.partition('=')
+    first, dash, last = spec.strip().partition('-')
+    if unit.strip().lower() != 'bytes' or ',' in spec or not dash:
+        return None
+    if (first and not first.isdigit()) or (last and not last.isdigit()) or not (first or last):
+        return None
+    if size == 0:
+        raise RangeNotSatisfiable()
+
+    if not first:
+        # Suffix range: the last N bytes.
+        length = int(last)
+        if length == 0:
+            raise RangeNotSatisfiable()
+        return max(0, size - length), size
+
+    start = int(first)
+    stop = int(last) + 1 if last else size
+    if last and stop <= start:
+        return None
+    if start >= size:
+        raise RangeNotSatisfiable()
+    return start, min(stop, size)
+
+
+def _iter_file_range(path: Path, start: int, stop: int):
+    with open(path, 'rb') as file:
+        file.seek(start)
+        remaining = stop - start
+        while remaining > 0:
+            chunk = file.read(min(DOWNLOAD_CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+
+def _content_disposition(filename: str) -> str:
+    quoted = quote(filename)
+    if quoted != filename:
+        return f"attachment; filename*=utf-8''{quoted}"
+    return f'attachment; filename="{filename}"'
+
+
+async def file_response(request: Request, path: Path, filename: str, media_type: str, digests: FileDigests):
+    """Serve path with a strong ETag, answering conditional and Range requests."""
+    stat = await asyncio.to_thread(os.stat, path)
+    etag = f'"{await asyncio.to_thread(digests.digest, path, stat)}"'
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL, "Accept-Ranges": "bytes"}
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None and _etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+
+    range_header = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    if range_header and (if_range is None or if_range.strip() == etag):
+        try:
+            byte_range = parse_range(range_header, stat.st_size)
+        except RangeNotSatisfiable:
+            return Response(status_code=416, headers={**headers, "Content-Range": f"bytes */{stat.st_size}"})
+        if byte_range is not None:
+            start, stop = byte_range
+            return StreamingResponse(
+                _iter_file_range(path, start, stop),
+                status_code=206,
+                media_type=media_type,
+                headers={
+                    **headers,
+                    "Content-Range": f"bytes {start}-{stop - 1}/{stat.st_size}",
+                    "Content-Length": str(stop - start),
+                    "Content-Disposition": _content_disposition(filename),
+                },
+            )
+
+    return FileResponse(path=path, filename=filename, media_type=media_type, headers=headers, stat_result=stat)
@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""
+In-process job queue for long-running document work.
+
+A request saves its uploads, submits a Job and gets its id back straight away;
+a fixed number of runner tasks take jobs off an asyncio.Queue and run them,
+with the CPU-bound parsing still done in the worker pool. Jobs report
+per-file progress and output names while they run and can be cancelled.
+Each job also collects its stage timings (queue wait, cache, worker spans).
+No external broker is involved, so job state lives only as long as the process.
+"""
+
+import asyncio
+import os
+import shutil
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime, timezone
+from pathlib import Path
+
+from fastapi import HTTPException
+
+import metrics
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+FINISHED_STATUSES = {DONE, FAILED, CANCELLED}
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+class Job:
+    """One queued unit of work with per-file progress."""
+
+    def __init__(self, kind: str, session_id: str, file_names: list[str], run, args: tuple, cleanup_dir: Path | None):
+        self.id = str(uuid.uuid4())
+        self.kind = kind
+        self.session_id = session_id
+        self.status = QUEUED
+        self.files = [{"file": name, "status": QUEUED} for name in file_names]
+        self.outputs: list[str] = []
+        self.result = None
+        self.error: str | None = None
+        self.created_at = _now()
+        self.started_at: str | None = None
+        self.finished_at: str | None = None
+        self.timings = metrics.SpanRecorder()
+
+        self._run = run
+        self._args = args
+        # Removed when the job fails or is cancelled (sessions the job's request created).
+        self._cleanup_dir = cleanup_dir
+        self._exception: BaseException | None = None
+        self._task: asyncio.Task | None = None
+        self._finished = asyncio.Event()
+        self._listeners: list[asyncio.Queue] = []
+        self._submitted = time.perf_counter()
+
+    def file_started(self, index: int) -> None:
+        self.files[index]["status"] = RUNNING
+
+    def file_done(self, index: int, outputs: list[str] | None = None, result: dict | None = None) -> None:
+        self.files[index]["status"] = DONE
+        self.files[index]["outputs"] = list(outputs or [])
+        if result is not None:
+            self.files[index]["result"] = result
+        self.outputs.extend(outputs or [])
+        self._publish(index)
+
+    def file_failed(self, index: int, error: str, result: dict | None = None) -> None:
+        self.files[index]["status"] = FAILED
+        self.files[index]["error"] = error
+        if result is not None:
+            self.files[index]["result"] = result
+        self._publish(index)
+
+    def _publish(self, index: int | None) -> None:
+        for listener in self._listeners:
+            listener.put_nowait(index)
+
+    async def file_updates(self):
+        """Yield the index of each file as it finishes, in completion order, until the job ends.
+
+        Files that finished before the call are yielded first.
+        """
+        finished = [index for index, entry in enumerate(self.files) if entry["status"] in (DONE, FAILED)]
+        if self._finished.is_set():
+            for index in finished:
+                yield index
+            return
+
+        listener = asyncio.Queue()
+        self._listeners.append(listener)
+        try:
+            for index in finished:
+                yield index
+            while (index := await listener.get()) is not None:
+                yield index
+        finally:
+            self._listeners.remove(listener)
+
+    def add_outputs(self, outputs: list[str]) -> None:
+        """Record outputs that belong to the job as a whole, like a combined CSV."""
+        self.outputs.extend(outputs)
+
+    def to_dict(self) -> dict:
+        finished_files = sum(1 for entry in self.files if entry["status"] in FINISHED_STATUSES)
+        return {
+            "job_id": self.id,
+            "kind": self.kind,
+            "session_id": self.session_id,
+            "status": self.status,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "progress": {"files_total": len(self.files), "files_finished": finished_files},
+            "files": self.files,
+            "outputs": self.outputs,
+            "result": self.result,
+            "error": self.error,
+            "timings": self.timings.to_payload(),
+        }
+
+
+class JobManager:
+    """Queue jobs and run a bounded number of them at a time on the event loop."""
+
+    def __init__(self, concurrency: int | None = None, max_finished_jobs: int | None = None, on_finish=None):
+        if concurrency is None:
+            concurrency = int(os.getenv("LCBO_JOB_CONCURRENCY", "4"))
+        if max_finished_jobs is None:
+            max_finished_jobs = int(os.getenv("LCBO_JOB_HISTORY", "500"))
+
+        self.concurrency = max(1, concurrency)
+        self.max_finished_jobs = max(0, max_finished_jobs)
+        # Called with each job and its final status once it stops running, before waiters
+        # are woken (may block).
+        self._on_finish = on_finish
+        self._jobs: OrderedDict[str, Job] = OrderedDict()
+        self._queue: asyncio.Queue | None = None
+        self._runners: list[asyncio.Task] = []
+
+    def start(self) -> None:
+        self._queue = asyncio.Queue()
+        self._runners = [asyncio.create_task(self._runner()) for _ in range(self.concurrency)]
+
+    async def shutdown(self) -> None:
+        for runner in self._runners:
+            runner.cancel()
+        await asyncio.gather(*self._runners, return_exceptions=True)
+        self._runners = []
+
+    def submit(self, kind: str, session_id: str, file_names: list[str], run, *args, cleanup_dir: Path | None = None) -> Job:
+        """Queue run(job, *args) and return the job without waiting for it."""
+        job = Job(kind, session_id, file_names, run, args, cleanup_dir)
+        self._jobs[job.id] = job
+        self._queue.put_nowait(job)
+        return job
+
+    def get(self, job_id: str) -> Job | None:
+        return self._jobs.get(job_id)
+
+    def active_session_ids(self) -> set[str]:
+        """Sessions with a queued or running job."""
+        return {job.session_id for job in list(self._jobs.values()) if job.status not in FINISHED_STATUSES}
+
+    def stats(self) -> dict:
+        """Number of known jobs per status."""
+        counts = {status: 0 for status in (QUEUED, RUNNING, DONE, FAILED, CANCELLED)}
+        for job in list(self._jobs.values()):
+            counts[job.status] += 1
+        return counts
+
+    async def cancel(self, job_id: str) -> Job | None:
+        """Cancel a queued or running job; finished jobs are left as they are."""
+        job = self._jobs.get(job_id)
+        if job is None or job.status in FINISHED_STATUSES:
+            return job
+        if job.status == QUEUED:
+            # The runner skips it when it comes off the queue, including while the cleanup runs.
+            job.status = CANCELLED
+            if job._cleanup_dir is not None:
+                await asyncio.to_thread(shutil.rmtree, job._cleanup_dir, True)
+            if self._on_finish is not None:
+                await asyncio.to_thread(self._on_finish, job, CANCELLED)
+            self._finish(job, CANCELLED)
+        elif job._task is not None:
+            job._task.cancel()
+        return job
+
+    async def wait(self, job: Job):
+        """Wait for a job and return its result, re-raising whatever it failed with."""
+        await job._finished.wait()
+        if job.status == CANCELLED:
+            raise HTTPException(status_code=409, detail=f"Job {job.id} was cancelled")
+        if job._exception is not None:
+            raise job._exception
+        return job.result
+
+    async def _runner(self) -> None:
+        while True:
+            job = await self._queue.get()
+            if job.status != QUEUED:
+                continue
+
+            job.status = RUNNING
+            job.started_at = _now()
+            job.timings.add("queue", time.perf_counter() - job._submitted)
+            job._task = asyncio.create_task(job._run(job, *job._args))
+            try:
+                await asyncio.wait({job._task})
+            except asyncio.CancelledError:
+                job._task.cancel()
+                raise
+
+            if job._task.cancelled():
+                status = CANCELLED
+            elif job._task.exception() is not None:
+                status = FAILED
+                job._exception = job._task.exception()
+                job.error = getattr(job._exception, "detail", None) or str(job._exception)
+            else:
+                status = DONE
+                job.result = job._task.result()
+
+            if status != DONE and job._cleanup_dir is not None:
+                await asyncio.to_thread(shutil.rmtree, job._cleanup_dir, True)
+            if self._on_finish is not None:
+                await asyncio.to_thread(self._on_finish, job, status)
+            self._finish(job, status)
+
+    def _finish(self, job: Job, status: str) -> None:
+        job.status = status
+        job.finished_at = _now()
+        for entry in job.files:
+            if entry["status"] in (QUEUED, RUNNING):
+                entry["status"] = CANCELLED if status == CANCELLED else FAILED
+        job._finished.set()
+        job._publish(None)
+        self._trim_history()
+
+    def _trim_history(self) -> None:
+        finished = [job_id for job_id, job in self._jobs.items() if job.status in FINISHED_STATUSES]
+        for job_id in finished[:max(0, len(finished) - self.max_finished_jobs)]:
+            del self._jobs[job_id]
@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+Shared line lexer for the LCBO document parsers.
+
+Each extracted text line is classified once into a LineToken using
+precompiled, combined patterns with named groups. The invoice, Quick Order
+and PLU parsers consume these tokens instead of re-running inline regexes
+and substring scans on every line (and again from their lookback windows).
+"""
+
+import re
+
+# Token kinds
+NOISE = 'noise'
+TEXT = 'text'
+FULFILLED_BY = 'fulfilled_by'
+LCBO_NUMBER = 'lcbo_number'
+QTY = 'qty'
+WHOLESALE_PRICE = 'wholesale_price'
+UNITS = 'units'
+SKU_NOT_FOUND = 'sku_not_found'
+QUICK_ORDER_ITEM = 'quick_order_item'
+PLU_ROW_START = 'plu_row_start'
+SECTION_HEADING = 'section_heading'
+
+# Every marker the invoice and Quick Order layouts use, found in a single scan.
+# The outer named group of each alternative is the marker name (match.lastgroup).
+_MARKER_RE = re.compile(
+    r"""
+      (?P<fulfilled_by>Fulfilled\s+by:)
+    | (?P<lcbo>LCBO\#:(?:\s*(?P<lcbo_number>\d+)(?P<lcbo_boundary>\b)?)?)
+    | (?P<qty>Qty\.\s*Ordered:\s*(?P<qty_ordered>\d+)(?:\s*\|\s*Fulfilled:\s*(?P<qty_fulfilled>\d+))?)
+    | (?P<wholesale>Wholesale\s+price:(?:\s*\$(?P<wholesale_price>[\d,]+(?:\.\d{2})?))?)
+    | (?P<units>\{\s*(?P<units_count>\d+)\s+units\s*\})
+    | (?P<sku_not_found>sku\ was\ not\ found)
+    """,
+    re.IGNORECASE | re.VERBOSE,
+)
+
+_FULFILLMENT_METHOD_RE = re.compile(r'\s+Fulfillment\s+method\s*:.*$', re.IGNORECASE)
+
+INVOICE_NOISE_TOKENS = (
+    'purchasable only by case',
+    'qty. ordered:',
+    'estimated delivery date',
+    'in progress',
+    'unfulfilled',
+    'complete',
+    'fulfilled by:',
+    'fulfillment method:',
+    'order total:',
+    'order information',
+    'delivery option',
+    'delivery address',
+    'billing address',
+    'payment method',
+    'lcbo information',
+    'how the wholesale price is calculated',
+    'status:',
+    'date:',
+    'order #',
+    'print order',
+    'items ordered',
+)
+# Matched against the lowercased line; a case-sensitive alternation is much cheaper than IGNORECASE.
+_INVOICE_NOISE_TOKEN_RE = re.compile('|'.join(re.escape(token) for token in INVOICE_NOISE_TOKENS))
+
+# Whole-line noise: pure money amounts and standalone dates like "April 15, 2026".
+_INVOICE_NOISE_LINE_RE = re.compile(
+    r'\$[\d,]+(?:\.\d{2})?'
+    r'|(?:january|february|march|april|may|june|july|august|september|october|november|december)\s+\d{1,2},\s+\d{4}',
+    re.IGNORECASE,
+)
+
+_QUICK_ORDER_ITEM_RE = re.compile(r'(?P<item>\d+)\s+(?P<qty>\d+)\s+Remove')
+
+# PLU list lines: page furniture, section headings ("10 WINE") and row starts (12-14 digit PLU).
+_PLU_LINE_RE = re.compile(
+    r"""
+      (?P<noise>(?i:
+          plu\ list\ with\ cost\ and\ active\ price
+        | printed:
+        | item\ group:
+        | price\ group:
+        | cost\ group:
+        | from\ plu:
+        | \#\ description\ vendor\ sku
+        | new\ dundee\ village\ market
+        | \d+\s*/\s*\d+\Z
+        | page\s*\d+\s*/\s*\d+\Z
+        | \(\d{3}\)\s*\d{3}-\d{4}\Z
+      ))
+    | (?P<section_heading>\d{1,2}\s+[A-Z][A-Z0-9\s&\-/]+\Z)
+    | (?P<plu_row_start>\d{12,14}\b)
+    """,
+    re.VERBOSE,
+)
+
+PLU_ROW_RE = re.compile(
+    r'^(?P<plu>\d{12,14})\s+(?P<body>.+?)\s+\$(?P<price>\d[\d,]*\.\d{2})\s+\$(?P<cost>\d[\d,]*\.\d{2})'
+    r'\s+\$(?P<profit>\d[\d,]*\.\d{2})\s+(?P<profit_percent>-?\d+(?:\.\d+)?)$'
+)
+VENDOR_SKU_RE = re.compile(r'\d{5,6}')
+_WHITESPACE_RE = re.compile(r'\s+')
+# Wrapped profit percentages like "10. 01".
+_WRAPPED_DECIMAL_RE = re.compile(r'(\d)\.\s+(\d{1,2})(?=\s|$)')
+
+
+class LineToken:
+    """One classified line: its kind, text, marker matches and kind-specific value.
+
+    markers maps each marker name found on the line to its matches, in line order.
+    """
+
+    __slots__ = ('kind', 'text', 'markers', 'noise', 'value')
+
+    def __init__(self, kind, text, markers=None, noise=False, value=None):
+        self.kind = kind
+        self.text = text
+        self.markers = markers or {}
+        self.noise = noise
+        self.value = value
+
+    def first(self, marker, *required):
+        """Return the first match of marker whose required groups all matched, or None."""
+        for match in self.markers.get(marker, ()):
+            if all(match.group(name) is not None for name in required):
+                return match
+        return None
+
+    def group(self, marker, name):
+        """Return a named group of the first match of marker that has it, or None."""
+        match = self.first(marker, name)
+        return match.group(name) if match else None
+
+    def __repr__(self):
+        return f'LineToken({self.kind!r}, {self.text!r})'
+
+
+def _scan_markers(text):
+    markers = {}
+    for match in _MARKER_RE.finditer(text):
+        markers.setdefault(match.lastgroup, []).append(match)
+    return markers
+
+
+def fulfilled_by_label(text, match):
+    """Return the supplier label after a 'Fulfilled by:' marker, without fulfillment details."""
+    return _FULFILLMENT_METHOD_RE.sub('', text[match.end():].strip()).strip()
+
+
+def is_invoice_noise(text):
+    """True for blank lines and lines that never belong to a web-style invoice description."""
+    stripped = text.strip()
+    if not stripped:
+        return True
+    return bool(_INVOICE_NOISE_LINE_RE.fullmatch(stripped) or _INVOICE_NOISE_TOKEN_RE.search(stripped.lower()))
+
+
+def lex_invoice_line(line):
+    """Classify a stripped line of a web-style invoice."""
+    markers = _scan_markers(line)
+    noise = is_invoice_noise(line)
+
+    token = LineToken(NOISE if noise else TEXT, line, markers, noise)
+
+    if 'fulfilled_by' in markers:
+        label = fulfilled_by_label(line, markers['fulfilled_by'][0])
+        if label:
+            token.kind, token.value = FULFILLED_BY, label
+            return token
+
+    # Invoice product numbers must end on a word boundary ("LCBO#: 123 750 mL").
+    lcbo_match = token.first('lcbo', 'lcbo_number', 'lcbo_boundary')
+    if lcbo_match:
+        token.kind, token.value = LCBO_NUMBER, lcbo_match
+        return token
+
+    for kind, marker in ((QTY, 'qty'), (UNITS, 'units'), (WHOLESALE_PRICE, 'wholesale')):
+        if marker in markers:
+            token.kind = kind
+            return token
+
+    return token
+
+
+def lex_quick_order_line(line):
+    """Classify a stripped line of a Quick Order, in the parser's precedence order."""
+    item_match = _QUICK_ORDER_ITEM_RE.fullmatch(line)
+    if item_match:
+        return LineToken(QUICK_ORDER_ITEM, line, value=(item_match.group('item'), int(item_match.group('qty'))))
+
+    token = LineToken(TEXT, line, _scan_markers(line))
+    if 'sku_not_found' in token.markers:
+        token.kind = SKU_NOT_FOUND
+    elif token.group('wholesale', 'wholesale_price') is not None:
+        token.kind, token.value = WHOLESALE_PRICE, token.group('wholesale', 'wholesale_price')
+    elif token.group('lcbo', 'lcbo_number') is not None:
+        token.kind, token.value = LCBO_NUMBER, token.group('lcbo', 'lcbo_number')
+    elif 'units' in token.markers:
+        token.kind, token.value = UNITS, int(token.group('units', 'units_count'))
+    return token
+
+
+def lex_plu_line(line):
+    """Classify a stripped line of a PLU list."""
+    if not line:
+        return LineToken(NOISE, line, noise=True)
+
+    match = _PLU_LINE_RE.match(line)
+    if match is None:
+        return LineToken(TEXT, line)
+
+    kind = match.lastgroup
+    return LineToken(kind, line, noise=kind == NOISE)
+
+
+def normalize_plu_row_text(row_text):
+    """Collapse whitespace and re-join wrapped decimals in a stitched PLU row."""
+    normalized = _WHITESPACE_RE.sub(' ', row_text).strip()
+    return _WRAPPED_DECIMAL_RE.sub(r'\1.\2', normalized)
@@ -1,20 +1,103 @@
+import asyncio
+import fnmatch
 import shutil
 import tempfile
+from contextlib import asynccontextmanager
 from pathlib import Path
 import uuid
-import csv
+import json
 import os
 
-from fastapi import FastAPI, UploadFile, File, HTTPException
-from fastapi.responses import FileResponse
+from fastapi import FastAPI, UploadFile, File, HTTPException, Query, Request
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 
-from pdf_processor import LCBOInvoiceProcessor
-from supplier_csv_processor import SupplierCSVExtractor
+import downloads
+import metrics
+import pdf_processor
+import plu_document
+import tasks
+import text_engines
+import zip_stream
+from jobs import FAILED, Job, JobManager
+from records import PluRecord
+from result_cache import ResultCache
+from sessions import SessionRegistry
+from sku_index import SkuIndexCache
+from uploads import RequestSizeLimitMiddleware, SavedUpload, save_uploads
 from wholesale_cost_processor import WholesaleCostCalculator
-from plu_profit_csv_processor import PluProfitCSVExtractor
+from worker_pool import WorkerPool
+
+# CPU-bound parsing and rendering runs in worker processes so the event loop only does I/O.
+# LCBO_WORKER_PROCESSES sets the pool size (0 runs tasks in a thread) and
+# LCBO_WORKER_MAX_TASKS how many tasks each worker handles before it is recycled.
+worker_pool = WorkerPool()
+
+# Stage timings and counters, rendered by /metrics in the Prometheus text format. Each
+# response also carries a Server-Timing header with its own breakdown.
+metrics_registry = metrics.MetricsRegistry()
+metrics_registry.describe("lcbo_http_requests_total", "counter", "HTTP requests by endpoint, method and status.")
+metrics_registry.describe("lcbo_http_request_duration_seconds", "histogram", "HTTP request duration until the response starts.")
+metrics_registry.describe("lcbo_stage_duration_seconds", "histogram", "Seconds per job spent in each stage (queue, cache, extract_text, parse, render, write, other).")
+metrics_registry.describe("lcbo_jobs_total", "counter", "Finished jobs by kind and status.")
+metrics_registry.describe("lcbo_pages_total", "counter", "PDF pages parsed.")
+metrics_registry.describe("lcbo_rows_total", "counter", "Rows parsed from PDFs.")
+metrics_registry.describe("lcbo_cache_hits_total", "counter", "Result cache hits.")
+metrics_registry.describe("lcbo_cache_misses_total", "counter", "Result cache misses.")
+metrics_registry.describe("lcbo_errors_total", "counter", "Failed files and failed jobs.")
+
+
+def _on_job_finish(job: Job, status: str) -> None:
+    """Re-measure the job's session for the reaper and record the job's metrics."""
+    sessions.refresh(job.session_id)
+    labels = {"kind": job.kind}
+    metrics_registry.inc("lcbo_jobs_total", {**labels, "status": status})
+    metrics_registry.observe_recorder(job.timings, labels, "lcbo_stage_duration_seconds", "lcbo")
+    failed_files = sum(1 for entry in job.files if entry["status"] == FAILED)
+    if failed_files:
+        metrics_registry.inc("lcbo_errors_total", {**labels, "scope": "file"}, failed_files)
+    if status == FAILED:
+        metrics_registry.inc("lcbo_errors_total", {**labels, "scope": "job"})
+
+
+# Every document request runs as a job on an in-process queue; LCBO_JOB_CONCURRENCY
+# caps how many jobs run at once. /jobs returns immediately, the other endpoints wait.
+job_manager = JobManager(on_finish=_on_job_finish)
 
-app = FastAPI(title="LCBO Invoice Processor", version="1.0.0")
+# Create temporary directory for processing
+UPLOAD_DIR = Path(tempfile.gettempdir()) / "lcbo_invoices"
+UPLOAD_DIR.mkdir(exist_ok=True)
+
+# Step 1 SKUs per session for step 2, loaded from the session's sku_index.json.
+sku_indexes = SkuIndexCache()
+
+# Content hashes behind the download ETags, keyed by path, size and mtime.
+file_digests = downloads.FileDigests()
+
+# Sessions idle past LCBO_SESSION_TTL_SECONDS are deleted in the background, and the least
+# recently used ones are evicted while UPLOAD_DIR is over LCBO_SESSION_MAX_BYTES.
+sessions = SessionRegistry(
+    UPLOAD_DIR,
+    busy_sessions=job_manager.active_session_ids,
+    on_remove=sku_indexes.discard,
+)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    worker_pool.start()
+    job_manager.start()
+    sessions.start()
+    yield
+    await sessions.shutdown()
+    await job_manager.shutdown()
+    worker_pool.shutdown()
+
+
+app = FastAPI(title="LCBO Invoice Processor", version="1.0.0", lifespan=lifespan)
+
+# Reject oversized request bodies before multipart parsing (LCBO_MAX_REQUEST_BYTES).
+app.add_middleware(RequestSizeLimitMiddleware)
 
 # Add CORS middleware to allow requests from local frontend origins.
 # Use CORS_ORIGINS to override defaults when needed.
@@ -30,11 +113,52 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Server-Timing"],
 )
 
-# Create temporary directory for processing
-UPLOAD_DIR = Path(tempfile.gettempdir()) / "lcbo_invoices"
-UPLOAD_DIR.mkdir(exist_ok=True)
+# Outermost, so the Server-Timing total covers the whole request.
+app.add_middleware(metrics.ServerTimingMiddleware, registry=metrics_registry)
+
+# Maximum number of files from one /upload request being condensed at the same time.
+UPLOAD_CONCURRENCY = int(os.getenv("LCBO_UPLOAD_CONCURRENCY", str(max(1, worker_pool.max_workers))))
+
+# PLU lists with at least twice LCBO_PLU_PAGES_PER_RANGE pages are split into page ranges
+# that the workers parse in parallel.
+PLU_PAGES_PER_RANGE = int(os.getenv("LCBO_PLU_PAGES_PER_RANGE", "25"))
+
+# Parsed documents and rendered outputs are reused across sessions, keyed by upload SHA-256.
+result_cache = ResultCache(
+    os.getenv("LCBO_CACHE_DIR", str(Path(tempfile.gettempdir()) / "lcbo_cache")),
+    max_memory_entries=int(os.getenv("LCBO_CACHE_MEMORY_ENTRIES", "256")),
+    max_disk_bytes=int(os.getenv("LCBO_CACHE_DISK_BYTES", str(512 * 1024 * 1024))),
+)
+
+
+def _collect_state_metrics():
+    """Cache, session and job gauges, read only when /metrics is scraped."""
+    cache = result_cache.stats()
+    session_stats = sessions.stats()
+    job_stats = job_manager.stats()
+    return [
+        ("lcbo_cache_evictions_total", "counter", "Result cache evictions.", [({}, cache["evictions"])]),
+        ("lcbo_cache_entries", "gauge", "Result cache entries.", [
+            ({"tier": "memory"}, cache["memory_entries"]), ({"tier": "disk"}, cache["disk_entries"]),
+        ]),
+        ("lcbo_cache_disk_bytes", "gauge", "Result cache bytes on disk.", [({}, cache["disk_bytes"])]),
+        ("lcbo_sessions", "gauge", "Session directories on disk.", [({}, session_stats["sessions"])]),
+        ("lcbo_session_bytes", "gauge", "Bytes used by session directories.", [({}, session_stats["total_bytes"])]),
+        ("lcbo_sessions_removed_total", "counter", "Session directories removed.", [
+            ({"reason": "expired"}, session_stats["sessions_expired"]),
+            ({"reason": "evicted"}, session_stats["sessions_evicted"]),
+            ({"reason": "deleted"}, session_stats["sessions_deleted"]),
+        ]),
+        ("lcbo_jobs_active", "gauge", "Queued and running jobs.", [
+            ({"status": status}, job_stats[status]) for status in ("queued", "running")
+        ]),
+    ]
+
+
+metrics_registry.add_collector(_collect_state_metrics)
 
 
 @app.get("/health")
@@ -43,186 +167,309 @@ async def health_check():
     return {"status": "ok"}
 
 
-@app.post("/upload")
-async def upload_pdfs(files: list[UploadFile] = File(...)):
-    """
-    Upload one or more PDF files for processing
-    Returns session ID and processing status
-    """
-    if not files:
-        raise HTTPException(status_code=400, detail="No files provided")
-    
+@app.get("/cache/stats")
+async def cache_stats():
+    """Result cache hit/miss counters and sizes"""
+    return result_cache.stats()
+
+
+@app.get("/sessions/stats")
+async def session_stats():
+    """Session disk usage and reaper counters"""
+    return sessions.stats()
+
+
+@app.get("/metrics")
+async def prometheus_metrics():
+    """Stage timing histograms and counters in the Prometheus text format"""
+    return PlainTextResponse(metrics_registry.render(), media_type="text/plain; version=0.0.4")
+
+
+def _new_session() -> tuple[str, Path]:
     session_id = str(uuid.uuid4())
     session_dir = UPLOAD_DIR / session_id
     session_dir.mkdir(exist_ok=True)
-    
-    uploaded_files = []
-    processing_results = []
-    
-    try:
-        for file in files:
-            if not file.filename.lower().endswith('.pdf'):
-                raise HTTPException(status_code=400, detail=f"File {file.filename} is not a PDF")
-            
-            # Save uploaded file
-            file_path = session_dir / file.filename
-            with open(file_path, 'wb') as f:
-                content = await file.read()
-                f.write(content)
-            
-            uploaded_files.append(file.filename)
-            
-            try:
-                # Process the PDF
-                processor = LCBOInvoiceProcessor(str(file_path))
-                invoice_info, products = processor.process()
-                
-                # Generate condensed PDF
-                output_filename = file.filename.replace('.pdf', '_condensed.pdf')
-                output_path = session_dir / output_filename
-                processor.generate_condensed_pdf(str(output_path))
-                
-                processing_results.append({
-                    "original_file": file.filename,
-                    "output_file": output_filename,
-                    "order_number": invoice_info.get('order_number'),
-                    "customer_name": invoice_info.get('customer_name'),
-                    "item_count": len(products),
-                    "status": "success"
-                })
-            except Exception as e:
-                processing_results.append({
-                    "original_file": file.filename,
-                    "status": "error",
-                    "error": str(e)
-                })
-        
-        return {
-            "session_id": session_id,
-            "files_uploaded": len(uploaded_files),
-            "processing_results": processing_results
-        }
-    
-    except Exception as e:
-        # Clean up on error
-        shutil.rmtree(session_dir, ignore_errors=True)
-        raise HTTPException(status_code=500, detail=str(e))
+    sessions.register(session_id)
+    return session_id, session_dir
 
 
-@app.post("/extract-supplier-csv")
-async def extract_supplier_csv(file: UploadFile = File(...)):
-    """
-    Upload a PDF item list and generate supplier CSV.
-    """
+def _require_pdf(file: UploadFile) -> None:
     if not file or not file.filename:
         raise HTTPException(status_code=400, detail="No file provided")
-
     if not file.filename.lower().endswith('.pdf'):
         raise HTTPException(status_code=400, detail=f"File {file.filename} is not a PDF")
 
-    session_id = str(uuid.uuid4())
-    session_dir = UPLOAD_DIR / session_id
-    session_dir.mkdir(exist_ok=True)
 
+def _text_engine(name: str | None) -> str:
+    """Resolve a requested text engine (LCBO_TEXT_ENGINE when omitted), rejecting unknown ones."""
     try:
-        source_pdf_path = session_dir / file.filename
-        with open(source_pdf_path, 'wb') as f:
-            content = await file.read()
-            f.write(content)
-
-        extractor = SupplierCSVExtractor(str(source_pdf_path))
-        suppliers = extractor.extract_suppliers()
-
-        base_name = file.filename.rsplit('.', 1)[0]
-        csv_files = extractor.generate_chunked_csvs(str(session_dir), base_name)
-        row_count = len(suppliers)
-
-        return {
-            "session_id": session_id,
-            "original_file": file.filename,
-            "csv_file": csv_files[0],
-            "csv_files": csv_files,
-            "csv_file_count": len(csv_files),
-            "supplier_count": row_count,
-            "status": "success" if suppliers else "empty"
-        }
-    except Exception as e:
+        return text_engines.resolve_engine(name)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def _cache_kind(kind: str, text_engine: str) -> str:
+    # Results from a non-default engine are cached apart from the reference ones.
+    return kind if text_engine == text_engines.DEFAULT_TEXT_ENGINE else f"{kind}-{text_engine}"
+
+
+async def _save_new_session(files: list[UploadFile]) -> tuple[str, Path, list[SavedUpload]]:
+    """Create a session and save the uploads into it, removing it again if saving fails."""
+    session_id, session_dir = _new_session()
+    try:
+        with metrics.timer("upload"):
+            uploads = await save_uploads(files, session_dir)
+    except Exception:
         shutil.rmtree(session_dir, ignore_errors=True)
+        raise
+    return session_id, session_dir, uploads
+
+
+async def _wait_for_job(job: Job):
+    """Block on a job for the synchronous endpoints, surfacing failures as HTTP errors."""
+    try:
+        return await job_manager.wait(job)
+    except HTTPException:
+        raise
+    except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        # Report the job's stages in this request's Server-Timing header.
+        recorder = metrics.current()
+        if recorder is not None:
+            recorder.merge(job.timings)
 
 
-@app.post("/calculate-item-cost-csv")
-async def calculate_item_cost_csv(session_id: str, files: list[UploadFile] = File(...)):
-    """
-    Step 2: Upload one or more Quick Order PDFs and generate one combined item-cost CSV.
-    Uses item numbers extracted in step 1 from the same session.
+async def _run_task(job: Job, task, *args) -> dict:
+    """Run a worker task and fold the stage timings it reports into the job's."""
+    result = await worker_pool.run(task, *args)
+    job.timings.merge(result.pop("timings", None))
+    return result
+
+
+async def _cache_get(job: Job, kind: str, digest: str, artifact_targets: dict[str, Path] | None = None):
+    """Look up a cached result, recording the time taken and the hit or miss on the job."""
+    with metrics.timer("cache", job.timings):
+        result = await asyncio.to_thread(result_cache.get, kind, digest, artifact_targets)
+    job.timings.count("cache_hits" if result is not None else "cache_misses")
+    return result
+
+
+async def _cache_put(job: Job, kind: str, digest: str, payload, artifacts: dict[str, Path] | None = None) -> None:
+    with metrics.timer("cache", job.timings):
+        await asyncio.to_thread(result_cache.put, kind, digest, payload, artifacts)
+
+
+async def _condense_uploaded_invoice(
+    job: Job, index: int, upload: SavedUpload, semaphore: asyncio.Semaphore, text_engine: str,
+    parsed: list | None = None,
+) -> dict:
+    """Condense one saved invoice and return its processing_results entry.
+
+    When parsed is given, the parsed invoice is stored at parsed[index].
     """
+    filename = upload.path.name
+    async with semaphore:
+        job.file_started(index)
+        try:
+            output_filename = filename.replace('.pdf', '_condensed.pdf')
+            output_path = upload.path.parent / output_filename
+            artifacts = {"condensed.pdf": output_path}
+
+            cache_kind = _cache_kind("invoice", text_engine)
+            if pdf_processor.deterministic_output():
+                # Timestamped and deterministic renders are cached apart.
+                cache_kind = f"{cache_kind}-deterministic"
+            result = await _cache_get(job, cache_kind, upload.sha256, artifacts)
+            if result is None:
+                # Process the PDF and generate the condensed PDF in a worker
+                result = await _run_task(job, tasks.condense_invoice, str(upload.path), str(output_path), text_engine)
+                await _cache_put(job, cache_kind, upload.sha256, result, artifacts)
+            invoice_info, products = result["invoice_info"], result["products"]
+            if parsed is not None:
+                parsed[index] = result
+
+            processing_result = {
+                "original_file": filename,
+                "output_file": output_filename,
+                "order_number": invoice_info.get('order_number'),
+                "customer_name": invoice_info.get('customer_name'),
+                "item_count": len(products),
+                "status": "success"
+            }
+            job.file_done(index, [output_filename], processing_result)
+            return processing_result
+        except Exception as e:
+            processing_result = {
+                "original_file": filename,
+                "status": "error",
+                "error": str(e)
+            }
+            job.file_failed(index, str(e), processing_result)
+            return processing_result
+
+
+async def _run_condense_job(job: Job, uploads: list[SavedUpload], text_engine: str, combine: bool = False) -> dict:
+    # Condense all files concurrently; gather keeps results in upload order.
+    semaphore = asyncio.Semaphore(UPLOAD_CONCURRENCY)
+    parsed = [None] * len(uploads) if combine else None
+    processing_results = await asyncio.gather(*(
+        _condense_uploaded_invoice(job, index, upload, semaphore, text_engine, parsed)
+        for index, upload in enumerate(uploads)
+    ))
+
+    response = {
+        "session_id": job.session_id,
+        "files_uploaded": len(uploads),
+        "processing_results": processing_results
+    }
+    invoices = [invoice for invoice in parsed or [] if invoice is not None]
+    if invoices:
+        # Every parsed invoice in upload order, rendered into one PDF for a single print job.
+        output_path = uploads[0].path.parent / pdf_processor.COMBINED_PDF_FILENAME
+        if output_path.exists():
+            # An upload already owns the name.
+            output_path = output_path.with_name(f"{job.id[:8]}_{output_path.name}")
+        try:
+            combined = await _run_task(job, tasks.combine_invoices, invoices, str(output_path))
+        except Exception as e:
+            # The combined PDF is optional; the per-file results (and the session) stand without it.
+            await asyncio.to_thread(output_path.unlink, missing_ok=True)
+            response["combined_error"] = str(e)
+        else:
+            response["combined_file"] = output_path.name
+            response["combined_pages"] = combined["page_count"]
+    return response
+
+
+async def _submit_condense_job(
+    files: list[UploadFile], text_engine: str | None = None, combine: bool = False
+) -> Job:
     if not files:
         raise HTTPException(status_code=400, detail="No files provided")
-
     for file in files:
-        if not file or not file.filename:
-            raise HTTPException(status_code=400, detail="One or more files are missing")
         if not file.filename.lower().endswith('.pdf'):
             raise HTTPException(status_code=400, detail=f"File {file.filename} is not a PDF")
+    text_engine = _text_engine(text_engine)
 
-    session_dir = UPLOAD_DIR / session_id
-    if not session_dir.exists():
-        raise HTTPException(status_code=404, detail="Session not found")
+    # Save uploaded files in chunks; size and page limits are enforced here
+    session_id, session_dir, uploads = await _save_new_session(files)
+    return job_manager.submit(
+        "condense", session_id, [upload.path.name for upload in uploads],
+        _run_condense_job, uploads, text_engine, combine, cleanup_dir=session_dir,
+    )
 
-    supplier_csv_candidates = sorted(session_dir.glob('*_supplier_skus*.csv'))
-    if not supplier_csv_candidates:
-        raise HTTPException(status_code=400, detail="Step 1 CSV not found for this session")
 
-    allowed_items = set()
-    for csv_path in supplier_csv_candidates:
-        with csv_path.open('r', encoding='utf-8') as csv_file:
-            reader = csv.DictReader(csv_file)
-            for row in reader:
-                sku = (row.get('sku') or '').strip()
-                if sku:
-                    allowed_items.add(sku)
+async def _parse_plu_in_parallel(job: Job, upload: SavedUpload, text_engine: str) -> list[PluRecord] | None:
+    """Parse a long PLU list in page ranges across the workers; None leaves parsing to the task."""
+    if worker_pool.max_workers < 2:
+        return None
+    page_count = await asyncio.to_thread(text_engines.page_count, str(upload.path), text_engine)
+    ranges = plu_document.page_ranges(page_count, worker_pool.max_workers, PLU_PAGES_PER_RANGE)
+    if len(ranges) < 2:
+        return None
+
+    parts = await asyncio.gather(*(
+        _run_task(job, tasks.parse_plu_pages, str(upload.path), start, stop, text_engine) for start, stop in ranges
+    ))
+    records = plu_document.merge_page_ranges(parts)
+    job.timings.count("rows", len(records))
+    return records
+
+
+async def _run_plu_task(job: Job, upload: SavedUpload, original_file: str, task, text_engine: str) -> dict:
+    """Run a PLU list task, reusing the parsed PLU document cached for this upload."""
+    session_dir = upload.path.parent
+    base_name = original_file.rsplit('.', 1)[0]
+    cache_kind = _cache_kind("plu-document", text_engine)
+    # Records are cached as JSON dicts and handled as PluRecords everywhere else.
+    cached_records = await _cache_get(job, cache_kind, upload.sha256)
+    if cached_records is not None:
+        records = [PluRecord.from_dict(record) for record in cached_records]
+    else:
+        records = await _parse_plu_in_parallel(job, upload, text_engine)
+    result = await _run_task(job, task, str(upload.path), str(session_dir), base_name, records, text_engine)
+    if cached_records is None:
+        await _cache_put(job, cache_kind, upload.sha256, [record.to_dict() for record in result["records"]])
+    return result
+
+
+async def _run_supplier_csv_job(job: Job, upload: SavedUpload, original_file: str, text_engine: str) -> dict:
+    job.file_started(0)
+    result = await _run_plu_task(job, upload, original_file, tasks.extract_supplier_csvs, text_engine)
+    suppliers, csv_files = result["suppliers"], result["csv_files"]
+    sku_indexes.put(job.session_id, suppliers)
+    row_count = len(suppliers)
+    job.file_done(0, csv_files)
+
+    return {
+        "session_id": job.session_id,
+        "original_file": original_file,
+        "csv_file": csv_files[0],
+        "csv_files": csv_files,
+        "csv_file_count": len(csv_files),
+        "supplier_count": row_count,
+        "status": "success" if suppliers else "empty"
+    }
 
-    if not allowed_items:
-        raise HTTPException(status_code=400, detail="Step 1 CSV is empty")
 
+async def _submit_supplier_csv_job(file: UploadFile, text_engine: str | None = None) -> Job:
+    _require_pdf(file)
+    text_engine = _text_engine(text_engine)
+    session_id, session_dir, [upload] = await _save_new_session([file])
+    return job_manager.submit(
+        "supplier-csv", session_id, [file.filename],
+        _run_supplier_csv_job, upload, file.filename, text_engine, cleanup_dir=session_dir,
+    )
+
+
+async def _run_item_cost_job(
+    job: Job, uploads: list[SavedUpload], original_files: list[str], allowed_items: frozenset[str], text_engine: str
+) -> dict:
+    session_dir = UPLOAD_DIR / job.session_id
     processing_results = []
     combined_rows: list[tuple[str, float]] = []
 
-    for file in files:
+    for index, (original_file, upload) in enumerate(zip(original_files, uploads)):
+        job.file_started(index)
         try:
-            quick_order_path = session_dir / file.filename
-            with open(quick_order_path, 'wb') as f:
-                content = await file.read()
-                f.write(content)
-
-            calculator = WholesaleCostCalculator(str(quick_order_path))
-            rows = calculator.calculate_cost_rows(allowed_items)
+            cache_kind = _cache_kind("quick-order", text_engine)
+            cached_records = await _cache_get(job, cache_kind, upload.sha256)
+            result = await _run_task(
+                job, tasks.calculate_item_costs, str(upload.path), allowed_items, cached_records, text_engine
+            )
+            if cached_records is None:
+                await _cache_put(job, cache_kind, upload.sha256, result["records"])
+            rows = result["rows"]
             combined_rows.extend(rows)
             row_count = len(rows)
+            job.file_done(index)
 
             processing_results.append({
-                "original_file": file.filename,
+                "original_file": original_file,
                 "item_count": row_count,
                 "status": "success" if row_count > 0 else "empty"
             })
         except Exception as e:
+            job.file_failed(index, str(e))
             processing_results.append({
-                "original_file": file.filename,
+                "original_file": original_file,
                 "status": "error",
                 "error": str(e)
             })
 
     output_filename = "combined_quick_orders_item_costs.csv"
     output_path = session_dir / output_filename
-    total_item_count = WholesaleCostCalculator.write_item_cost_csv(str(output_path), combined_rows)
+    with metrics.recording(job.timings):
+        total_item_count = WholesaleCostCalculator.write_item_cost_csv(str(output_path), combined_rows)
+    job.add_outputs([output_filename])
 
     success_file_count = sum(1 for result in processing_results if result.get("status") in {"success", "empty"})
     error_file_count = sum(1 for result in processing_results if result.get("status") == "error")
 
     return {
-        "session_id": session_id,
-        "files_uploaded": len(files),
+        "session_id": job.session_id,
+        "files_uploaded": len(original_files),
         "source_files_processed": success_file_count,
         "source_files_failed": error_file_count,
         "csv_file": output_filename,
@@ -232,64 +479,287 @@ async def calculate_item_cost_csv(session_id: str, files: list[UploadFile] = Fil
     }
 
 
+async def _submit_item_cost_job(session_id: str, files: list[UploadFile], text_engine: str | None = None) -> Job:
+    if not files:
+        raise HTTPException(status_code=400, detail="No files provided")
+
+    for file in files:
+        if not file or not file.filename:
+            raise HTTPException(status_code=400, detail="One or more files are missing")
+        if not file.filename.lower().endswith('.pdf'):
+            raise HTTPException(status_code=400, detail=f"File {file.filename} is not a PDF")
+    text_engine = _text_engine(text_engine)
+
+    session_dir = UPLOAD_DIR / session_id
+    if not session_dir.exists():
+        raise HTTPException(status_code=404, detail="Session not found")
+    sessions.touch(session_id)
+
+    allowed_items = await asyncio.to_thread(sku_indexes.load, session_id, session_dir)
+    if allowed_items is None:
+        raise HTTPException(status_code=400, detail="Step 1 CSV not found for this session")
+
+    if not allowed_items:
+        raise HTTPException(status_code=400, detail="Step 1 CSV is empty")
+
+    with metrics.timer("upload"):
+        quick_order_uploads = await save_uploads(files, session_dir)
+    original_files = [file.filename for file in files]
+
+    # The session belongs to step 1, so a failed step 2 job leaves it in place.
+    return job_manager.submit(
+        "item-cost-csv", session_id, original_files,
+        _run_item_cost_job, quick_order_uploads, original_files, allowed_items, text_engine,
+    )
+
+
+async def _run_plu_profit_csv_job(job: Job, upload: SavedUpload, original_file: str, text_engine: str) -> dict:
+    job.file_started(0)
+    result = await _run_plu_task(job, upload, original_file, tasks.extract_plu_profit_csv, text_engine)
+    rows, csv_file = result["rows"], result["csv_file"]
+    job.file_done(0, [csv_file])
+
+    return {
+        "session_id": job.session_id,
+        "original_file": original_file,
+        "csv_file": csv_file,
+        "row_count": len(rows),
+        "status": "success" if rows else "empty"
+    }
+
+
+async def _submit_plu_profit_csv_job(file: UploadFile, text_engine: str | None = None) -> Job:
+    _require_pdf(file)
+    text_engine = _text_engine(text_engine)
+    session_id, session_dir, [upload] = await _save_new_session([file])
+    return job_manager.submit(
+        "plu-profit-csv", session_id, [file.filename],
+        _run_plu_profit_csv_job, upload, file.filename, text_engine, cleanup_dir=session_dir,
+    )
+
+
+async def _run_plu_csvs_job(job: Job, upload: SavedUpload, original_file: str, text_engine: str) -> dict:
+    job.file_started(0)
+    result = await _run_plu_task(job, upload, original_file, tasks.extract_plu_csvs, text_engine)
+    suppliers, csv_files = result["suppliers"], result["csv_files"]
+    sku_indexes.put(job.session_id, suppliers)
+    rows, profit_csv_file = result["rows"], result["profit_csv_file"]
+    job.file_done(0, csv_files + [profit_csv_file])
+
+    return {
+        "session_id": job.session_id,
+        "original_file": original_file,
+        "csv_file": csv_files[0],
+        "csv_files": csv_files,
+        "csv_file_count": len(csv_files),
+        "supplier_count": len(suppliers),
+        "profit_csv_file": profit_csv_file,
+        "row_count": len(rows),
+        "status": "success" if suppliers or rows else "empty"
+    }
+
+
+async def _submit_plu_csvs_job(file: UploadFile, text_engine: str | None = None) -> Job:
+    _require_pdf(file)
+    text_engine = _text_engine(text_engine)
+    session_id, session_dir, [upload] = await _save_new_session([file])
+    return job_manager.submit(
+        "plu-csvs", session_id, [file.filename],
+        _run_plu_csvs_job, upload, file.filename, text_engine, cleanup_dir=session_dir,
+    )
+
+
+@app.post("/upload")
+async def upload_pdfs(files: list[UploadFile] = File(...), text_engine: str | None = None, combine: bool = False):
+    """
+    Upload one or more PDF files for processing
+    Returns session ID and processing status
+    With combine=true, every invoice that parsed is also rendered into one PDF
+    (combined_file), each starting on a new page with its own page numbers.
+    """
+    return await _wait_for_job(await _submit_condense_job(files, text_engine, combine))
+
+
+@app.post("/upload/stream")
+async def upload_pdfs_stream(
+    request: Request, files: list[UploadFile] = File(...), text_engine: str | None = None, combine: bool = False
+):
+    """
+    Upload one or more PDF files and stream results as they finish.
+    Emits one "file" event per file as soon as it is condensed (in completion order),
+    then a "summary" event with the full /upload response that closes the stream.
+    Events are NDJSON lines, or Server-Sent Events when the client accepts text/event-stream.
+    """
+    job = await _submit_condense_job(files, text_engine, combine)
+    use_sse = "text/event-stream" in request.headers.get("accept", "")
+
+    def encode(event: dict) -> str:
+        if use_sse:
+            return f"event: {event['event']}\ndata: {json.dumps(event)}\n\n"
+        return json.dumps(event) + "\n"
+
+    async def events():
+        async for index in job.file_updates():
+            processing_result = job.files[index]["result"]
+            event = {"event": "file", "index": index, "session_id": job.session_id, **processing_result}
+            if processing_result["status"] == "success":
+                event["download_url"] = f"/download/{job.session_id}/{processing_result['output_file']}"
+            yield encode(event)
+
+        try:
+            summary = {"event": "summary", "job_id": job.id, **await job_manager.wait(job)}
+        except HTTPException as e:
+            summary = {"event": "summary", "job_id": job.id, "status": "error", "error": e.detail}
+        except Exception as e:
+            summary = {"event": "summary", "job_id": job.id, "status": "error", "error": str(e)}
+        yield encode(summary)
+
+    media_type = "text/event-stream" if use_sse else "application/x-ndjson"
+    return StreamingResponse(events(), media_type=media_type)
+
+
+@app.post("/extract-supplier-csv")
+async def extract_supplier_csv(file: UploadFile = File(...), text_engine: str | None = None):
+    """
+    Upload a PDF item list and generate supplier CSV.
+    """
+    return await _wait_for_job(await _submit_supplier_csv_job(file, text_engine))
+
+
+@app.post("/calculate-item-cost-csv")
+async def calculate_item_cost_csv(session_id: str, files: list[UploadFile] = File(...), text_engine: str | None = None):
+    """
+    Step 2: Upload one or more Quick Order PDFs and generate one combined item-cost CSV.
+    Uses item numbers extracted in step 1 from the same session.
+    """
+    return await _wait_for_job(await _submit_item_cost_job(session_id, files, text_engine))
+
+
 @app.post("/extract-plu-profit-csv")
-async def extract_plu_profit_csv(file: UploadFile = File(...)):
+async def extract_plu_profit_csv(file: UploadFile = File(...), text_engine: str | None = None):
     """
     Upload a PLU PDF document and generate CSV rows sorted by %Profit (low to high).
     """
-    if not file or not file.filename:
-        raise HTTPException(status_code=400, detail="No file provided")
+    return await _wait_for_job(await _submit_plu_profit_csv_job(file, text_engine))
 
-    if not file.filename.lower().endswith('.pdf'):
-        raise HTTPException(status_code=400, detail=f"File {file.filename} is not a PDF")
 
-    session_id = str(uuid.uuid4())
+@app.post("/extract-plu-csvs")
+async def extract_plu_csvs(file: UploadFile = File(...), text_engine: str | None = None):
+    """
+    Upload a PLU PDF once and generate both the step 1 supplier SKU CSV(s) and the %Profit CSV.
+    The returned session can be used for step 2 like an /extract-supplier-csv session.
+    """
+    return await _wait_for_job(await _submit_plu_csvs_job(file, text_engine))
+
+
+SINGLE_FILE_JOBS = {
+    "supplier-csv": _submit_supplier_csv_job,
+    "plu-profit-csv": _submit_plu_profit_csv_job,
+    "plu-csvs": _submit_plu_csvs_job,
+}
+
+
+@app.post("/jobs/{kind}", status_code=202)
+async def create_job(
+    kind: str,
+    files: list[UploadFile] = File(...),
+    session_id: str | None = None,
+    text_engine: str | None = None,
+    combine: bool = False,
+):
+    """
+    Queue a job and return its id without waiting for it to finish.
+    Kinds: condense, supplier-csv, item-cost-csv (needs session_id), plu-profit-csv, plu-csvs.
+    combine applies to condense jobs, as on /upload.
+    """
+    if kind == "condense":
+        job = await _submit_condense_job(files, text_engine, combine)
+    elif kind == "item-cost-csv":
+        if not session_id:
+            raise HTTPException(status_code=400, detail="session_id is required for item-cost-csv jobs")
+        job = await _submit_item_cost_job(session_id, files, text_engine)
+    elif kind in SINGLE_FILE_JOBS:
+        if len(files) != 1:
+            raise HTTPException(status_code=400, detail=f"{kind} jobs take exactly one file")
+        job = await SINGLE_FILE_JOBS[kind](files[0], text_engine)
+    else:
+        raise HTTPException(status_code=404, detail=f"Unknown job kind: {kind}")
+
+    return job.to_dict()
+
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    """
+    Report job status, per-file progress and output names
+    """
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job.to_dict()
+
+
+@app.delete("/jobs/{job_id}")
+async def cancel_job(job_id: str):
+    """
+    Cancel a queued or running job
+    """
+    job = await job_manager.cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job.to_dict()
+
+
+# Files included in a session ZIP when no ?pattern= is given: the outputs, not the uploads.
+DEFAULT_ZIP_PATTERNS = ["*_condensed.pdf", "*.csv"]
+
+
+@app.get("/download/{session_id}.zip")
+async def download_zip(session_id: str, pattern: list[str] | None = Query(None)):
+    """
+    Download a session's files as one ZIP, streamed while it is built.
+    By default it holds the condensed PDFs and CSVs; repeat ?pattern= (a glob
+    such as *_part_*.csv) to choose the files instead.
+    """
     session_dir = UPLOAD_DIR / session_id
-    session_dir.mkdir(exist_ok=True)
+    if session_id.startswith('.') or not session_dir.is_dir():
+        raise HTTPException(status_code=404, detail="Session not found")
 
-    try:
-        source_pdf_path = session_dir / file.filename
-        with open(source_pdf_path, 'wb') as f:
-            content = await file.read()
-            f.write(content)
-
-        extractor = PluProfitCSVExtractor(str(source_pdf_path))
-        rows = extractor.extract_rows()
-
-        base_name = file.filename.rsplit('.', 1)[0]
-        csv_file = extractor.write_csv(str(session_dir), base_name)
-
-        return {
-            "session_id": session_id,
-            "original_file": file.filename,
-            "csv_file": csv_file,
-            "row_count": len(rows),
-            "status": "success" if rows else "empty"
-        }
-    except Exception as e:
-        shutil.rmtree(session_dir, ignore_errors=True)
-        raise HTTPException(status_code=500, detail=str(e))
+    patterns = pattern or DEFAULT_ZIP_PATTERNS
+    paths = sorted(
+        path for path in session_dir.iterdir()
+        if path.is_file() and not path.name.startswith('.')
+        and any(fnmatch.fnmatchcase(path.name, glob) for glob in patterns)
+    )
+    if not paths:
+        raise HTTPException(status_code=404, detail="No matching files")
+    sessions.touch(session_id)
+
+    # A sync iterator, so Starlette pulls each chunk (file reads, compression) in a worker thread.
+    return StreamingResponse(
+        zip_stream.iter_zip(paths),
+        media_type="application/zip",
+        headers={"Content-Disposition": f'attachment; filename="{session_id}.zip"'},
+    )
 
 
 @app.get("/download/{session_id}/{filename}")
-async def download_pdf(session_id: str, filename: str):
+async def download_pdf(session_id: str, filename: str, request: Request):
     """
     Download a processed PDF file
+    Responses carry a content-hash ETag; If-None-Match gets 304 and Range gets 206.
     """
     file_path = UPLOAD_DIR / session_id / filename
     
     if not file_path.exists():
         raise HTTPException(status_code=404, detail="File not found")
+    sessions.touch(session_id)
     
     media_type = "application/pdf"
     if filename.lower().endswith('.csv'):
         media_type = "text/csv"
 
-    return FileResponse(
-        path=file_path,
-        filename=filename,
-        media_type=media_type
-    )
+    return await downloads.file_response(request, file_path, filename, media_type, file_digests)
 
 
 @app.get("/list/{session_id}")
@@ -301,6 +771,7 @@ async def list_files(session_id: str):
     
     if not session_dir.exists():
         raise HTTPException(status_code=404, detail="Session not found")
+    sessions.touch(session_id)
     
     files = [
         f.name for f in session_dir.iterdir() 
@@ -315,12 +786,9 @@ async def cleanup_session(session_id: str):
     """
     Clean up session files
     """
-    session_dir = UPLOAD_DIR / session_id
-    
-    if session_dir.exists():
-        shutil.rmtree(session_dir)
+    bytes_reclaimed = await asyncio.to_thread(sessions.remove, session_id)
     
-    return {"status": "cleaned", "session_id": session_id}
+    return {"status": "cleaned", "session_id": session_id, "bytes_reclaimed": bytes_reclaimed}
 
 
 if __name__ == "__main__":
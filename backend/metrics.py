@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+"""
+Timing spans and Prometheus-format metrics.
+
+Processors wrap their stages in span(name). Spans only cost a perf_counter
+pair and a dict update, and only while a SpanRecorder is active: worker tasks
+activate one, and its totals travel back with the task result. Each name
+records exclusive time (nested spans are subtracted from their parent), so a
+recorder's durations add up to the wall time it covered.
+
+The API process folds those totals into histograms and counters held in a
+MetricsRegistry, which /metrics renders in the Prometheus text format; the
+same per-request totals are sent back in a Server-Timing header.
+"""
+
+import re
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+_current: ContextVar['SpanRecorder | None'] = ContextVar('lcbo_span_recorder', default=None)
+
+
+class SpanRecorder:
+    """Per-task (or per-request) totals: seconds per span name and counts per counter name."""
+
+    __slots__ = ('durations', 'counts', '_stack')
+
+    def __init__(self):
+        self.durations: dict[str, float] = {}
+        self.counts: dict[str, int] = {}
+        # [name, start, seconds spent in child spans] for each open span.
+        self._stack: list[list] = []
+
+    def add(self, name: str, seconds: float) -> None:
+        self.durations[name] = self.durations.get(name, 0.0) + seconds
+
+    def count(self, name: str, amount: int = 1) -> None:
+        self.counts[name] = self.counts.get(name, 0) + amount
+
+    def merge(self, other: 'SpanRecorder | dict | None') -> None:
+        """Add another recorder's totals, or a payload from to_payload()."""
+        if other is None:
+            return
+        if isinstance(other, SpanRecorder):
+            other = other.to_payload()
+        for name, seconds in other.get('durations', {}).items():
+            self.add(name, seconds)
+        for name, amount in other.get('counts', {}).items():
+            self.count(name, amount)
+
+    def to_payload(self) -> dict:
+        return {'durations': dict(self.durations), 'counts': dict(self.counts)}
+
+    def server_timing(self) -> str:
+        """Format the durations as a Server-Timing header value (milliseconds)."""
+        return ', '.join(f'{name};dur={seconds * 1000:.1f}' for name, seconds in self.durations.items())
+
+
+def current() -> SpanRecorder | None:
+    return _current.get()
+
+
+@contextmanager
+def recording(recorder: SpanRecorder | None = None):
+    """Activate a recorder for the enclosed (synchronous) code and yield it."""
+    recorder = recorder if recorder is not None else SpanRecorder()
+    token = _current.set(recorder)
+    try:
+        yield recorder
+    finally:
+        _current.reset(token)
+
+
+@contextmanager
+def span(name: str):
+    """Time a stage of synchronous work; a no-op unless a recorder is active."""
+    recorder = _current.get()
+    if recorder is None:
+        yield
+        return
+
+    frame = [name, time.perf_counter(), 0.0]
+    recorder._stack.append(frame)
+    try:
+        yield
+    finally:
+        recorder._stack.pop()
+        elapsed = time.perf_counter() - frame[1]
+        recorder.add(name, elapsed - frame[2])
+        if recorder._stack:
+            recorder._stack[-1][2] += elapsed
+
+
+@contextmanager
+def timer(name: str, recorder: SpanRecorder | None = None):
+    """Add the enclosed wall time to a recorder (the active one by default).
+
+    Unlike span() this keeps no nesting state, so it is safe around awaits.
+    """
+    recorder = recorder if recorder is not None else _current.get()
+    if recorder is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        recorder.add(name, time.perf_counter() - start)
+
+
+def count(name: str, amount: int = 1) -> None:
+    """Bump a counter on the active recorder, if any."""
+    recorder = _current.get()
+    if recorder is not None:
+        recorder.count(name, amount)
+
+
+def _escape_label(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(labels: tuple) -> str:
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{key}="{_escape_label(value)}"' for key, value in labels) + '}'
+
+
+def _format_value(value) -> str:
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+_METRIC_NAME_RE = re.compile(r'[a-zA-Z_:][a-zA-Z0-9_:]*')
+
+
+class MetricsRegistry:
+    """Thread-safe counters and histograms rendered in the Prometheus text format."""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._meta: dict[str, tuple[str, str]] = {}
+        # name -> labels -> value
+        self._counters: dict[str, dict[tuple, float]] = {}
+        # name -> labels -> [per-bucket counts..., sum, count]
+        self._histograms: dict[str, dict[tuple, list]] = {}
+        # Callables returning extra samples at scrape time: [(name, type, help, [(labels, value)])].
+        self._collectors = []
+        self._lock = threading.Lock()
+
+    def describe(self, name: str, metric_type: str, help_text: str) -> None:
+        if not _METRIC_NAME_RE.fullmatch(name):
+            raise ValueError(f"Invalid metric name: {name}")
+        self._meta[name] = (metric_type, help_text)
+
+    def inc(self, name: str, labels: dict | None = None, amount: float = 1) -> None:
+        key = tuple(sorted((labels or {}).items()))
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + amount
+
+    def observe(self, name: str, value: float, labels: dict | None = None) -> None:
+        key = tuple(sorted((labels or {}).items()))
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            state = series.get(key)
+            if state is None:
+                state = series[key] = [0] * len(self.buckets) + [0.0, 0]
+            for idx, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[idx] += 1
+            state[-2] += value
+            state[-1] += 1
+
+    def observe_recorder(self, recorder: SpanRecorder, labels: dict, duration_metric: str, counter_prefix: str) -> None:
+        """Record a finished recorder: one observation per span name, counters added to <prefix>_<name>_total."""
+        for name, seconds in recorder.durations.items():
+            self.observe(duration_metric, seconds, {**labels, 'stage': name})
+        for name, amount in recorder.counts.items():
+            self.inc(f'{counter_prefix}_{name}_total', labels, amount)
+
+    def add_collector(self, collector) -> None:
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        lines = []
+        with self._lock:
+            for name in sorted(self._counters):
+                metric_type, help_text = self._meta.get(name, ('counter', name))
+                lines.append(f'# HELP {name} {help_text}')
+                lines.append(f'# TYPE {name} {metric_type}')
+                for labels, value in sorted(self._counters[name].items()):
+                    lines.append(f'{name}{_format_labels(labels)} {_format_value(value)}')
+
+            for name in sorted(self._histograms):
+                _, help_text = self._meta.get(name, ('histogram', name))
+                lines.append(f'# HELP {name} {help_text}')
+                lines.append(f'# TYPE {name} histogram')
+                for labels, state in sorted(self._histograms[name].items()):
+                    for bound, bucket_count in zip(self.buckets, state):
+                        bucket_labels = labels + (('le', _format_value(float(bound))),)
+                        lines.append(f'{name}_bucket{_format_labels(bucket_labels)} {bucket_count}')
+                    lines.append(f'{name}_bucket{_format_labels(labels + (("le", "+Inf"),))} {state[-1]}')
+                    lines.append(f'{name}_sum{_format_labels(labels)} {_format_value(state[-2])}')
+                    lines.append(f'{name}_count{_format_labels(labels)} {state[-1]}')
+
+        for collector in self._collectors:
+            for name, metric_type, help_text, samples in collector():
+                lines.append(f'# HELP {name} {help_text}')
+                lines.append(f'# TYPE {name} {metric_type}')
+                for labels, value in samples:
+                    lines.append(f'{name}{_format_labels(tuple(sorted(labels.items())))} {_format_value(value)}')
+
+        return '\n'.join(lines) + '\n'
+
+
+class ServerTimingMiddleware:
+    """Give each HTTP request a SpanRecorder and report it in a Server-Timing header.
+
+    Also counts requests and observes their duration per endpoint in the registry.
+    """
+
+    def __init__(self, app, registry: MetricsRegistry):
+        self.app = app
+        self.registry = registry
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        recorder = SpanRecorder()
+        token = _current.set(recorder)
+        start = time.perf_counter()
+        status_code = 500
+
+        async def timed_send(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                recorder.add('total', time.perf_counter() - start)
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", recorder.server_timing().encode('latin-1')))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, timed_send)
+        finally:
+            _current.reset(token)
+            endpoint = scope.get("endpoint")
+            labels = {"endpoint": getattr(endpoint, "__name__", "unmatched"), "method": scope["method"]}
+            self.registry.inc("lcbo_http_requests_total", {**labels, "status": str(status_code)})
+            self.registry.observe("lcbo_http_request_duration_seconds", time.perf_counter() - start, labels)
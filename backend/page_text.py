@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Per-document page text cache shared by the PDF parsers.
+
+Works on any text engine document (see text_engines).
+"""
+
+import metrics
+
+
+class PageTextCache:
+    """Extract each page's text at most once and hand out ready-split lines."""
+
+    def __init__(self, document):
+        self.document = document
+        self._texts: dict[int, str] = {}
+        self._raw_lines: dict[int, list[str]] = {}
+        self._lines: dict[int, list[str]] = {}
+        self._tokens: dict[tuple, list] = {}
+
+    def __len__(self) -> int:
+        return len(self.document)
+
+    def text(self, page_index: int) -> str:
+        """Return the extracted text of one page."""
+        text = self._texts.get(page_index)
+        if text is None:
+            with metrics.span('extract_text'):
+                text = self.document.page_text(page_index)
+            self._texts[page_index] = text
+        return text
+
+    def raw_lines(self, page_index: int) -> list[str]:
+        """Return the page text split on newlines, untouched."""
+        raw_lines = self._raw_lines.get(page_index)
+        if raw_lines is None:
+            raw_lines = self.text(page_index).split('\n')
+            self._raw_lines[page_index] = raw_lines
+        return raw_lines
+
+    def lines(self, page_index: int) -> list[str]:
+        """Return the stripped, non-empty lines of one page."""
+        lines = self._lines.get(page_index)
+        if lines is None:
+            lines = [line.strip() for line in self.raw_lines(page_index) if line.strip()]
+            self._lines[page_index] = lines
+        return lines
+
+    def release(self, page_index: int) -> None:
+        """Forget everything cached for one page, for callers streaming through the document."""
+        self._texts.pop(page_index, None)
+        self._raw_lines.pop(page_index, None)
+        self._lines.pop(page_index, None)
+        for key in [key for key in self._tokens if key[0] == page_index]:
+            del self._tokens[key]
+
+    def tokens(self, page_index: int, lex_line) -> list:
+        """Return the page's stripped lines classified by lex_line, cached per lexer."""
+        key = (page_index, lex_line)
+        tokens = self._tokens.get(key)
+        if tokens is None:
+            tokens = [lex_line(line) for line in self.lines(page_index)]
+            self._tokens[key] = tokens
+        return tokens
@@ -3,122 +3,287 @@
 PDF Invoice Processor - Removes unnecessary information and creates condensed, readable PDFs
 """
 
-import pdfplumber
 from reportlab.lib.pagesizes import letter, A4
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import inch
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, PageBreak, PageTemplate, Frame
+from reportlab.platypus import SimpleDocTemplate, Table, LongTable, TableStyle, Paragraph, Spacer, PageBreak, PageTemplate, Frame
+from reportlab.platypus.flowables import Flowable
 from reportlab.lib import colors
 from reportlab.pdfgen import canvas
 import os
 from datetime import datetime
+from functools import lru_cache
+from io import BytesIO
 import re
 
+import line_lexer
+import metrics
+import text_engines
+from page_text import PageTextCache
+from records import InvoiceProduct
+
+def deterministic_output():
+    """Whether LCBO_DETERMINISTIC_PDF asks for byte-identical renders of identical inputs."""
+    return os.getenv("LCBO_DETERMINISTIC_PDF", "0").lower() in ("1", "true", "yes")
+
+
+# Name of the combined PDF of several invoices (see generate_combined_pdf); kept
+# outside the *_condensed.pdf pattern of per-invoice outputs.
+COMBINED_PDF_FILENAME = "combined_invoices.pdf"
+# Invoices with at least this many products use the large-invoice layout (see _product_table_chunks).
+LARGE_INVOICE_ROWS = int(os.getenv("LCBO_LARGE_INVOICE_ROWS", "500"))
+# Rows per table in the large-invoice layout.
+LARGE_INVOICE_CHUNK_ROWS = 200
+
+# Widths aligned to: Received, Product #, Size, Description, Ordered, Shipped, Display
+# Total width remains unchanged for consistent page layout.
+PRODUCT_COL_WIDTHS = [0.6*inch, 0.8*inch, 0.8*inch, 3.3*inch, 0.7*inch, 0.7*inch, 0.6*inch]
+PRODUCT_HEADER = ['Received', 'Product #', 'Size (mL)', 'Description', 'Ordered', 'Shipped', 'Display']
+ROW_COLORS = [colors.white, colors.HexColor('#F0F0F0')]
+SECTION_COLOR = colors.HexColor('#DCE6F1')
+
+INFO_TABLE_STYLE = TableStyle([
+    ('FONT', (0, 0), (-1, -1), 'Helvetica', 9),
+    ('FONT', (0, 0), (0, -1), 'Helvetica-Bold', 9),
+    ('FONT', (2, 0), (2, -1), 'Helvetica-Bold', 9),
+    ('TEXTCOLOR', (0, 0), (-1, -1), colors.black),
+    ('ROWBACKGROUND', (0, 0), (-1, -1), colors.lightgrey),
+    ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+    ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+    ('LEFTPADDING', (0, 0), (-1, -1), 4),
+    ('RIGHTPADDING', (0, 0), (-1, -1), 4),
+])
+PRODUCT_HEADER_STYLE = [
+    ('FONT', (0, 0), (-1, 0), 'Helvetica-Bold', 9.5),
+    ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#4472C4')),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+]
+PRODUCT_TABLE_STYLE = [
+    ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+    ('ALIGN', (0, 0), (0, -1), 'CENTER'),  # Received column
+    ('ALIGN', (1, 0), (1, -1), 'RIGHT'),   # Product # column
+    ('ALIGN', (2, 0), (2, -1), 'CENTER'),  # Size column
+    ('ALIGN', (6, 0), (6, -1), 'CENTER'),  # Display column
+    ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+    ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+    ('LEFTPADDING', (0, 0), (-1, -1), 3),
+    ('RIGHTPADDING', (0, 0), (-1, -1), 3),
+    ('TOPPADDING', (0, 0), (-1, -1), 2),
+    ('BOTTOMPADDING', (0, 0), (-1, -1), 2),
+]
+
+
+@lru_cache(maxsize=None)
+def paragraph_styles():
+    """Title and footer styles, built once per process."""
+    styles = getSampleStyleSheet()
+    title_style = ParagraphStyle('CustomTitle', parent=styles['Heading1'],
+                                 fontSize=16, textColor=colors.HexColor('#1a1a1a'),
+                                 spaceAfter=10, alignment=1)
+    footer_style = ParagraphStyle('Footer', parent=styles['Normal'],
+                                  fontSize=7, textColor=colors.grey,
+                                  alignment=1)
+    return title_style, footer_style
+
+
+def _section_style(row):
+    """Highlight the fulfillment section title and span across columns."""
+    return [
+        ('SPAN', (0, row), (6, row)),
+        ('FONT', (0, row), (0, row), 'Helvetica-Bold', 9),
+        ('BACKGROUND', (0, row), (6, row), SECTION_COLOR),
+        ('ALIGN', (0, row), (6, row), 'LEFT'),
+    ]
+
+
+_SIZE_ML_RE = re.compile(r'(\d+(?:\.\d+)?)\s*ml\b', re.IGNORECASE)
+_WHOLESALE_SUFFIX_RE = re.compile(r'\s+Wholesale\s+price:.*$', re.IGNORECASE)
+
+
+class NumberedCanvas(canvas.Canvas):
+    """Canvas that stamps "N / total" on every page once the page count is known.
+
+    Page states are held back until save(), so numbering happens inside the
+    single reportlab build instead of a second pass over the written file.
+    restart_page_numbers() starts a new run of numbers, so a combined PDF
+    numbers each invoice's pages on their own.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._saved_page_states = []
+        # Indexes of the pages that start a run of page numbers.
+        self._numbering_starts = [0]
+
+    def showPage(self):
+        self._saved_page_states.append(dict(self.__dict__))
+        self._startPage()
+
+    def restart_page_numbers(self):
+        """Number the current page 1, counting the pages from here to the next restart."""
+        page_index = len(self._saved_page_states)
+        if page_index != self._numbering_starts[-1]:
+            self._numbering_starts.append(page_index)
+
+    def save(self):
+        states = self._saved_page_states
+        bounds = self._numbering_starts + [len(states)]
+        for start, stop in zip(bounds, bounds[1:]):
+            for page_num, state in enumerate(states[start:stop], 1):
+                self.__dict__.update(state)
+                self.draw_page_number(page_num, stop - start)
+                super().showPage()
+        super().save()
+
+    def draw_page_number(self, page_num, total_pages):
+        self.setFont("Helvetica", 9)
+        self.drawRightString(7.75*inch, 10.75*inch, f"{page_num} / {total_pages}")
+
+
+class RestartPageNumbers(Flowable):
+    """Zero-size flowable that restarts NumberedCanvas page numbers on the page it lands on."""
+
+    def wrap(self, availWidth, availHeight):
+        return 0, 0
+
+    def draw(self):
+        self.canv.restart_page_numbers()
+
+
+def condensed_document(output, deterministic):
+    """The page template condensed PDFs are built with."""
+    return SimpleDocTemplate(output, pagesize=letter,
+                             rightMargin=0.5*inch, leftMargin=0.5*inch,
+                             topMargin=0.5*inch, bottomMargin=0.5*inch,
+                             invariant=deterministic)
+
+
+def build_condensed_pdf(story, output_path, deterministic):
+    """Build story into output_path in one pass; return the page count."""
+    # Build into memory so rendering and the disk write are timed separately.
+    buffer = BytesIO()
+    doc = condensed_document(buffer, deterministic)
+    with metrics.span('render'):
+        doc.build(story, canvasmaker=NumberedCanvas)
+    with metrics.span('write'), open(output_path, 'wb') as output_file:
+        output_file.write(buffer.getbuffer())
+    return doc.page
+
+
+def generate_combined_pdf(processors, output_path, deterministic=None):
+    """Render several parsed invoices into one PDF in a single build; return the page count.
+
+    Each invoice starts on a new page with its own header block, and its pages
+    are numbered on their own ("N / total" counts that invoice's pages).
+    """
+    if deterministic is None:
+        deterministic = deterministic_output()
+    story = []
+    for processor in processors:
+        if story:
+            story.append(PageBreak())
+        story.append(RestartPageNumbers())
+        story.extend(processor.condensed_story())
+    return build_condensed_pdf(story, output_path, deterministic)
+
+
+class StripedLongTable(LongTable):
+    """LongTable whose ROWBACKGROUNDS stripes carry on across page breaks.
+
+    When a table splits, reportlab starts each cut ROWBACKGROUNDS run over
+    from its first colour on the next page, which can put two rows of the
+    same colour either side of the break. The continuation's colour cycles
+    are rotated to pick up where the page above left off. Stripe commands
+    must use non-negative row indexes.
+    """
+
+    def split(self, availWidth, availHeight):
+        parts = super().split(availWidth, availHeight)
+        if len(parts) != 2:
+            return parts
+        head, rest = parts
+        moved = head._nrows
+        # The continuation keeps, in order, the runs that end on or after its first row.
+        runs = iter([cmd for cmd in self._bkgrndcmds if cmd[0] == 'ROWBACKGROUNDS' and cmd[2][1] >= moved])
+        for idx, cmd in enumerate(rest._bkgrndcmds):
+            if cmd[0] != 'ROWBACKGROUNDS':
+                continue
+            original = next(runs)
+            cycle = list(original[3])
+            shift = max(0, moved - original[1][1]) % len(cycle)
+            rest._bkgrndcmds[idx] = cmd[:3] + (cycle[shift:] + cycle[:shift],) + cmd[4:]
+        return parts
+
 
 class LCBOInvoiceProcessor:
     """Process LCBO invoices to create condensed, readable PDFs"""
     
-    def __init__(self, pdf_path):
+    def __init__(self, pdf_path, text_engine=None, deterministic=None):
         self.pdf_path = pdf_path
+        # Text extraction engine name (see text_engines); None uses LCBO_TEXT_ENGINE.
+        self.text_engine = text_engine
+        # Leave the generation time and random document ID out of the condensed PDF,
+        # so identical inputs render to identical bytes; None uses LCBO_DETERMINISTIC_PDF.
+        self.deterministic = deterministic_output() if deterministic is None else deterministic
         self.products = []
         self.invoice_info = {}
+        self._pages = None
         # Columns to display in output
         self.columns = ['product_number', 'size_ml', 'description', 'ordered', 'shipped']
 
+    def _page_cache(self, pdf):
+        """Return the page text cache for the open document, creating it on first use."""
+        if self._pages is None or self._pages.document is not pdf:
+            self._pages = PageTextCache(pdf)
+        return self._pages
+
     def _extract_size_ml(self, text):
         """Extract numeric size in mL from a text fragment."""
-        match = re.search(r'(\d+(?:\.\d+)?)\s*ml\b', text, re.IGNORECASE)
+        match = _SIZE_ML_RE.search(text)
         if not match:
             return ''
         value = float(match.group(1))
         return str(int(value)) if value.is_integer() else match.group(1)
 
-    def _extract_case_units(self, lines, start_idx):
+    def _extract_case_units(self, tokens, start_idx):
         """Extract case unit count from nearby lines in new invoice format."""
-        for fwd_idx in range(start_idx + 1, min(start_idx + 10, len(lines))):
-            case_match = re.search(r'\{\s*(\d+)\s+units\s*\}', lines[fwd_idx], re.IGNORECASE)
-            if case_match:
-                return case_match.group(1)
+        for fwd_idx in range(start_idx + 1, min(start_idx + 10, len(tokens))):
+            case_units = tokens[fwd_idx].group('units', 'units_count')
+            if case_units:
+                return case_units
         return ''
 
-    def _parse_fulfilled_by_line(self, line):
-        """Parse a 'Fulfilled by' line and return the supplier label, if present."""
-        fulfilled_match = re.search(r'Fulfilled\s+by:\s*(.+)$', line, re.IGNORECASE)
-        if not fulfilled_match:
-            return ''
-        fulfilled_by = fulfilled_match.group(1).strip()
-        # Trim trailing fulfillment method details to keep the section header concise.
-        fulfilled_by = re.sub(r'\s+Fulfillment\s+method\s*:.*$', '', fulfilled_by, flags=re.IGNORECASE).strip()
-        return fulfilled_by
-
     def _clean_product_name_line(self, line):
         """Strip pricing and noise from a product name line."""
-        cleaned = re.sub(r'\s+Wholesale\s+price:.*$', '', line, flags=re.IGNORECASE).strip()
+        cleaned = _WHOLESALE_SUFFIX_RE.sub('', line).strip()
         return cleaned
 
     def _is_noise_line(self, line):
         """Identify non-description lines in the new invoice format."""
-        if not line:
-            return True
-        lowered = line.lower().strip()
-
-        # Skip pure money lines and document/navigation noise.
-        if re.fullmatch(r'\$[\d,]+(?:\.\d{2})?', lowered):
-            return True
-
-        # Skip standalone date lines like "April 15, 2026".
-        if re.fullmatch(r'(january|february|march|april|may|june|july|august|september|october|november|december)\s+\d{1,2},\s+\d{4}', lowered):
-            return True
-
-        noise_tokens = [
-            'purchasable only by case',
-            'qty. ordered:',
-            'estimated delivery date',
-            'in progress',
-            'unfulfilled',
-            'complete',
-            'fulfilled by:',
-            'fulfillment method:',
-            'order total:',
-            'order information',
-            'delivery option',
-            'delivery address',
-            'billing address',
-            'payment method',
-            'lcbo information',
-            'how the wholesale price is calculated',
-            'status:',
-            'date:',
-            'order #',
-            'print order',
-            'items ordered',
-        ]
-
-        return any(token in lowered for token in noise_tokens)
+        return line_lexer.is_invoice_noise(line)
 
     def _extract_products_new_format(self, pdf):
         """Extract products from the new LCBO web-style invoice format."""
         products = []
         current_fulfilled_by = 'LCBO'
+        pages = self._page_cache(pdf)
 
-        for page in pdf.pages:
-            text = page.extract_text() or ''
-            lines = [line.strip() for line in text.split('\n') if line.strip()]
+        for page_index in range(len(pages)):
+            tokens = pages.tokens(page_index, line_lexer.lex_invoice_line)
 
-            for i, line in enumerate(lines):
-                parsed_fulfilled_by = self._parse_fulfilled_by_line(line)
-                if parsed_fulfilled_by:
-                    current_fulfilled_by = parsed_fulfilled_by
+            for i, token in enumerate(tokens):
+                if token.kind == line_lexer.FULFILLED_BY:
+                    current_fulfilled_by = token.value
                     continue
 
-                lcbo_match = re.search(r'LCBO#:\s*(\d+)\b(.*)$', line, re.IGNORECASE)
-                if not lcbo_match:
+                if token.kind != line_lexer.LCBO_NUMBER:
                     continue
 
-                product_number = lcbo_match.group(1)
-                trailing = lcbo_match.group(2) or ''
+                lcbo_match = token.value
+                product_number = lcbo_match.group('lcbo_number')
+                trailing = token.text[lcbo_match.end():]
                 size_ml = self._extract_size_ml(trailing)
-                case_units = self._extract_case_units(lines, i)
+                case_units = self._extract_case_units(tokens, i)
                 if case_units and size_ml:
                     size_ml = f"{case_units} x {size_ml}"
                 fulfilled_by = current_fulfilled_by
@@ -127,21 +292,21 @@ class LCBOInvoiceProcessor:
                 description_parts = []
 
                 for back_idx in range(max(0, i - 3), i):
-                    candidate = lines[back_idx]
-                    if self._is_noise_line(candidate):
+                    candidate = tokens[back_idx]
+                    if candidate.noise:
                         continue
 
                     # Skip other LCBO lines in case of extraction artifacts.
-                    if 'lcbo#:' in candidate.lower():
+                    if 'lcbo' in candidate.markers:
                         continue
 
-                    cleaned = self._clean_product_name_line(candidate)
+                    cleaned = self._clean_product_name_line(candidate.text)
                     if cleaned:
                         description_parts.append(cleaned)
 
                 # Ensure we include the base name from a line containing Wholesale price.
                 if i - 1 >= 0 and not description_parts:
-                    base_line = self._clean_product_name_line(lines[i - 1])
+                    base_line = self._clean_product_name_line(tokens[i - 1].text)
                     if base_line and not self._is_noise_line(base_line):
                         description_parts.append(base_line)
 
@@ -159,40 +324,27 @@ class LCBOInvoiceProcessor:
                 shipped = 0
 
                 # Qty is typically after LCBO#, but search within a short forward window.
-                for fwd_idx in range(i + 1, min(i + 9, len(lines))):
-                    qty_line = lines[fwd_idx]
-                    qty_match = re.search(r'Qty\.\s*Ordered:\s*(\d+)(?:\s*\|\s*Fulfilled:\s*(\d+))?', qty_line, re.IGNORECASE)
+                for fwd_idx in range(i + 1, min(i + 9, len(tokens))):
+                    qty_match = tokens[fwd_idx].first('qty')
                     if qty_match:
-                        ordered = int(qty_match.group(1))
-                        if qty_match.group(2) is not None:
-                            shipped = int(qty_match.group(2))
+                        ordered = int(qty_match.group('qty_ordered'))
+                        if qty_match.group('qty_fulfilled') is not None:
+                            shipped = int(qty_match.group('qty_fulfilled'))
                         else:
                             # Fulfilled quantity is absent in most new-format rows.
                             # Keep parity with prior output behavior by defaulting shipped to ordered.
                             shipped = ordered
                         break
 
-                product = {
-                    'product_number': product_number,
-                    'size_ml': size_ml,
-                    'description': description,
-                    'dep': '',
-                    'ordered': ordered,
-                    'shipped': shipped,
-                    'fulfilled_by': fulfilled_by,
-                }
-                products.append(product)
+                products.append(InvoiceProduct(
+                    product_number, size_ml, description, ordered=ordered, shipped=shipped, fulfilled_by=fulfilled_by,
+                ))
 
         # Remove accidental duplicates by product number + description + ordered.
         unique_products = []
         seen_keys = set()
         for product in products:
-            key = (
-                product['product_number'],
-                product['description'],
-                product['ordered'],
-                product.get('fulfilled_by', ''),
-            )
+            key = (product.product_number, product.description, product.ordered, product.fulfilled_by)
             if key in seen_keys:
                 continue
             seen_keys.add(key)
@@ -202,9 +354,8 @@ class LCBOInvoiceProcessor:
         
     def extract_invoice_info(self, pdf):
         """Extract invoice metadata"""
-        first_page = pdf.pages[0]
-        text = first_page.extract_text() or ''
-        full_text = '\n'.join((page.extract_text() or '') for page in pdf.pages)
+        pages = self._page_cache(pdf)
+        text = pages.text(0)
         
         # Extract order number
         order_match = re.search(r'ORDER #\s*(\d+)', text, re.IGNORECASE)
@@ -224,7 +375,7 @@ class LCBOInvoiceProcessor:
             self.invoice_info['customer_number'] = customer_match.group(1) if customer_match else 'N/A'
         
         # Extract customer name - look for text after "SOLD TO RECIPIENT"
-        lines = text.split('\n')
+        lines = pages.raw_lines(0)
         customer_name = None
         for i, line in enumerate(lines):
             if 'SOLD TO' in line and 'RECIPIENT' in line:
@@ -237,7 +388,7 @@ class LCBOInvoiceProcessor:
 
         # New format fallback: use first name under Delivery Address in the order summary section.
         if not customer_name:
-            full_lines = [line.strip() for line in full_text.split('\n') if line.strip()]
+            full_lines = [line for page_index in range(len(pages)) for line in pages.lines(page_index)]
             for i, line in enumerate(full_lines):
                 if line.lower() == 'delivery address' and i + 1 < len(full_lines):
                     candidate = full_lines[i + 1].strip()
@@ -250,13 +401,50 @@ class LCBOInvoiceProcessor:
         # Extract HST info
         hst_match = re.search(r'HST (\d+)%', text)
         self.invoice_info['hst_percent'] = hst_match.group(1) if hst_match else '13'
+
+        # Record the detected layout so the parser choice can be audited.
+        self.invoice_info['format'] = self.detect_format(pdf)
         
+    def detect_format(self, pdf):
+        """Sniff the invoice layout from cheap markers on the first page.
+
+        Returns 'legacy' for the tabular PRODUCT #/SIZE (mL) layout, 'web' for the
+        LCBO#:/Qty. Ordered: block layout, or 'unknown' when neither marker is found.
+        """
+        pages = self._page_cache(pdf)
+        if not len(pages):
+            return 'unknown'
+
+        for line in pages.raw_lines(0):
+            if 'PRODUCT #' in line and 'SIZE (mL)' in line:
+                return 'legacy'
+
+        text = pages.text(0)
+        if re.search(r'LCBO#:', text, re.IGNORECASE) or re.search(r'Qty\.\s*Ordered:', text, re.IGNORECASE):
+            return 'web'
+
+        return 'unknown'
+
     def extract_products(self, pdf):
         """Extract product information from all pages"""
-        # First, try the legacy tabular parser.
-        for page_num, page in enumerate(pdf.pages):
-            text = page.extract_text()
-            lines = text.split('\n')
+        invoice_format = self.invoice_info.get('format') or self.detect_format(pdf)
+
+        if invoice_format == 'web':
+            self.products = self._extract_products_new_format(pdf)
+            return
+
+        self._extract_products_legacy(pdf)
+
+        # Unrecognized layouts keep the old behavior: fall back to the web-style parser.
+        if not self.products and invoice_format == 'unknown':
+            self.products = self._extract_products_new_format(pdf)
+
+    def _extract_products_legacy(self, pdf):
+        """Extract products from the legacy tabular invoice format."""
+        pages = self._page_cache(pdf)
+
+        for page_num in range(len(pages)):
+            lines = pages.raw_lines(page_num)
             
             in_products_section = False
             used_lines = set()  # Track which lines we've already used
@@ -340,10 +528,6 @@ class LCBOInvoiceProcessor:
                         if product:
                             self.products.append(product)
                         used_lines.add(i)
-
-        # Fallback: new web-style invoice format (LCBO#: / Qty. Ordered blocks).
-        if not self.products:
-            self.products = self._extract_products_new_format(pdf)
     
     def parse_product_line(self, line, preceding_desc="", following_desc=""):
         """Parse a product line from invoice"""
@@ -354,26 +538,19 @@ class LCBOInvoiceProcessor:
             return None
         
         try:
-            product = {
-                'product_number': parts[0],
-                'size_ml': '',
-                'description': '',
-                'dep': '',
-                'ordered': 0,
-                'shipped': 0,
-                'fulfilled_by': ''
-            }
-            
+            dep = ''
+            ordered = 0
+            shipped = 0
+
             # Size is in parts[1], may be single number or "X x YYY" format
-            size_parts = []
             size_end_idx = 1
             
             # Handle "x" in sizes (e.g., "8 x 355")
             if len(parts) > 2 and parts[2] == 'x':
-                product['size_ml'] = f"{parts[1]} x {parts[3]}"
+                size_ml = f"{parts[1]} x {parts[3]}"
                 size_end_idx = 4
             else:
-                product['size_ml'] = parts[1]
+                size_ml = parts[1]
                 size_end_idx = 2
             
             # Now extract description - goes until we hit DEP value
@@ -386,7 +563,7 @@ class LCBOInvoiceProcessor:
                     val = float(parts[i])
                     # Check if this is likely a DEP value (0.05 to 3.0)
                     if 0.05 < val < 3.0:
-                        product['dep'] = parts[i]
+                        dep = parts[i]
                         dep_idx = i
                         break
                 except ValueError:
@@ -405,17 +582,17 @@ class LCBOInvoiceProcessor:
             if following_desc:
                 description_parts.append(following_desc.strip())
             
-            product['description'] = ' '.join(description_parts) if description_parts else 'Unknown'
+            description = ' '.join(description_parts) if description_parts else 'Unknown'
             
             # After DEP, we should have: ORDERED SHIPPED [RETAIL DISCOUNT EXTENDED]
             if dep_idx >= 0 and dep_idx + 2 < len(parts):
                 try:
-                    product['ordered'] = int(float(parts[dep_idx + 1]))
-                    product['shipped'] = int(float(parts[dep_idx + 2]))
+                    ordered = int(float(parts[dep_idx + 1]))
+                    shipped = int(float(parts[dep_idx + 2]))
                 except (ValueError, IndexError):
                     pass
             
-            return product
+            return InvoiceProduct(parts[0], size_ml, description, dep, ordered, shipped)
         except Exception as e:
             return None
     
@@ -427,26 +604,101 @@ class LCBOInvoiceProcessor:
     
     def process(self):
         """Process the PDF"""
-        with pdfplumber.open(self.pdf_path) as pdf:
+        with metrics.span('parse'), text_engines.open_document(self.pdf_path, self.text_engine) as pdf:
             self.extract_invoice_info(pdf)
             self.extract_products(pdf)
+            metrics.count('pages', len(pdf))
+        metrics.count('rows', len(self.products))
         
         return self.invoice_info, self.products
     
+    def _product_table(self, products_data, section_rows, data_row_products):
+        """The products as one table, styled row by row."""
+        products_table = Table(products_data, colWidths=PRODUCT_COL_WIDTHS)
+        
+        # Build table style with alternating row colors
+        table_styles = PRODUCT_HEADER_STYLE + [('FONT', (0, 1), (-1, -1), 'Helvetica', 9)] + PRODUCT_TABLE_STYLE
+        
+        # Add alternating row colors and make rows bold where Ordered != Shipped
+        sections = set(section_rows)
+        data_row_idx = 0
+        for row_idx in range(1, len(products_data)):
+            if row_idx in sections:
+                table_styles.extend(_section_style(row_idx))
+                continue
+
+            # Alternating background colors for item rows only.
+            table_styles.append(('BACKGROUND', (0, row_idx), (-1, row_idx), ROW_COLORS[data_row_idx % 2]))
+
+            # Make row bold if Ordered != Shipped.
+            product = data_row_products[data_row_idx]
+            if product.ordered != product.shipped:
+                table_styles.append(('FONT', (0, row_idx), (-1, row_idx), 'Helvetica-Bold', 7.5))
+
+            data_row_idx += 1
+        
+        products_table.setStyle(TableStyle(table_styles))
+        return products_table
+
+    def _product_table_chunks(self, products_data, section_rows, data_row_products):
+        """The products as a run of LongTables of LARGE_INVOICE_CHUNK_ROWS rows each.
+
+        Splitting a table at a page break re-lays out every row after the break,
+        so with one table a long invoice costs time quadratic in its length;
+        chunks bound that work. Stripes are ROWBACKGROUNDS over each run of
+        item rows and bold rows are styled a run at a time, so the number of
+        style commands follows the sections rather than the rows.
+        """
+        sections = set(section_rows)
+        tables = []
+        data_row_idx = 0
+        for chunk_start in range(0, len(products_data), LARGE_INVOICE_CHUNK_ROWS):
+            rows = products_data[chunk_start:chunk_start + LARGE_INVOICE_CHUNK_ROWS]
+            first_item_row = 1 if chunk_start == 0 else 0
+            table_styles = (PRODUCT_HEADER_STYLE if chunk_start == 0 else []) + [
+                ('FONT', (0, first_item_row), (-1, -1), 'Helvetica', 9)] + PRODUCT_TABLE_STYLE
+
+            stripe_start = bold_start = None
+            # One step past the last row closes any open runs.
+            for row in range(first_item_row, len(rows) + 1):
+                is_item = row < len(rows) and chunk_start + row not in sections
+                bold = False
+                if is_item:
+                    if stripe_start is None:
+                        stripe_start = row
+                        phase = data_row_idx % 2
+                    product = data_row_products[data_row_idx]
+                    bold = product.ordered != product.shipped
+                    data_row_idx += 1
+                elif stripe_start is not None:
+                    table_styles.append(('ROWBACKGROUNDS', (0, stripe_start), (-1, row - 1),
+                                         ROW_COLORS[phase:] + ROW_COLORS[:phase]))
+                    stripe_start = None
+
+                if bold and bold_start is None:
+                    bold_start = row
+                elif not bold and bold_start is not None:
+                    table_styles.append(('FONT', (0, bold_start), (-1, row - 1), 'Helvetica-Bold', 7.5))
+                    bold_start = None
+
+                if row < len(rows) and not is_item:
+                    table_styles.extend(_section_style(row))
+
+            table = StripedLongTable(rows, colWidths=PRODUCT_COL_WIDTHS)
+            table.setStyle(TableStyle(table_styles))
+            tables.append(table)
+        return tables
+
     def generate_condensed_pdf(self, output_path):
         """Generate a condensed, readable PDF"""
-        doc = SimpleDocTemplate(output_path, pagesize=letter,
-                              rightMargin=0.5*inch, leftMargin=0.5*inch,
-                              topMargin=0.5*inch, bottomMargin=0.5*inch)
-        
-        styles = getSampleStyleSheet()
+        build_condensed_pdf(self.condensed_story(), output_path, self.deterministic)
+
+    def condensed_story(self):
+        """Flowables of the condensed invoice: header block, products table and footer"""
+        title_style, footer_style = paragraph_styles()
         story = []
         
         # Title and invoice info
-        title_style = ParagraphStyle('CustomTitle', parent=styles['Heading1'],
-                                     fontSize=16, textColor=colors.HexColor('#1a1a1a'),
-                                     spaceAfter=10, alignment=1)
-        
         story.append(Paragraph("LCBO INVOICE SUMMARY", title_style))
         story.append(Spacer(1, 0.15*inch))
         
@@ -459,17 +711,7 @@ class LCBOInvoiceProcessor:
         ]
         
         info_table = Table(info_data, colWidths=[1.2*inch, 2*inch, 1*inch, 1.8*inch])
-        info_table.setStyle(TableStyle([
-            ('FONT', (0, 0), (-1, -1), 'Helvetica', 9),
-            ('FONT', (0, 0), (0, -1), 'Helvetica-Bold', 9),
-            ('FONT', (2, 0), (2, -1), 'Helvetica-Bold', 9),
-            ('TEXTCOLOR', (0, 0), (-1, -1), colors.black),
-            ('ROWBACKGROUND', (0, 0), (-1, -1), colors.lightgrey),
-            ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
-            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-            ('LEFTPADDING', (0, 0), (-1, -1), 4),
-            ('RIGHTPADDING', (0, 0), (-1, -1), 4),
-        ]))
+        info_table.setStyle(INFO_TABLE_STYLE)
         
         story.append(info_table)
         story.append(Spacer(1, 0.15*inch))
@@ -478,14 +720,14 @@ class LCBOInvoiceProcessor:
         grouped_products = {}
         group_order = []
         for product in self.products:
-            fulfilled_by = (product.get('fulfilled_by') or '').strip() or 'LCBO'
+            fulfilled_by = (product.fulfilled_by or '').strip() or 'LCBO'
             if fulfilled_by not in grouped_products:
                 grouped_products[fulfilled_by] = []
                 group_order.append(fulfilled_by)
             grouped_products[fulfilled_by].append(product)
 
         # Products table - grouped by fulfillment source
-        products_data = [['Received', 'Product #', 'Size (mL)', 'Description', 'Ordered', 'Shipped', 'Display']]
+        products_data = [list(PRODUCT_HEADER)]
 
         section_rows = []
         data_row_products = []
@@ -495,122 +737,34 @@ class LCBOInvoiceProcessor:
 
             sorted_group_products = sorted(
                 grouped_products[fulfilled_by],
-                key=lambda p: (p.get('description', '').lower(), p.get('product_number', ''))
+                key=lambda p: (p.description.lower(), p.product_number)
             )
 
             for product in sorted_group_products:
                 data_row_products.append(product)
                 products_data.append([
                     '',  # Received checkbox/input left empty
-                    product['product_number'],
-                    product['size_ml'],
-                    product['description'],  # Full description, no truncation
-                    str(product['ordered']),
-                    str(product['shipped']),
+                    product.product_number,
+                    product.size_ml,
+                    product.description,  # Full description, no truncation
+                    str(product.ordered),
+                    str(product.shipped),
                     '',  # Display value left empty
                 ])
         
-        # Create products table with appropriate column widths
-        # Widths aligned to: Received, Product #, Size, Description, Ordered, Shipped, Display
-        # Total width remains unchanged for consistent page layout.
-        col_widths = [0.6*inch, 0.8*inch, 0.8*inch, 3.3*inch, 0.7*inch, 0.7*inch, 0.6*inch]
-        products_table = Table(products_data, colWidths=col_widths)
-        
-        # Build table style with alternating row colors
-        table_styles = [
-            ('FONT', (0, 0), (-1, 0), 'Helvetica-Bold', 9.5),
-            ('FONT', (0, 1), (-1, -1), 'Helvetica', 9),
-            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#4472C4')),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('ALIGN', (0, 0), (0, -1), 'CENTER'),  # Received column
-            ('ALIGN', (1, 0), (1, -1), 'RIGHT'),   # Product # column
-            ('ALIGN', (2, 0), (2, -1), 'CENTER'),  # Size column
-            ('ALIGN', (6, 0), (6, -1), 'CENTER'),  # Display column
-            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-            ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
-            ('LEFTPADDING', (0, 0), (-1, -1), 3),
-            ('RIGHTPADDING', (0, 0), (-1, -1), 3),
-            ('TOPPADDING', (0, 0), (-1, -1), 2),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 2),
-        ]
-        
-        # Add alternating row colors and make rows bold where Ordered != Shipped
-        data_row_idx = 0
-        for row_idx in range(1, len(products_data)):
-            if row_idx in section_rows:
-                # Highlight the fulfillment section title and span across columns.
-                table_styles.append(('SPAN', (0, row_idx), (6, row_idx)))
-                table_styles.append(('FONT', (0, row_idx), (0, row_idx), 'Helvetica-Bold', 9))
-                table_styles.append(('BACKGROUND', (0, row_idx), (6, row_idx), colors.HexColor('#DCE6F1')))
-                table_styles.append(('ALIGN', (0, row_idx), (6, row_idx), 'LEFT'))
-                continue
-
-            # Alternating background colors for item rows only.
-            if data_row_idx % 2 == 0:
-                table_styles.append(('BACKGROUND', (0, row_idx), (-1, row_idx), colors.white))
-            else:
-                table_styles.append(('BACKGROUND', (0, row_idx), (-1, row_idx), colors.HexColor('#F0F0F0')))
-
-            # Make row bold if Ordered != Shipped.
-            product = data_row_products[data_row_idx]
-            if product['ordered'] != product['shipped']:
-                table_styles.append(('FONT', (0, row_idx), (-1, row_idx), 'Helvetica-Bold', 7.5))
-
-            data_row_idx += 1
-        
-        products_table.setStyle(TableStyle(table_styles))
-        
-        story.append(products_table)
+        if len(data_row_products) >= LARGE_INVOICE_ROWS:
+            story.extend(self._product_table_chunks(products_data, section_rows, data_row_products))
+        else:
+            story.append(self._product_table(products_data, section_rows, data_row_products))
         story.append(Spacer(1, 0.2*inch))
         
         # Footer
         totals = self.calculate_totals()
-        footer_style = ParagraphStyle('Footer', parent=styles['Normal'],
-                                      fontSize=7, textColor=colors.grey,
-                                      alignment=1)
-        story.append(Paragraph(
-            f"Generated on {datetime.now().strftime('%B %d, %Y at %I:%M %p')}<br/>"
-            f"Total items: {totals['item_count']}",
-            footer_style
-        ))
-        
-        doc.build(story)
-        
-        # Add page numbers using PyPDF2
-        try:
-            from PyPDF2 import PdfReader, PdfWriter
-            from reportlab.pdfgen import canvas as pdfcanvas
-            from io import BytesIO
-            
-            # Read the generated PDF
-            reader = PdfReader(output_path)
-            writer = PdfWriter()
-            total_pages = len(reader.pages)
-            
-            # Add page numbers to each page
-            for page_num, page in enumerate(reader.pages, 1):
-                # Create a new page with the page number
-                packet = BytesIO()
-                can = pdfcanvas.Canvas(packet, pagesize=letter)
-                can.setFont("Helvetica", 9)
-                can.drawRightString(7.75*inch, 10.75*inch, f"{page_num} / {total_pages}")
-                can.save()
-                
-                # Read the overlay
-                packet.seek(0)
-                overlay = PdfReader(packet)
-                overlay_page = overlay.pages[0]
-                
-                # Merge with original page
-                page.merge_page(overlay_page)
-                writer.add_page(page)
-            
-            # Write out the final PDF
-            with open(output_path, 'wb') as f:
-                writer.write(f)
-        except Exception as e:
-            pass  # If page number addition fails, continue with PDF without page numbers
+        footer_text = f"Total items: {totals['item_count']}"
+        if not self.deterministic:
+            footer_text = f"Generated on {datetime.now().strftime('%B %d, %Y at %I:%M %p')}<br/>{footer_text}"
+        story.append(Paragraph(footer_text, footer_style))
+        return story
 
 
 def main():
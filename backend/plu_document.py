@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+PLU list document model shared by the step 1 SKU export and the profit CSV.
+
+A PLU PDF is opened and lexed once into PluDocument.records (one PluRecord
+per parsed row, in document order); vendor SKUs and profit-sorted rows are both
+derived from those records without touching the PDF again. iter_records()
+yields the same records page by page for callers that do not need to keep
+them, so memory stays flat on long lists.
+
+Long lists can also be parsed in parallel: parse_page_range() handles one
+slice of pages on its own and merge_page_ranges() stitches the slices back
+into exactly the records a serial parse gives.
+"""
+
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import line_lexer
+import metrics
+import text_engines
+from page_text import PageTextCache
+from records import PluRecord
+
+RECORD_FIELDS = list(PluRecord.__slots__)
+
+
+def _stitch_rows(tokens, current_row: str, row_texts: list[str], orphans: list[str] | None = None) -> str:
+    """Add the rows completed by one page's tokens to row_texts and return the row still open.
+
+    Continuation lines seen before any row has started are dropped, or kept
+    in orphans when the caller may own the row they belong to.
+    """
+    for token in tokens:
+        if token.kind in (line_lexer.NOISE, line_lexer.SECTION_HEADING):
+            continue
+
+        if token.kind == line_lexer.PLU_ROW_START:
+            if current_row:
+                row_texts.append(current_row)
+            current_row = token.text
+        elif current_row:
+            current_row = f'{current_row} {token.text}'
+        elif orphans is not None:
+            orphans.append(token.text)
+    return current_row
+
+
+def iter_page_records(pages: PageTextCache):
+    """Yield a list of parsed records per page, in document order.
+
+    Wrapped continuation lines are stitched onto their row, including across
+    a page break: a row is only complete once the next one starts, so it is
+    returned with the page it ends on. Each page is released after parsing.
+    """
+    current_row = ''
+    last_page = len(pages) - 1
+    for page_index in range(len(pages)):
+        with metrics.span('parse'):
+            row_texts = []
+            tokens = pages.tokens(page_index, line_lexer.lex_plu_line)
+            current_row = _stitch_rows(tokens, current_row, row_texts)
+            if page_index == last_page and current_row:
+                row_texts.append(current_row)
+            records = [record for record in map(parse_row, row_texts) if record]
+
+        pages.release(page_index)
+        metrics.count('pages')
+        metrics.count('rows', len(records))
+        yield records
+
+
+def iter_records(pdf_path: str, text_engine: str | None = None):
+    """Yield the parsed records of a PLU PDF one at a time, reading a page at a time."""
+    with text_engines.open_document(pdf_path, text_engine) as document:
+        for records in iter_page_records(PageTextCache(document)):
+            yield from records
+
+
+def page_ranges(page_count: int, max_ranges: int, min_pages: int = 1) -> list[tuple[int, int]]:
+    """Split pages into at most max_ranges contiguous [start, stop) ranges of min_pages or more."""
+    range_count = max(1, min(max_ranges, page_count // max(1, min_pages)))
+    bounds = [page_count * index // range_count for index in range(range_count + 1)]
+    return [(start, stop) for start, stop in zip(bounds, bounds[1:]) if stop > start] or [(0, page_count)]
+
+
+def parse_page_range(pdf_path: str, start: int, stop: int, text_engine: str | None = None) -> dict:
+    """Parse pages [start, stop) without knowing the rest of the document.
+
+    Returns the continuation lines before the first row start ("orphans",
+    which belong to a row opened on an earlier page), the records of rows
+    that start and end inside the range, and the row still open at the end
+    ("tail", None when no row starts in the range).
+    """
+    orphans: list[str] = []
+    row_texts: list[str] = []
+    current_row = ''
+    with text_engines.open_document(pdf_path, text_engine) as document:
+        pages = PageTextCache(document)
+        for page_index in range(start, min(stop, len(pages))):
+            with metrics.span('parse'):
+                tokens = pages.tokens(page_index, line_lexer.lex_plu_line)
+                current_row = _stitch_rows(tokens, current_row, row_texts, orphans)
+            pages.release(page_index)
+            metrics.count('pages')
+
+    with metrics.span('parse'):
+        records = [record for record in map(parse_row, row_texts) if record]
+    return {"orphans": orphans, "records": records, "tail": current_row or None}
+
+
+def merge_page_ranges(parts: list[dict]) -> list[PluRecord]:
+    """Stitch parse_page_range() results, in page order, into the serial parse's records."""
+    records: list[PluRecord] = []
+    open_row = ''
+    for part in parts:
+        if open_row and part["orphans"]:
+            open_row = ' '.join([open_row, *part["orphans"]])
+        if part["tail"] is None:
+            # No row starts in this range, so the open row runs on through it.
+            continue
+        if open_row and (record := parse_row(open_row)):
+            records.append(record)
+        records.extend(part["records"])
+        open_row = part["tail"]
+
+    if open_row and (record := parse_row(open_row)):
+        records.append(record)
+    metrics.count('rows', len(records))
+    return records
+
+
+def parse_parallel(
+    pdf_path: str, workers: int, text_engine: str | None = None, min_pages: int = 1
+) -> list[PluRecord]:
+    """Parse a PLU PDF in page ranges across worker processes; same records as a serial parse."""
+    ranges = page_ranges(text_engines.page_count(pdf_path, text_engine), workers, min_pages)
+    if len(ranges) == 1:
+        return list(iter_records(pdf_path, text_engine))
+
+    with ProcessPoolExecutor(max_workers=len(ranges)) as executor:
+        futures = [executor.submit(parse_page_range, pdf_path, start, stop, text_engine) for start, stop in ranges]
+        return merge_page_ranges([future.result() for future in futures])
+
+
+def iter_vendor_skus(records):
+    """Vendor SKUs of every record that has one, in order."""
+    for record in records:
+        if record.vendor_sku is not None:
+            yield record.vendor_sku
+
+
+def iter_profit_rows(records):
+    """The records with a description and vendor SKU, in order (records are never modified, so not copied)."""
+    for record in records:
+        if record.vendor_sku is not None and record.description:
+            yield record
+
+
+def sort_by_profit(rows) -> list[PluRecord]:
+    """Rows as a list sorted by %Profit (low to high)."""
+    rows = list(rows)
+    rows.sort(key=lambda row: row.profit_percent_value)
+    return rows
+
+
+def parse_row(row_text: str) -> PluRecord | None:
+    """Split a stitched PLU row into RECORD_FIELDS.
+
+    vendor_sku is None when the row has no 5-6 digit SKU token, in which case
+    description holds nothing and label is empty.
+    """
+    row_text = line_lexer.normalize_plu_row_text(row_text)
+    match = line_lexer.PLU_ROW_RE.match(row_text)
+    if not match:
+        return None
+
+    tokens = match.group('body').strip().split()
+    if not tokens:
+        return None
+
+    vendor_index = None
+    for idx in range(len(tokens) - 1, -1, -1):
+        if line_lexer.VENDOR_SKU_RE.fullmatch(tokens[idx]):
+            vendor_index = idx
+            break
+
+    if vendor_index is None:
+        description, vendor_sku, label = '', None, ''
+    else:
+        description = ' '.join(tokens[:vendor_index]).strip()
+        vendor_sku = tokens[vendor_index]
+        # Labels repeat ("EA", "CS"), so rows share one string per label.
+        label = sys.intern(' '.join(tokens[vendor_index + 1:]).strip())
+
+    return PluRecord(
+        match.group('plu'),
+        description,
+        vendor_sku,
+        label,
+        match.group('price'),
+        match.group('cost'),
+        match.group('profit'),
+        match.group('profit_percent'),
+    )
+
+
+class PluDocument:
+    """Parsed rows of one PLU list PDF."""
+
+    def __init__(self, records: list[PluRecord]):
+        self.records = records
+
+    @classmethod
+    def from_pdf(cls, pdf_path: str, text_engine: str | None = None, workers: int = 1) -> 'PluDocument':
+        """Parse a PLU PDF, splitting it into page ranges across processes when workers > 1."""
+        if workers > 1:
+            return cls(parse_parallel(pdf_path, workers, text_engine))
+        return cls(list(iter_records(pdf_path, text_engine)))
+
+    def vendor_skus(self) -> list[str]:
+        """Vendor SKUs of every row that has one, in document order."""
+        return list(iter_vendor_skus(self.records))
+
+    def profit_rows(self) -> list[PluRecord]:
+        """Rows with a description and vendor SKU, sorted by %Profit (low to high)."""
+        return sort_by_profit(iter_profit_rows(self.records))
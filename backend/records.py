@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Compact record types for parsed invoice products and PLU list rows.
+
+Long PLU lists and batch runs hold many thousands of rows, and with a dict
+per row the dict overhead dominated memory. These classes use __slots__ and
+keep numeric fields as numbers: quantities as ints, money and percentages as
+integer hundredths. to_dict() gives back exactly the values the parsers used
+to produce, so JSON payloads, cached results and CSVs are unchanged. A value
+whose text would not come back identically (say "1234.50" without a
+thousands separator) is kept as the original string.
+"""
+
+
+def to_hundredths(text, grouping=True):
+    """Return a decimal string such as "1,234.56" as integer hundredths, or text unchanged.
+
+    Only text that format_hundredths() reproduces exactly is converted.
+    """
+    if not text or not isinstance(text, str):
+        return text
+    negative = text.startswith('-')
+    whole, dot, fraction = text[negative:].partition('.')
+    if not dot or len(fraction) != 2:
+        return text
+    try:
+        value = int(whole.replace(',', '') if grouping else whole) * 100 + int(fraction)
+    except ValueError:
+        return text
+    value = -value if negative else value
+    return value if format_hundredths(value, grouping) == text else text
+
+
+def format_hundredths(value, grouping=True):
+    """Inverse of to_hundredths(): integer hundredths back to text; anything else as is."""
+    if not isinstance(value, int):
+        return value
+    whole, fraction = divmod(abs(value), 100)
+    whole_text = f'{whole:,}' if grouping else str(whole)
+    return f"{'-' if value < 0 else ''}{whole_text}.{fraction:02d}"
+
+
+class _Record:
+    """Equality, repr and dict construction shared by the record types."""
+
+    __slots__ = ()
+
+    @classmethod
+    def from_dict(cls, values: dict):
+        return cls(**values)
+
+    def _values(self) -> tuple:
+        return tuple(getattr(self, name) for name in self.__slots__)
+
+    def __eq__(self, other):
+        if type(other) is not type(self):
+            return NotImplemented
+        return self._values() == other._values()
+
+    __hash__ = None
+
+    def __repr__(self):
+        fields = ', '.join(f'{name}={value!r}' for name, value in zip(self.__slots__, self._values()))
+        return f'{type(self).__name__}({fields})'
+
+
+class InvoiceProduct(_Record):
+    """One product line of an LCBO invoice."""
+
+    __slots__ = ('product_number', 'size_ml', 'description', 'dep', 'ordered', 'shipped', 'fulfilled_by')
+
+    def __init__(self, product_number, size_ml='', description='', dep='', ordered=0, shipped=0, fulfilled_by=''):
+        self.product_number = product_number
+        self.size_ml = size_ml
+        self.description = description
+        # Bottle deposit, e.g. "0.20"; empty on web-format invoices.
+        self.dep = to_hundredths(dep)
+        self.ordered = ordered
+        self.shipped = shipped
+        self.fulfilled_by = fulfilled_by
+
+    def to_dict(self) -> dict:
+        return {
+            'product_number': self.product_number,
+            'size_ml': self.size_ml,
+            'description': self.description,
+            'dep': format_hundredths(self.dep),
+            'ordered': self.ordered,
+            'shipped': self.shipped,
+            'fulfilled_by': self.fulfilled_by,
+        }
+
+
+class PluRecord(_Record):
+    """One parsed row of a PLU list; vendor_sku is None when the row has none."""
+
+    __slots__ = ('plu', 'description', 'vendor_sku', 'label', 'price', 'cost', 'profit', 'profit_percent')
+
+    def __init__(self, plu, description, vendor_sku, label, price, cost, profit, profit_percent):
+        self.plu = plu
+        self.description = description
+        self.vendor_sku = vendor_sku
+        self.label = label
+        self.price = to_hundredths(price)
+        self.cost = to_hundredths(cost)
+        self.profit = to_hundredths(profit)
+        self.profit_percent = to_hundredths(profit_percent, grouping=False)
+
+    @property
+    def profit_percent_value(self) -> float:
+        """%Profit as a float (the same value float() gives for the original text)."""
+        if isinstance(self.profit_percent, int):
+            return self.profit_percent / 100
+        return float(self.profit_percent)
+
+    def to_row(self) -> tuple:
+        """Field values in column order, as text."""
+        return (
+            self.plu,
+            self.description,
+            self.vendor_sku,
+            self.label,
+            format_hundredths(self.price),
+            format_hundredths(self.cost),
+            format_hundredths(self.profit),
+            format_hundredths(self.profit_percent, grouping=False),
+        )
+
+    def to_dict(self) -> dict:
+        return dict(zip(self.__slots__, self.to_row()))
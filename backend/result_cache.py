@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+Content-hash cache for parsed documents and generated outputs.
+
+Entries are keyed by document kind, PARSER_VERSION and the SHA-256 of the
+uploaded bytes, so re-uploads of the same PDF skip parsing and rendering.
+A bounded in-memory LRU of payloads sits in front of a disk tier that holds
+the payload JSON plus any rendered artifacts and is evicted by total size.
+"""
+
+import itertools
+import json
+import os
+import shutil
+import threading
+import uuid
+from collections import OrderedDict
+from pathlib import Path
+
+# Bump whenever a parser or renderer change alters cached output.
+PARSER_VERSION = "2"
+
+PAYLOAD_FILENAME = "payload.json"
+
+
+class ResultCache:
+    """Two-tier (memory LRU + size-bounded disk) result cache."""
+
+    def __init__(self, cache_dir: str | Path, max_memory_entries: int = 256, max_disk_bytes: int = 512 * 1024 * 1024):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_bytes = max_disk_bytes
+
+        # key -> {"payload": ..., "artifacts": [...]}, least recently used first.
+        self._memory: OrderedDict[str, dict] = OrderedDict()
+        # key -> bytes on disk, least recently used first.
+        self._disk: OrderedDict[str, int] = OrderedDict()
+        self._disk_bytes = 0
+        # key -> number of the put that wrote the disk entry, so a failed read
+        # outside the lock only discards the entry it actually read.
+        self._generations: dict[str, int] = {}
+        self._next_generation = itertools.count()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.evictions = 0
+
+        self._load_disk_index()
+
+    @staticmethod
+    def make_key(kind: str, digest: str) -> str:
+        return f"{kind}-v{PARSER_VERSION}-{digest}"
+
+    def _load_disk_index(self) -> None:
+        """Index existing disk entries once, oldest access first."""
+        entries = []
+        for entry_dir in self.cache_dir.iterdir():
+            payload_path = entry_dir / PAYLOAD_FILENAME
+            # Drop leftovers from interrupted writes (staging directories start with a dot).
+            if entry_dir.name.startswith('.') or not entry_dir.is_dir() or not payload_path.exists():
+                shutil.rmtree(entry_dir, ignore_errors=True)
+                continue
+            size = sum(path.stat().st_size for path in entry_dir.iterdir() if path.is_file())
+            entries.append((payload_path.stat().st_mtime, entry_dir.name, size))
+
+        for _, key, size in sorted(entries):
+            self._disk[key] = size
+            self._disk_bytes += size
+            self._generations[key] = next(self._next_generation)
+        self._evict_disk()
+
+    def _evict_disk(self) -> None:
+        while self._disk and self._disk_bytes > self.max_disk_bytes:
+            key, size = self._disk.popitem(last=False)
+            self._disk_bytes -= size
+            self._memory.pop(key, None)
+            self._generations.pop(key, None)
+            shutil.rmtree(self.cache_dir / key, ignore_errors=True)
+            self.evictions += 1
+
+    def _remember(self, key: str, entry: dict) -> None:
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    def get(self, kind: str, digest: str, artifact_targets: dict[str, Path] | None = None):
+        """Return the cached payload, copying named artifacts to their targets.
+
+        Returns None on a miss, including when a requested artifact is missing.
+        """
+        key = self.make_key(kind, digest)
+        artifact_targets = artifact_targets or {}
+
+        with self._lock:
+            if key not in self._disk:
+                self.misses += 1
+                return None
+            entry = self._memory.get(key)
+            generation = self._generations[key]
+
+        # Payload reads and artifact copies happen outside the lock so lookups and
+        # puts are not serialized behind them.
+        from_memory = entry is not None
+        entry_dir = self.cache_dir / key
+        try:
+            if entry is None:
+                with (entry_dir / PAYLOAD_FILENAME).open('r', encoding='utf-8') as payload_file:
+                    entry = json.load(payload_file)
+            for name, target in artifact_targets.items():
+                if name not in entry["artifacts"]:
+                    raise FileNotFoundError(name)
+                shutil.copyfile(entry_dir / name, target)
+            os.utime(entry_dir / PAYLOAD_FILENAME)
+        except (OSError, ValueError, KeyError):
+            with self._lock:
+                # A concurrent put or eviction may have replaced the entry meanwhile; leave that one alone.
+                if self._generations.get(key) == generation:
+                    self._disk_bytes -= self._disk.pop(key)
+                    self._memory.pop(key, None)
+                    del self._generations[key]
+                    shutil.rmtree(entry_dir, ignore_errors=True)
+                self.misses += 1
+            return None
+
+        with self._lock:
+            if self._generations.get(key) == generation:
+                self._disk.move_to_end(key)
+                self._remember(key, entry)
+            self.hits += 1
+            if from_memory:
+                self.memory_hits += 1
+            else:
+                self.disk_hits += 1
+        return entry["payload"]
+
+    def put(self, kind: str, digest: str, payload, artifacts: dict[str, Path] | None = None) -> None:
+        """Store a JSON-serializable payload and copies of the given artifact files.
+
+        Caching is best effort: disk errors leave the cache unchanged.
+        """
+        key = self.make_key(kind, digest)
+        artifacts = artifacts or {}
+        entry = {"payload": payload, "artifacts": sorted(artifacts)}
+
+        # Build the entry in a scratch directory and rename it into place.
+        staging_dir = self.cache_dir / f".{key}.{uuid.uuid4().hex}"
+        try:
+            staging_dir.mkdir()
+            with (staging_dir / PAYLOAD_FILENAME).open('w', encoding='utf-8') as payload_file:
+                json.dump(entry, payload_file)
+            for name, source in artifacts.items():
+                shutil.copyfile(source, staging_dir / name)
+            size = sum(path.stat().st_size for path in staging_dir.iterdir())
+
+            with self._lock:
+                entry_dir = self.cache_dir / key
+                if key in self._disk:
+                    self._disk_bytes -= self._disk.pop(key)
+                    shutil.rmtree(entry_dir, ignore_errors=True)
+                os.replace(staging_dir, entry_dir)
+                self._disk[key] = size
+                self._disk_bytes += size
+                self._generations[key] = next(self._next_generation)
+                self._remember(key, entry)
+                self._evict_disk()
+        except OSError:
+            pass
+        finally:
+            shutil.rmtree(staging_dir, ignore_errors=True)
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "parser_version": PARSER_VERSION,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "evictions": self.evictions,
+                "memory_entries": len(self._memory),
+                "disk_entries": len(self._disk),
+                "disk_bytes": self._disk_bytes,
+                "max_memory_entries": self.max_memory_entries,
+                "max_disk_bytes": self.max_disk_bytes,
+            }
@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+Session directory bookkeeping and background reaping.
+
+Each session's size and last access time are held in memory: the upload
+root is scanned once at startup, after that only a session that just
+changed is re-measured. A background task expires sessions idle for longer
+than the TTL and, while the total is over the byte quota, evicts the least
+recently accessed ones. Sessions with queued or running jobs are never reaped.
+"""
+
+import asyncio
+import logging
+import os
+import shutil
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+
+def _dir_size(path: Path) -> int:
+    total = 0
+    try:
+        with os.scandir(path) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    total += _dir_size(Path(entry.path))
+                elif entry.is_file(follow_symlinks=False):
+                    total += entry.stat(follow_symlinks=False).st_size
+    except FileNotFoundError:
+        pass
+    return total
+
+
+class SessionRegistry:
+    """Track session sizes and access times, and reap expired or over-quota sessions."""
+
+    def __init__(
+        self,
+        root: str | Path,
+        ttl_seconds: float | None = None,
+        max_bytes: int | None = None,
+        sweep_interval: float | None = None,
+        busy_sessions=None,
+        on_remove=None,
+    ):
+        if ttl_seconds is None:
+            ttl_seconds = float(os.getenv("LCBO_SESSION_TTL_SECONDS", str(24 * 60 * 60)))
+        if max_bytes is None:
+            max_bytes = int(os.getenv("LCBO_SESSION_MAX_BYTES", str(1024 * 1024 * 1024)))
+        if sweep_interval is None:
+            sweep_interval = float(os.getenv("LCBO_SESSION_SWEEP_SECONDS", "300"))
+
+        self.root = Path(root)
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.sweep_interval = max(1.0, sweep_interval)
+        # Callable returning the ids of sessions that must not be reaped right now.
+        self._busy_sessions = busy_sessions or (lambda: set())
+        # Called with the session id after a session directory is removed.
+        self._on_remove = on_remove
+
+        # session id -> [bytes, last access], least recently accessed first.
+        self._sessions: OrderedDict[str, list] = OrderedDict()
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+        self._wakeup: asyncio.Event | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._reaper: asyncio.Task | None = None
+
+        self.sessions_expired = 0
+        self.sessions_evicted = 0
+        self.sessions_deleted = 0
+        self.bytes_reclaimed = 0
+
+        self._load_index()
+
+    def _load_index(self) -> None:
+        """Index existing sessions once, oldest modification first."""
+        self.root.mkdir(parents=True, exist_ok=True)
+        entries = []
+        for session_dir in self.root.iterdir():
+            if session_dir.is_dir():
+                entries.append((session_dir.stat().st_mtime, session_dir.name, _dir_size(session_dir)))
+
+        for last_access, session_id, size in sorted(entries):
+            self._sessions[session_id] = [size, last_access]
+            self._total_bytes += size
+
+    def start(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self._reaper = asyncio.create_task(self._reap_forever())
+
+    async def shutdown(self) -> None:
+        if self._reaper is not None:
+            self._reaper.cancel()
+            await asyncio.gather(self._reaper, return_exceptions=True)
+            self._reaper = None
+
+    def register(self, session_id: str) -> None:
+        """Start tracking a new, still empty session."""
+        with self._lock:
+            self._sessions.setdefault(session_id, [0, time.time()])
+
+    def touch(self, session_id: str) -> None:
+        """Record an access so the session counts as recently used."""
+        with self._lock:
+            entry = self._sessions.get(session_id)
+            if entry is not None:
+                entry[1] = time.time()
+                self._sessions.move_to_end(session_id)
+
+    def refresh(self, session_id: str) -> None:
+        """Re-measure one session after files were written to it (blocking I/O)."""
+        session_dir = self.root / session_id
+        size = _dir_size(session_dir) if session_dir.is_dir() else None
+        with self._lock:
+            previous = self._sessions.pop(session_id, None)
+            if previous is not None:
+                self._total_bytes -= previous[0]
+            if size is not None:
+                self._sessions[session_id] = [size, time.time()]
+                self._total_bytes += size
+            over_quota = self._total_bytes > self.max_bytes
+
+        # Called from worker threads, so wake the reaper through its loop.
+        if over_quota and self._wakeup is not None:
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+
+    def remove(self, session_id: str) -> int:
+        """Delete a session on request and return the bytes reclaimed (blocking I/O)."""
+        reclaimed = self._delete(session_id)
+        if reclaimed is None:
+            return 0
+        with self._lock:
+            self.sessions_deleted += 1
+        return reclaimed
+
+    def _delete(self, session_id: str) -> int | None:
+        """Remove a session directory; return its tracked size, or None if it was not tracked."""
+        # Only ever remove direct children of the upload root.
+        if session_id in ('', '.', '..') or Path(session_id).name != session_id:
+            return None
+        with self._lock:
+            entry = self._sessions.pop(session_id, None)
+            if entry is not None:
+                self._total_bytes -= entry[0]
+                self.bytes_reclaimed += entry[0]
+        shutil.rmtree(self.root / session_id, ignore_errors=True)
+        if self._on_remove is not None:
+            self._on_remove(session_id)
+        return entry[0] if entry is not None else None
+
+    def sweep(self) -> int:
+        """Expire idle sessions, then evict least recently used ones down to the quota.
+
+        Returns the bytes reclaimed (blocking I/O).
+        """
+        busy = self._busy_sessions()
+        now = time.time()
+        with self._lock:
+            expired = [
+                session_id for session_id, (_, last_access) in self._sessions.items()
+                if now - last_access > self.ttl_seconds and session_id not in busy
+            ]
+
+        reclaimed = 0
+        for session_id in expired:
+            size = self._delete(session_id)
+            if size is None:
+                continue
+            reclaimed += size
+            with self._lock:
+                self.sessions_expired += 1
+
+        while True:
+            with self._lock:
+                if self._total_bytes <= self.max_bytes:
+                    break
+                victim = next((session_id for session_id in self._sessions if session_id not in busy), None)
+            if victim is None:
+                break
+            size = self._delete(victim)
+            if size is None:
+                continue
+            reclaimed += size
+            with self._lock:
+                self.sessions_evicted += 1
+
+        return reclaimed
+
+    async def _reap_forever(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.sweep_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                await asyncio.to_thread(self.sweep)
+            except Exception:
+                # Keep reaping on the next interval rather than losing the task for good.
+                logger.exception("Session sweep failed")
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "sessions": len(self._sessions),
+                "total_bytes": self._total_bytes,
+                "max_bytes": self.max_bytes,
+                "ttl_seconds": self.ttl_seconds,
+                "sessions_expired": self.sessions_expired,
+                "sessions_evicted": self.sessions_evicted,
+                "sessions_deleted": self.sessions_deleted,
+                "bytes_reclaimed": self.bytes_reclaimed,
+            }
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Per-session index of step 1 vendor SKUs for the step 2 item-cost lookup.
+
+Step 1 writes SKU_INDEX_FILENAME next to its CSVs: one small JSON document
+with the sorted, de-duplicated SKUs, loaded back with a single file read.
+Loaded indexes are kept in an in-process LRU keyed by session id. Sessions
+created before the index existed fall back to their *_supplier_skus*.csv
+files once and get an index written for next time.
+"""
+
+import csv
+import json
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+import metrics
+
+SKU_INDEX_FILENAME = "sku_index.json"
+SKU_INDEX_VERSION = 1
+
+
+def write_sku_index(output_dir: str | Path, skus) -> str:
+    """Write the SKU index for a step 1 session and return its filename."""
+    output_path = Path(output_dir) / SKU_INDEX_FILENAME
+    index = {"version": SKU_INDEX_VERSION, "skus": sorted({sku.strip() for sku in skus if sku and sku.strip()})}
+    temp_path = output_path.with_name(f".{SKU_INDEX_FILENAME}.tmp")
+    with metrics.span('write'), temp_path.open('w', encoding='utf-8') as index_file:
+        json.dump(index, index_file, separators=(',', ':'))
+    os.replace(temp_path, output_path)
+    return SKU_INDEX_FILENAME
+
+
+def read_sku_index(session_dir: str | Path) -> frozenset[str] | None:
+    """Return the SKUs from a session's index, or None if it has no usable index."""
+    try:
+        with (Path(session_dir) / SKU_INDEX_FILENAME).open('r', encoding='utf-8') as index_file:
+            index = json.load(index_file)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(index, dict) or index.get("version") != SKU_INDEX_VERSION:
+        return None
+    return frozenset(index.get("skus", []))
+
+
+def read_supplier_csvs(session_dir: str | Path) -> frozenset[str] | None:
+    """Return the SKUs from a session's step 1 CSVs, or None if there are none."""
+    supplier_csv_candidates = sorted(Path(session_dir).glob('*_supplier_skus*.csv'))
+    if not supplier_csv_candidates:
+        return None
+
+    allowed_items = set()
+    for csv_path in supplier_csv_candidates:
+        with csv_path.open('r', encoding='utf-8') as csv_file:
+            reader = csv.DictReader(csv_file)
+            for row in reader:
+                sku = (row.get('sku') or '').strip()
+                if sku:
+                    allowed_items.add(sku)
+    return frozenset(allowed_items)
+
+
+class SkuIndexCache:
+    """LRU of loaded step 1 SKU sets, keyed by session id."""
+
+    def __init__(self, max_entries: int | None = None):
+        if max_entries is None:
+            max_entries = int(os.getenv("LCBO_SKU_INDEX_CACHE_ENTRIES", "64"))
+        self.max_entries = max(0, max_entries)
+        self._entries: OrderedDict[str, frozenset[str]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def put(self, session_id: str, skus) -> frozenset[str]:
+        skus = frozenset(sku.strip() for sku in skus if sku and sku.strip())
+        with self._lock:
+            self._entries[session_id] = skus
+            self._entries.move_to_end(session_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return skus
+
+    def discard(self, session_id: str) -> None:
+        with self._lock:
+            self._entries.pop(session_id, None)
+
+    def load(self, session_id: str, session_dir: str | Path) -> frozenset[str] | None:
+        """Return the session's step 1 SKUs, or None if step 1 has not run for it."""
+        with self._lock:
+            skus = self._entries.get(session_id)
+            if skus is not None:
+                self._entries.move_to_end(session_id)
+                return skus
+
+        skus = read_sku_index(session_dir)
+        if skus is None:
+            # Sessions from before the index was written only have the CSVs.
+            skus = read_supplier_csvs(session_dir)
+            if skus is None:
+                return None
+            try:
+                write_sku_index(session_dir, skus)
+            except OSError:
+                pass
+        return self.put(session_id, skus)
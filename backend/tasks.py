@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Document tasks run inside worker processes.
+
+Each task takes plain paths/values and returns plain data (or the slotted
+record types in records) so it can cross the process boundary; the API
+layer only handles file I/O and responses. Tasks also return the seconds
+spent per stage under "timings" (see metrics), and take an optional
+text_engine name (see text_engines).
+
+The PLU and Quick Order tasks return full record lists rather than streams,
+since the API caches them by upload hash.
+"""
+
+import functools
+from dataclasses import asdict
+
+import metrics
+from pdf_processor import LCBOInvoiceProcessor, generate_combined_pdf
+from plu_document import PluDocument, parse_page_range
+from plu_profit_csv_processor import PluProfitCSVExtractor
+from records import InvoiceProduct, PluRecord
+from sku_index import write_sku_index
+from supplier_csv_processor import SupplierCSVExtractor
+from wholesale_cost_processor import WholesaleCostCalculator, WholesaleItemRecord
+
+
+def timed(task):
+    """Record the task's spans and return them in its result under "timings"."""
+    @functools.wraps(task)
+    def wrapper(*args, **kwargs):
+        with metrics.recording() as recorder:
+            # Anything not covered by a processor span (layout, bookkeeping) lands in "other".
+            with metrics.span('other'):
+                result = task(*args, **kwargs)
+        result["timings"] = recorder.to_payload()
+        return result
+    return wrapper
+
+
+@timed
+def condense_invoice(pdf_path: str, output_path: str, text_engine: str | None = None) -> dict:
+    """Parse an invoice and write its condensed PDF."""
+    processor = LCBOInvoiceProcessor(pdf_path, text_engine)
+    invoice_info, products = processor.process()
+    processor.generate_condensed_pdf(output_path)
+    # The result is cached as JSON, so products go back as dicts.
+    return {"invoice_info": invoice_info, "products": [product.to_dict() for product in products]}
+
+
+@timed
+def parse_invoice(pdf_path: str, text_engine: str | None = None) -> dict:
+    """Parse an invoice without rendering it; returns the same data as condense_invoice."""
+    processor = LCBOInvoiceProcessor(pdf_path, text_engine)
+    invoice_info, products = processor.process()
+    return {"invoice_info": invoice_info, "products": [product.to_dict() for product in products]}
+
+
+@timed
+def combine_invoices(invoices: list[dict], output_path: str) -> dict:
+    """Render parsed invoices (condense_invoice results, in order) into one PDF with a single build."""
+    processors = []
+    for invoice in invoices:
+        processor = LCBOInvoiceProcessor('')
+        processor.invoice_info = invoice["invoice_info"]
+        processor.products = [InvoiceProduct.from_dict(product) for product in invoice["products"]]
+        processors.append(processor)
+    page_count = generate_combined_pdf(processors, output_path)
+    return {"invoice_count": len(processors), "page_count": page_count}
+
+
+@timed
+def parse_plu_pages(pdf_path: str, start: int, stop: int, text_engine: str | None = None) -> dict:
+    """Parse one page range of a PLU list (see plu_document.parse_page_range)."""
+    return parse_page_range(pdf_path, start, stop, text_engine)
+
+
+def _plu_document(pdf_path: str, records: list[PluRecord] | None, text_engine: str | None) -> PluDocument:
+    return PluDocument.from_pdf(pdf_path, text_engine) if records is None else PluDocument(records)
+
+
+@timed
+def extract_supplier_csvs(
+    pdf_path: str,
+    output_dir: str,
+    base_name: str,
+    records: list[PluRecord] | None = None,
+    text_engine: str | None = None,
+) -> dict:
+    """Extract vendor SKUs from a PLU list and write the chunked step 1 CSVs and SKU index.
+
+    Pass previously parsed PLU records to skip parsing and only write the files.
+    """
+    document = _plu_document(pdf_path, records, text_engine)
+    extractor = SupplierCSVExtractor(pdf_path, document)
+    suppliers = extractor.extract_suppliers()
+    csv_files = extractor.generate_chunked_csvs(output_dir, base_name)
+    write_sku_index(output_dir, suppliers)
+    return {"records": document.records, "suppliers": suppliers, "csv_files": csv_files}
+
+
+@timed
+def calculate_item_costs(
+    pdf_path: str, allowed_items: set[str], records: list[dict] | None = None, text_engine: str | None = None
+) -> dict:
+    """Parse a Quick Order and return its records and item-cost rows.
+
+    Pass previously parsed records (as dicts) to skip parsing.
+    """
+    calculator = WholesaleCostCalculator(pdf_path, text_engine)
+    if records is None:
+        calculator.parse_quick_order()
+    else:
+        calculator.records = [WholesaleItemRecord(**record) for record in records]
+    rows = calculator.calculate_cost_rows(allowed_items) if calculator.records else []
+    return {"records": [asdict(record) for record in calculator.records], "rows": rows}
+
+
+@timed
+def extract_plu_profit_csv(
+    pdf_path: str,
+    output_dir: str,
+    base_name: str,
+    records: list[PluRecord] | None = None,
+    text_engine: str | None = None,
+) -> dict:
+    """Extract PLU rows and write the profit-sorted CSV.
+
+    Pass previously parsed PLU records to skip parsing and only write the CSV.
+    """
+    document = _plu_document(pdf_path, records, text_engine)
+    extractor = PluProfitCSVExtractor(pdf_path, document)
+    rows = extractor.extract_rows()
+    csv_file = extractor.write_csv(output_dir, base_name)
+    return {"records": document.records, "rows": rows, "csv_file": csv_file}
+
+
+@timed
+def extract_plu_csvs(
+    pdf_path: str,
+    output_dir: str,
+    base_name: str,
+    records: list[PluRecord] | None = None,
+    text_engine: str | None = None,
+) -> dict:
+    """Parse a PLU list once and write both the step 1 SKU CSVs (with index) and the profit-sorted CSV."""
+    document = _plu_document(pdf_path, records, text_engine)
+    supplier_extractor = SupplierCSVExtractor(pdf_path, document)
+    suppliers = supplier_extractor.extract_suppliers()
+    csv_files = supplier_extractor.generate_chunked_csvs(output_dir, base_name)
+    write_sku_index(output_dir, suppliers)
+
+    profit_extractor = PluProfitCSVExtractor(pdf_path, document)
+    rows = profit_extractor.extract_rows()
+    profit_csv_file = profit_extractor.write_csv(output_dir, base_name)
+    return {
+        "records": document.records,
+        "suppliers": suppliers,
+        "csv_files": csv_files,
+        "rows": rows,
+        "profit_csv_file": profit_csv_file,
+    }
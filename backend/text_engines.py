@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Pluggable page text extraction for the PDF parsers.
+
+The parsers only need each page's text as reading-order lines. An engine
+opens a PDF as a document with a page count and page_text(index), and
+PageTextCache does the rest. "pdfplumber" is the reference engine; "pdfium"
+uses PDFium's text pages through pypdfium2 (installed with pdfplumber),
+which skips pdfminer's Python interpreter and is many times faster.
+scripts/engine_parity.py checks that both give the same rows.
+
+LCBO_TEXT_ENGINE selects the default; processors and requests can override it.
+"""
+
+import importlib.util
+import os
+import threading
+
+import pdfplumber
+
+DEFAULT_TEXT_ENGINE = "pdfplumber"
+
+# PDFium is not thread-safe, and tasks run in threads when the worker pool is disabled.
+_PDFIUM_LOCK = threading.Lock()
+
+
+class PdfplumberDocument:
+    """Page text from pdfplumber's extract_text()."""
+
+    def __init__(self, pdf_path: str):
+        self.pdf = pdfplumber.open(pdf_path)
+
+    def __len__(self) -> int:
+        return len(self.pdf.pages)
+
+    def page_text(self, page_index: int) -> str:
+        page = self.pdf.pages[page_index]
+        text = page.extract_text() or ''
+        # The layout objects are no longer needed once the text is extracted.
+        page.flush_cache()
+        page.get_textmap.cache_clear()
+        return text
+
+    def close(self) -> None:
+        self.pdf.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class PdfiumDocument:
+    """Page text from PDFium text pages, normalized to pdfplumber's line format."""
+
+    def __init__(self, pdf_path: str):
+        import pypdfium2
+
+        with _PDFIUM_LOCK:
+            self.pdf = pypdfium2.PdfDocument(pdf_path)
+            self._page_count = len(self.pdf)
+
+    def __len__(self) -> int:
+        return self._page_count
+
+    def page_text(self, page_index: int) -> str:
+        with _PDFIUM_LOCK:
+            page = self.pdf[page_index]
+            try:
+                text_page = page.get_textpage()
+                try:
+                    text = text_page.get_text_range()
+                finally:
+                    text_page.close()
+            finally:
+                page.close()
+
+        # pdfplumber drops blank characters and puts one space between words.
+        lines = text.replace('\r\n', '\n').replace('\r', '\n').split('\n')
+        return '\n'.join(' '.join(line.split()) for line in lines)
+
+    def close(self) -> None:
+        with _PDFIUM_LOCK:
+            self.pdf.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+# engine name -> (document class, module it needs)
+ENGINES = {
+    "pdfplumber": (PdfplumberDocument, "pdfplumber"),
+    "pdfium": (PdfiumDocument, "pypdfium2"),
+}
+
+
+def available_engines() -> list[str]:
+    """Names of the engines whose libraries are installed."""
+    return [name for name, (_, module) in ENGINES.items() if importlib.util.find_spec(module) is not None]
+
+
+def resolve_engine(name: str | None = None) -> str:
+    """Return the engine to use for name (LCBO_TEXT_ENGINE when None), checking it is available."""
+    if name is None:
+        name = os.getenv("LCBO_TEXT_ENGINE", DEFAULT_TEXT_ENGINE)
+    if name not in ENGINES:
+        raise ValueError(f"Unknown text engine: {name} (choose from {', '.join(ENGINES)})")
+    if name not in available_engines():
+        raise ValueError(f"Text engine {name} needs {ENGINES[name][1]}, which is not installed")
+    return name
+
+
+def open_document(pdf_path: str, engine: str | None = None):
+    """Open a PDF with the given engine; use the result as a context manager."""
+    document_class, _ = ENGINES[resolve_engine(engine)]
+    return document_class(pdf_path)
+
+
+def page_count(pdf_path: str, engine: str | None = None) -> int:
+    with open_document(pdf_path, engine) as document:
+        return len(document)
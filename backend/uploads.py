@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Upload intake: chunked copies to the session directory with size and page limits.
+"""
+
+import asyncio
+import hashlib
+import os
+from dataclasses import dataclass
+from pathlib import Path
+
+import pdfplumber
+from fastapi import HTTPException, UploadFile
+from fastapi.responses import JSONResponse
+
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+# Limits are checked before any parsing starts; exceeding one rejects the request with 413.
+MAX_FILE_BYTES = int(os.getenv("LCBO_MAX_FILE_BYTES", str(50 * 1024 * 1024)))
+MAX_REQUEST_BYTES = int(os.getenv("LCBO_MAX_REQUEST_BYTES", str(200 * 1024 * 1024)))
+MAX_PDF_PAGES = int(os.getenv("LCBO_MAX_PDF_PAGES", "500"))
+
+
+@dataclass
+class SavedUpload:
+    path: Path
+    size: int
+    sha256: str
+
+
+class _RequestTooLarge(HTTPException):
+    """Raised from receive() once a body passes the limit.
+
+    FastAPI turns errors raised while reading a body into 400s but re-raises
+    HTTPExceptions, so this reaches the client as the 413 it describes.
+    """
+
+    def __init__(self, max_bytes: int):
+        super().__init__(status_code=413, detail=f"Request exceeds the {max_bytes} byte upload limit")
+
+
+class RequestSizeLimitMiddleware:
+    """Reject request bodies over MAX_REQUEST_BYTES before they are parsed.
+
+    Requests that declare a Content-Length are answered with 413 straight away;
+    chunked bodies are counted as they arrive.
+    """
+
+    def __init__(self, app, max_bytes: int = MAX_REQUEST_BYTES):
+        self.app = app
+        self.max_bytes = max_bytes
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope["headers"])
+        content_length = headers.get(b"content-length")
+        if content_length is not None and content_length.isdigit() and int(content_length) > self.max_bytes:
+            await self._reject(scope, receive, send)
+            return
+
+        received = 0
+        response_started = False
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_bytes:
+                    raise _RequestTooLarge(self.max_bytes)
+            return message
+
+        async def tracking_send(message):
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        try:
+            await self.app(scope, limited_receive, tracking_send)
+        except _RequestTooLarge:
+            if response_started:
+                raise
+            await self._reject(scope, receive, send)
+
+    async def _reject(self, scope, receive, send):
+        response = JSONResponse(
+            status_code=413,
+            content={"detail": f"Request exceeds the {self.max_bytes} byte upload limit"},
+        )
+        await response(scope, receive, send)
+
+
+def count_pdf_pages(pdf_path: str) -> int | None:
+    """Return the page count of a PDF, or None if it cannot be opened."""
+    try:
+        with pdfplumber.open(pdf_path) as pdf:
+            return len(pdf.pages)
+    except Exception:
+        return None
+
+
+async def save_upload(file: UploadFile, destination: Path) -> SavedUpload:
+    """Copy an upload to disk in fixed-size chunks, hashing it on the way."""
+    written = 0
+    digest = hashlib.sha256()
+    output = await asyncio.to_thread(open, destination, 'wb')
+    try:
+        while True:
+            chunk = await file.read(UPLOAD_CHUNK_SIZE)
+            if not chunk:
+                break
+            written += len(chunk)
+            if written > MAX_FILE_BYTES:
+                raise HTTPException(
+                    status_code=413,
+                    detail=f"File {file.filename} exceeds the {MAX_FILE_BYTES} byte limit",
+                )
+            digest.update(chunk)
+            await asyncio.to_thread(output.write, chunk)
+    finally:
+        await asyncio.to_thread(output.close)
+    return SavedUpload(path=destination, size=written, sha256=digest.hexdigest())
+
+
+async def save_uploads(files: list[UploadFile], session_dir: Path) -> list[SavedUpload]:
+    """Save every upload of a request, enforcing the file, request and page limits.
+
+    Raises HTTPException(413) as soon as a limit is exceeded, before any file is parsed.
+    """
+    declared_sizes = [file.size for file in files if file.size is not None]
+    for file in files:
+        if file.size is not None and file.size > MAX_FILE_BYTES:
+            raise HTTPException(
+                status_code=413,
+                detail=f"File {file.filename} exceeds the {MAX_FILE_BYTES} byte limit",
+            )
+    if sum(declared_sizes) > MAX_REQUEST_BYTES:
+        raise HTTPException(status_code=413, detail=f"Upload exceeds the {MAX_REQUEST_BYTES} byte request limit")
+
+    saved = []
+    total_bytes = 0
+    for file in files:
+        upload = await save_upload(file, session_dir / file.filename)
+        total_bytes += upload.size
+        if total_bytes > MAX_REQUEST_BYTES:
+            raise HTTPException(status_code=413, detail=f"Upload exceeds the {MAX_REQUEST_BYTES} byte request limit")
+        saved.append(upload)
+
+    for upload in saved:
+        page_count = await asyncio.to_thread(count_pdf_pages, str(upload.path))
+        if page_count is not None and page_count > MAX_PDF_PAGES:
+            raise HTTPException(
+                status_code=413,
+                detail=f"File {upload.path.name} has {page_count} pages, over the {MAX_PDF_PAGES} page limit",
+            )
+
+    return saved
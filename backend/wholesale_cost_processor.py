@@ -9,10 +9,18 @@ from dataclasses import dataclass
 from pathlib import Path
 from decimal import Decimal, ROUND_HALF_UP
 
-import pdfplumber
+import line_lexer
+import metrics
+import text_engines
+from page_text import PageTextCache
 
+_NON_DIGIT_RE = re.compile(r"\D")
+_MULTI_PACK_RE = re.compile(r"(\d+(?:\.\d+)?)\s*(?:x|×|pk|pack)\s*(\d+(?:\.\d+)?)\s*ml\b", re.IGNORECASE)
+_ML_RE = re.compile(r"(\d+(?:\.\d+)?)\s*ml\b", re.IGNORECASE)
+_LITRE_RE = re.compile(r"(\d+(?:\.\d+)?)\s*l\b", re.IGNORECASE)
 
-@dataclass
+
+@dataclass(slots=True)
 class WholesaleItemRecord:
     item: str
     qty: int
@@ -26,33 +34,31 @@ class WholesaleItemRecord:
 class WholesaleCostCalculator:
     """Parse wholesale quick-order PDFs and compute item costs."""
 
-    def __init__(self, pdf_path: str):
+    def __init__(self, pdf_path: str, text_engine: str | None = None):
         self.pdf_path = pdf_path
-        self.records: list[WholesaleItemRecord] = []
+        self.text_engine = text_engine
+        # None until the document is parsed (or records are assigned); an empty list means no items.
+        self.records: list[WholesaleItemRecord] | None = None
 
     @staticmethod
     def _normalize_item(value: str) -> str:
-        digits = re.sub(r"\D", "", value)
+        digits = _NON_DIGIT_RE.sub("", value)
         normalized = digits.lstrip("0")
         return normalized if normalized else "0"
 
     @staticmethod
     def _extract_size_components(size_line: str) -> tuple[int, float] | None:
-        multi_match = re.search(
-            r"(\d+(?:\.\d+)?)\s*(?:x|×|pk|pack)\s*(\d+(?:\.\d+)?)\s*ml\b",
-            size_line,
-            re.IGNORECASE,
-        )
+        multi_match = _MULTI_PACK_RE.search(size_line)
         if multi_match:
             n_count = int(float(multi_match.group(1)))
             z_ml = float(multi_match.group(2))
             return n_count, z_ml
 
-        ml_match = re.search(r"(\d+(?:\.\d+)?)\s*ml\b", size_line, re.IGNORECASE)
+        ml_match = _ML_RE.search(size_line)
         if ml_match:
             return 1, float(ml_match.group(1))
 
-        l_match = re.search(r"(\d+(?:\.\d+)?)\s*l\b", size_line, re.IGNORECASE)
+        l_match = _LITRE_RE.search(size_line)
         if l_match:
             return 1, float(l_match.group(1)) * 1000.0
 
@@ -63,69 +69,77 @@ class WholesaleCostCalculator:
         unit_deposit = 0.2 if z_ml > 610 else 0.1
         return unit_deposit * n_count
 
+    def _apply_detail(self, current: WholesaleItemRecord, token) -> None:
+        """Fill in the current item from one of the lines that follow its item line."""
+        if token.kind == line_lexer.SKU_NOT_FOUND:
+            current.sku_not_found = True
+            return
+
+        if token.kind == line_lexer.WHOLESALE_PRICE:
+            current.wholesale_price = float(token.value.replace(",", ""))
+            return
+
+        if token.kind == line_lexer.LCBO_NUMBER:
+            current.item = self._normalize_item(token.value)
+            return
+
+        if token.kind == line_lexer.UNITS:
+            current.units = token.value
+            return
+
+        if current.z_ml is None:
+            size_components = self._extract_size_components(token.text)
+            if size_components is not None:
+                current.n_count, current.z_ml = size_components
+
+    def iter_records(self):
+        """Yield item records page by page without holding the whole document.
+
+        An item is only complete once the next item line starts, so one whose
+        detail lines run onto the next page is carried over to that page.
+        """
+        with text_engines.open_document(self.pdf_path, self.text_engine) as document:
+            pages = PageTextCache(document)
+            current: WholesaleItemRecord | None = None
+
+            for page_index in range(len(pages)):
+                completed: list[WholesaleItemRecord] = []
+                with metrics.span('parse'):
+                    for token in pages.tokens(page_index, line_lexer.lex_quick_order_line):
+                        if token.kind == line_lexer.QUICK_ORDER_ITEM:
+                            if current is not None:
+                                completed.append(current)
+                            item, qty = token.value
+                            current = WholesaleItemRecord(
+                                item=self._normalize_item(item),
+                                qty=qty,
+                            )
+                        elif current is not None:
+                            self._apply_detail(current, token)
+
+                pages.release(page_index)
+                metrics.count('pages')
+                metrics.count('rows', len(completed))
+                yield from completed
+
+            if current is not None:
+                metrics.count('rows')
+                yield current
+
     def parse_quick_order(self) -> list[WholesaleItemRecord]:
         """Parse a Quick Order PDF into item records."""
-        with pdfplumber.open(self.pdf_path) as pdf:
-            lines = []
-            for page in pdf.pages:
-                text = page.extract_text() or ""
-                lines.extend([line.strip() for line in text.split("\n") if line.strip()])
-
-        records: list[WholesaleItemRecord] = []
-        current: WholesaleItemRecord | None = None
-
-        for line in lines:
-            qty_line_match = re.fullmatch(r"(\d+)\s+(\d+)\s+Remove", line)
-            if qty_line_match:
-                if current is not None:
-                    records.append(current)
-                current = WholesaleItemRecord(
-                    item=self._normalize_item(qty_line_match.group(1)),
-                    qty=int(qty_line_match.group(2)),
-                )
-                continue
-
-            if current is None:
-                continue
-
-            if re.search(r"sku was not found", line, re.IGNORECASE):
-                current.sku_not_found = True
-                continue
-
-            wholesale_match = re.search(r"Wholesale\s+price:\s*\$([\d,]+(?:\.\d{2})?)", line, re.IGNORECASE)
-            if wholesale_match:
-                current.wholesale_price = float(wholesale_match.group(1).replace(",", ""))
-                continue
-
-            lcbo_match = re.search(r"LCBO#:\s*(\d+)", line, re.IGNORECASE)
-            if lcbo_match:
-                current.item = self._normalize_item(lcbo_match.group(1))
-                continue
-
-            units_match = re.search(r"\{\s*(\d+)\s+units\s*\}", line, re.IGNORECASE)
-            if units_match:
-                current.units = int(units_match.group(1))
-                continue
-
-            if current.z_ml is None:
-                size_components = self._extract_size_components(line)
-                if size_components is not None:
-                    current.n_count, current.z_ml = size_components
-
-        if current is not None:
-            records.append(current)
-
-        self.records = records
-        return records
+        self.records = list(self.iter_records())
+        return self.records
 
     def calculate_cost_rows(self, allowed_items: set[str]) -> list[tuple[str, float]]:
         """Compute item cost rows from parsed records."""
-        if not self.records:
+        if self.records is None:
             self.parse_quick_order()
+        return list(self.iter_cost_rows(allowed_items))
 
-        output_rows: list[tuple[str, float]] = []
-
-        for record in self.records:
+    def iter_cost_rows(self, allowed_items: set[str]):
+        """Yield (item, cost) rows, from the parsed records or streamed from the PDF if not parsed yet."""
+        for record in self.records if self.records is not None else self.iter_records():
             if record.item not in allowed_items:
                 continue
             if record.sku_not_found:
@@ -140,21 +154,21 @@ class WholesaleCostCalculator:
             price_per_unit = (record.wholesale_price / record.qty) / record.units
             x_value = price_per_unit - self._get_deposit(record.z_ml, record.n_count)
             cost = x_value / 1.13
-            output_rows.append((record.item, cost))
-
-        return output_rows
+            yield record.item, cost
 
     @staticmethod
-    def write_item_cost_csv(output_csv_path: str, rows: list[tuple[str, float]]) -> int:
-        """Write item-cost rows to CSV with columns: item, cost."""
+    def write_item_cost_csv(output_csv_path: str, rows) -> int:
+        """Write item-cost rows (any iterable, e.g. iter_cost_rows) to CSV with columns: item, cost."""
         output_path = Path(output_csv_path)
         output_path.parent.mkdir(parents=True, exist_ok=True)
 
-        with output_path.open("w", newline="", encoding="utf-8") as csv_file:
+        with metrics.span('write'), output_path.open("w", newline="", encoding="utf-8") as csv_file:
             writer = csv.writer(csv_file)
             writer.writerow(["item", "cost"])
+            row_count = 0
             for item, cost in rows:
                 rounded_cost = Decimal(str(cost)).quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
                 writer.writerow([item, f"{rounded_cost:.2f}"])
+                row_count += 1
 
-        return len(rows)
+        return row_count
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Process pool that keeps CPU-bound PDF parsing and rendering off the event loop.
+"""
+
+import asyncio
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+
+def _warm_worker():
+    """Import the PDF libraries and processors once when a worker starts."""
+    import pdfplumber  # noqa: F401
+    import reportlab.platypus  # noqa: F401
+
+    import pdf_processor  # noqa: F401
+    import plu_profit_csv_processor  # noqa: F401
+    import supplier_csv_processor  # noqa: F401
+    import wholesale_cost_processor  # noqa: F401
+
+
+class WorkerPool:
+    """Run blocking document tasks in warm worker processes.
+
+    Workers are recycled as a generation: once the current executor has been
+    handed max_tasks_per_worker tasks per worker it is retired (its in-flight
+    tasks still finish) and a fresh executor takes over, which keeps memory
+    held by pdfminer/reportlab in long-lived workers bounded. An executor
+    broken by a worker dying (OOM kill, segfault) is replaced the same way,
+    so one crash fails only the tasks it was running.
+
+    With max_workers set to 0 tasks run in a thread instead, which is useful
+    for local development.
+    """
+
+    def __init__(self, max_workers: int | None = None, max_tasks_per_worker: int | None = None):
+        if max_workers is None:
+            max_workers = int(os.getenv("LCBO_WORKER_PROCESSES", str(os.cpu_count() or 1)))
+        if max_tasks_per_worker is None:
+            max_tasks_per_worker = int(os.getenv("LCBO_WORKER_MAX_TASKS", "50"))
+
+        self.max_workers = max(0, max_workers)
+        self.max_tasks_per_worker = max(1, max_tasks_per_worker)
+        self._executor: ProcessPoolExecutor | None = None
+        self._submitted = 0
+        self._lock = threading.Lock()
+
+    def start(self) -> None:
+        """Spawn and warm the first generation of workers ahead of the first request."""
+        for _ in range(self.max_workers):
+            self.submit(os.getpid)
+
+    def _retire_executor(self) -> None:
+        self._executor.shutdown(wait=False)
+        self._executor = None
+
+    def _current_executor(self) -> ProcessPoolExecutor:
+        if self._executor is not None and (
+            self._submitted >= self.max_workers * self.max_tasks_per_worker or self._executor._broken
+        ):
+            self._retire_executor()
+
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers, initializer=_warm_worker)
+            self._submitted = 0
+
+        self._submitted += 1
+        return self._executor
+
+    def submit(self, fn, *args):
+        """Submit fn(*args) and return a concurrent.futures.Future."""
+        with self._lock:
+            try:
+                return self._current_executor().submit(fn, *args)
+            except BrokenProcessPool:
+                # A worker died since the check above; start a new generation and resubmit.
+                self._retire_executor()
+                return self._current_executor().submit(fn, *args)
+
+    async def run(self, fn, *args):
+        """Run fn(*args) off the event loop and return its result."""
+        if not self.max_workers:
+            return await asyncio.to_thread(fn, *args)
+        return await asyncio.wrap_future(self.submit(fn, *args))
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True, cancel_futures=True)
+                self._executor = None
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+ZIP archives streamed as they are built.
+
+iter_zip() reads the files a chunk at a time and yields the archive bytes as
+zipfile produces them, so nothing is buffered beyond one chunk and no
+archive is written to disk. zipfile treats the sink as unseekable and writes
+a data descriptor after each entry, so sizes and CRCs never have to be
+patched back into earlier headers. PDFs are stored (they are already
+compressed); other files are deflated.
+"""
+
+import zipfile
+from pathlib import Path
+
+ZIP_CHUNK_SIZE = 64 * 1024
+
+
+class _ChunkSink:
+    """Write-only file object holding what zipfile wrote until it is drained."""
+
+    def __init__(self):
+        self._chunks: list[bytes] = []
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def drain(self) -> bytes:
+        data = b''.join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _zip_info(path: Path) -> zipfile.ZipInfo:
+    info = zipfile.ZipInfo.from_file(path, path.name)
+    info.compress_type = zipfile.ZIP_STORED if path.suffix.lower() == '.pdf' else zipfile.ZIP_DEFLATED
+    return info
+
+
+def iter_zip(paths, chunk_size: int = ZIP_CHUNK_SIZE):
+    """Yield a ZIP archive of paths (stored under their file names) in chunks.
+
+    Files removed before their turn are left out.
+    """
+    sink = _ChunkSink()
+    with zipfile.ZipFile(sink, 'w') as archive:
+        for path in paths:
+            try:
+                source = open(path, 'rb')
+            except FileNotFoundError:
+                continue
+            with source, archive.open(_zip_info(Path(path)), 'w') as entry:
+                # Send the local header straight away rather than after the first chunk.
+                yield sink.drain()
+                while chunk := source.read(chunk_size):
+                    entry.write(chunk)
+                    data = sink.drain()
+                    if data:
+                        yield data
+            # The data descriptor is written when the entry closes.
+            yield sink.drain()
+    yield sink.drain()
@@ -13,6 +13,8 @@ function App() {
   const [mode, setMode] = useState('invoice');
   const [sessionId, setSessionId] = useState(null);
   const [results, setResults] = useState([]);
+  const [combinedFile, setCombinedFile] = useState(null);
+  const [combinePdf, setCombinePdf] = useState(false);
   const [supplierCsvResult, setSupplierCsvResult] = useState(null);
   const [supplierStep, setSupplierStep] = useState(1);
   const [itemCostResult, setItemCostResult] = useState(null);
@@ -44,7 +46,9 @@ function App() {
           formData.append('files', file);
         });
 
-        response = await fetch(`${API_URL}/upload`, {
+        // On request, the invoices are also merged into one PDF so they print as a single job.
+        const query = combinePdf && files.length > 1 ? '?combine=true' : '';
+        response = await fetch(`${API_URL}/upload${query}`, {
           method: 'POST',
           body: formData,
         });
@@ -93,6 +97,7 @@ function App() {
       if (mode === 'invoice') {
         setSessionId(data.session_id);
         setResults(data.processing_results);
+        setCombinedFile(data.combined_file || null);
       } else if (mode === 'supplier-csv') {
         if (supplierStep === 1) {
           setSessionId(data.session_id);
@@ -137,9 +142,18 @@ function App() {
     }
   };
 
+  // Stream several files as one ZIP; the browser saves it directly instead of buffering a blob.
+  const handleDownloadAll = (patterns = []) => {
+    if (!sessionId) return;
+
+    const query = patterns.map((pattern) => `pattern=${encodeURIComponent(pattern)}`).join('&');
+    window.location.href = `${API_URL}/download/${sessionId}.zip${query ? `?${query}` : ''}`;
+  };
+
   const handleReset = () => {
     setSessionId(null);
     setResults([]);
+    setCombinedFile(null);
     setSupplierCsvResult(null);
     setSupplierStep(1);
     setItemCostResult(null);
@@ -151,6 +165,7 @@ function App() {
     setMode(nextMode);
     setSessionId(null);
     setResults([]);
+    setCombinedFile(null);
     setSupplierCsvResult(null);
     setSupplierStep(1);
     setItemCostResult(null);
@@ -215,6 +230,18 @@ function App() {
           </div>
         )}
 
+        {!sessionId && isInvoiceMode && (
+          <label className="combine-option">
+            <input
+              type="checkbox"
+              checked={combinePdf}
+              onChange={(event) => setCombinePdf(event.target.checked)}
+              disabled={isProcessing}
+            />
+            Also merge all invoices into one PDF for printing
+          </label>
+        )}
+
         {!sessionId ? (
           <FileUpload 
             onUpload={handleUpload} 
@@ -247,7 +274,9 @@ function App() {
             {isInvoiceMode ? (
               <ProcessingResults 
                 results={results}
+                combinedFile={combinedFile}
                 onDownload={handleDownload}
+                onDownloadAll={() => handleDownloadAll(['*_condensed.pdf'])}
               />
             ) : isPluMode ? (
               <PluProfitResults
@@ -260,6 +289,7 @@ function App() {
                   <SupplierCsvResults
                     result={supplierCsvResult}
                     onDownload={handleDownload}
+                    onDownloadAll={() => handleDownloadAll(['*_supplier_skus*.csv'])}
                     onContinue={supplierStep === 1 ? handleContinueToStep2 : undefined}
                   />
                 )}
@@ -1,7 +1,7 @@
 import React from 'react';
 import './ProcessingResults.css';
 
-function ProcessingResults({ results, onDownload }) {
+function ProcessingResults({ results, combinedFile, onDownload, onDownloadAll }) {
   const successCount = results.filter(r => r.status === 'success').length;
   const errorCount = results.filter(r => r.status === 'error').length;
 
@@ -13,6 +13,16 @@ function ProcessingResults({ results, onDownload }) {
           {successCount} file{successCount !== 1 ? 's' : ''} processed successfully
           {errorCount > 0 && `, ${errorCount} error${errorCount !== 1 ? 's' : ''}`}
         </p>
+        {combinedFile && (
+          <button className="download-btn" onClick={() => onDownload(combinedFile)}>
+            Download combined PDF
+          </button>
+        )}
+        {onDownloadAll && successCount > 1 && (
+          <button className="download-btn" onClick={onDownloadAll}>
+            Download all (.zip)
+          </button>
+        )}
       </div>
 
       <div className="results-list">
@@ -1,7 +1,7 @@
 import React from 'react';
 import './SupplierCsvResults.css';
 
-function SupplierCsvResults({ result, onDownload, onContinue }) {
+function SupplierCsvResults({ result, onDownload, onDownloadAll, onContinue }) {
   const hasRows = result.supplier_count > 0;
   const csvFiles = Array.isArray(result.csv_files) && result.csv_files.length > 0
     ? result.csv_files
@@ -21,6 +21,11 @@ function SupplierCsvResults({ result, onDownload, onContinue }) {
             Split into {csvFiles.length} files (max 250 items per file)
           </p>
         )}
+        {onDownloadAll && csvFiles.length > 1 && (
+          <button className="supplier-download-btn" onClick={onDownloadAll}>
+            Download all CSVs (.zip)
+          </button>
+        )}
       </div>
 
       <div className="supplier-results-list">
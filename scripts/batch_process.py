@@ -1,90 +1,359 @@
 #!/usr/bin/env python3
 """
 Batch PDF Invoice Processor - Process multiple PDF invoices at once
+
+Usage: python batch_process.py [directory] [--workers N] [--force] [--summary PATH] [--combine [PATH]]
+
+Invoices are condensed in a pool of worker processes. A manifest in the
+directory records each input's SHA-256 with the parser version that
+processed it, so re-runs skip unchanged invoices and an interrupted run
+picks up where it stopped. Every run writes a JSON and a CSV summary with
+per-file timings. With --combine, every invoice that parsed is also
+rendered into one PDF for printing, each starting on a new page with its
+own page numbers.
 """
 
+import argparse
+import csv
+import glob
+import hashlib
+import json
 import os
+import shutil
 import sys
-import glob
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime, timezone
 from pathlib import Path
 
 # Add backend to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent / "backend"))
-from pdf_processor import LCBOInvoiceProcessor
+import tasks  # noqa: E402
+import text_engines  # noqa: E402
+from pdf_processor import COMBINED_PDF_FILENAME  # noqa: E402
+from result_cache import PARSER_VERSION  # noqa: E402
+
+MANIFEST_FILENAME = "batch_manifest.json"
+MANIFEST_VERSION = 1
+SUMMARY_BASENAME = "batch_summary"
+SUMMARY_FIELDS = [
+    'input_file', 'status', 'order_number', 'order_date', 'customer', 'items', 'output_file',
+    'seconds', 'extract_text_seconds', 'parse_seconds', 'render_seconds', 'sha256', 'error',
+]
+
+
+def _now():
+    return datetime.now(timezone.utc).isoformat()
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as pdf:
+        for chunk in iter(lambda: pdf.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def condensed_path(pdf_file):
+    return pdf_file.replace('.pdf', '_condensed.pdf')
+
+
+def load_manifest(manifest_path):
+    """Return the manifest's entries (sha256 -> entry), or none if it is missing or from another version."""
+    try:
+        with open(manifest_path, 'r', encoding='utf-8') as manifest_file:
+            manifest = json.load(manifest_file)
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(manifest, dict) or manifest.get('version') != MANIFEST_VERSION:
+        return {}
+    return manifest.get('files', {})
+
+
+def save_manifest(manifest_path, entries):
+    """Write the manifest atomically so an interrupted run never leaves it half-written."""
+    temp_path = f"{manifest_path}.tmp"
+    with open(temp_path, 'w', encoding='utf-8') as manifest_file:
+        json.dump({'version': MANIFEST_VERSION, 'files': entries}, manifest_file, indent=1)
+    os.replace(temp_path, manifest_path)
+
+
+def condense_file(pdf_file, output_file, text_engine, keep_invoice=False):
+    """Condense one invoice (runs in a worker process) and return its summary row.
+
+    With keep_invoice, the parsed invoice is returned under 'invoice' as well.
+    """
+    start = time.perf_counter()
+    try:
+        result = tasks.condense_invoice(pdf_file, output_file, text_engine)
+    except Exception as e:
+        return {'status': 'ERROR', 'error': str(e), 'seconds': round(time.perf_counter() - start, 4)}
+
+    invoice_info = result['invoice_info']
+    durations = result['timings']['durations']
+    row = {
+        'status': 'SUCCESS',
+        'order_number': invoice_info.get('order_number'),
+        'order_date': invoice_info.get('order_date'),
+        'customer': invoice_info.get('customer_name'),
+        'items': len(result['products']),
+        'seconds': round(time.perf_counter() - start, 4),
+        'extract_text_seconds': round(durations.get('extract_text', 0.0), 4),
+        'parse_seconds': round(durations.get('parse', 0.0), 4),
+        'render_seconds': round(durations.get('render', 0.0), 4),
+    }
+    if keep_invoice:
+        row['invoice'] = {'invoice_info': invoice_info, 'products': result['products']}
+    return row
+
+
+def parse_file(pdf_file, text_engine):
+    """Parse one invoice without rendering it (runs in a worker process); None if it fails."""
+    try:
+        result = tasks.parse_invoice(pdf_file, text_engine)
+    except Exception:
+        return None
+    return {'invoice_info': result['invoice_info'], 'products': result['products']}
+
+
+def combine_invoices(invoices, combine_path):
+    """Render the parsed invoices into one PDF and return the summary's 'combined' record."""
+    start = time.perf_counter()
+    result = tasks.combine_invoices(invoices, combine_path)
+    return {
+        'output_file': combine_path,
+        'invoices': result['invoice_count'],
+        'pages': result['page_count'],
+        'seconds': round(time.perf_counter() - start, 4),
+    }
+
+
+def reusable_output(entry, text_engine, output_file, output_dir):
+    """Return an existing condensed PDF for a manifest entry made by this parser and engine, or None."""
+    if (
+        entry is None
+        or entry.get('status') != 'SUCCESS'
+        or entry.get('parser_version') != PARSER_VERSION
+        or entry.get('text_engine') != text_engine
+    ):
+        return None
+    for candidate in (output_file, os.path.join(output_dir, entry.get('output_file', ''))):
+        if os.path.isfile(candidate):
+            return candidate
+    return None
 
 
-def batch_process_pdfs(directory=".", pattern="*.pdf", skip_condensed=True):
-    """Process all PDFs in a directory"""
-    
+def manifest_entry(result, pdf_file, output_file, text_engine):
+    """The manifest record for a successful condense_file() result."""
+    return {
+        **{field: result.get(field) for field in ('order_number', 'order_date', 'customer', 'items')},
+        'status': 'SUCCESS',
+        'input_file': os.path.basename(pdf_file),
+        'output_file': os.path.basename(output_file),
+        'parser_version': PARSER_VERSION,
+        'text_engine': text_engine,
+        'processed_at': _now(),
+    }
+
+
+def write_summary(summary_path, summary):
+    """Write <summary_path>.json and <summary_path>.csv."""
+    with open(f"{summary_path}.json", 'w', encoding='utf-8') as json_file:
+        json.dump(summary, json_file, indent=2)
+    with open(f"{summary_path}.csv", 'w', newline='', encoding='utf-8') as csv_file:
+        writer = csv.DictWriter(csv_file, fieldnames=SUMMARY_FIELDS, extrasaction='ignore')
+        writer.writeheader()
+        writer.writerows(summary['files'])
+
+
+def batch_process_pdfs(directory=".", pattern="*.pdf", skip_condensed=True, workers=None, force=False,
+                       manifest_path=None, summary_path=None, text_engine=None, combine_path=None):
+    """Process all PDFs in a directory, skipping those already condensed by this parser version
+
+    combine_path ('' for DIRECTORY/combined_invoices.pdf) also writes every invoice that
+    parsed, in input order, into one PDF.
+    """
+
     # Find all PDF files
-    pdf_files = glob.glob(os.path.join(directory, pattern))
-    
+    pdf_files = sorted(glob.glob(os.path.join(directory, pattern)))
+
     # Skip already condensed files if requested
     if skip_condensed:
         pdf_files = [f for f in pdf_files if '_condensed' not in f]
-    
+    # A combined PDF from an earlier --combine run is not an invoice.
+    pdf_files = [f for f in pdf_files if os.path.basename(f) != COMBINED_PDF_FILENAME]
+
     if not pdf_files:
         print(f"No PDF files found in {directory}")
         return
-    
+
+    workers = max(1, workers or os.cpu_count() or 1)
+    text_engine = text_engines.resolve_engine(text_engine)
+    manifest_path = manifest_path or os.path.join(directory, MANIFEST_FILENAME)
+    summary_path = summary_path or os.path.join(directory, SUMMARY_BASENAME)
+    if combine_path == '':
+        combine_path = os.path.join(directory, COMBINED_PDF_FILENAME)
+    if combine_path is not None and os.path.abspath(combine_path) in {
+        os.path.abspath(path) for pdf_file in pdf_files for path in (pdf_file, condensed_path(pdf_file))
+    }:
+        print(f"Not combining: {combine_path} is one of the invoices or their condensed PDFs")
+        combine_path = None
+    manifest = {} if force else load_manifest(manifest_path)
+    started_at = _now()
+    run_start = time.perf_counter()
+
     print(f"Found {len(pdf_files)} PDF file(s) to process")
     print("=" * 70)
-    
-    results = []
-    
-    for i, pdf_file in enumerate(pdf_files, 1):
-        try:
-            print(f"\n[{i}/{len(pdf_files)}] Processing: {os.path.basename(pdf_file)}")
-            
-            processor = LCBOInvoiceProcessor(pdf_file)
-            invoice_info, products = processor.process()
-            totals = processor.calculate_totals()
-            
-            # Generate condensed PDF
-            output_file = pdf_file.replace('.pdf', '_condensed.pdf')
-            processor.generate_condensed_pdf(output_file)
-            
-            result = {
-                'input_file': os.path.basename(pdf_file),
-                'output_file': os.path.basename(output_file),
-                'order_number': invoice_info.get('order_number'),
-                'order_date': invoice_info.get('order_date'),
-                'customer': invoice_info.get('customer_name'),
-                'items': len(products),
-                'status': 'SUCCESS'
+
+    # input file -> summary row, reported in input order at the end
+    results = {}
+    hashes = {}
+    # input file -> parsed invoice, kept for the combined PDF
+    invoices = {}
+    pending = []
+    for pdf_file in pdf_files:
+        sha256 = hashes[pdf_file] = file_sha256(pdf_file)
+        output_file = condensed_path(pdf_file)
+        entry = manifest.get(sha256)
+        existing_output = reusable_output(entry, text_engine, output_file, directory)
+        if existing_output is not None:
+            # Same content under another name only needs the condensed PDF copied.
+            if existing_output != output_file:
+                shutil.copyfile(existing_output, output_file)
+            results[pdf_file] = {
+                **{field: entry.get(field) for field in ('order_number', 'order_date', 'customer', 'items')},
+                'status': 'SKIPPED', 'seconds': 0.0,
             }
-            
-            print(f"  ✓ Order #{result['order_number']} | {result['items']} items")
-            
-        except Exception as e:
-            result = {
-                'input_file': os.path.basename(pdf_file),
-                'output_file': 'N/A',
-                'status': 'ERROR',
-                'error': str(e)
+        else:
+            pending.append((pdf_file, output_file, sha256))
+
+    print(f"Skipping {len(results)} unchanged file(s); processing {len(pending)} with {workers} worker(s)")
+
+    def record(pdf_file, output_file, sha256, result, index):
+        invoice = result.pop('invoice', None)
+        if invoice is not None:
+            invoices[pdf_file] = invoice
+        results[pdf_file] = result
+        name = os.path.basename(pdf_file)
+        if result['status'] == 'SUCCESS':
+            print(f"[{index}/{len(pending)}] ✓ {name}: Order #{result['order_number']} | "
+                  f"{result['items']} items | {result['seconds']:.2f}s")
+            manifest[sha256] = manifest_entry(result, pdf_file, output_file, text_engine)
+            # Saved after every file, so an interrupted run resumes from here.
+            save_manifest(manifest_path, manifest)
+        else:
+            print(f"[{index}/{len(pending)}] ✗ {name}: {result['error']}")
+
+    keep_invoice = combine_path is not None
+    if workers == 1 or len(pending) <= 1:
+        for index, (pdf_file, output_file, sha256) in enumerate(pending, 1):
+            result = condense_file(pdf_file, output_file, text_engine, keep_invoice)
+            record(pdf_file, output_file, sha256, result, index)
+    elif pending:
+        with ProcessPoolExecutor(max_workers=min(workers, len(pending))) as executor:
+            futures = {
+                executor.submit(condense_file, pdf_file, output_file, text_engine, keep_invoice):
+                    (pdf_file, output_file, sha256)
+                for pdf_file, output_file, sha256 in pending
             }
-            print(f"  ✗ Error: {str(e)}")
-        
-        results.append(result)
-    
+            for index, future in enumerate(as_completed(futures), 1):
+                record(*futures[future], future.result(), index)
+
+    combined = None
+    if combine_path is not None:
+        # Skipped files were not parsed this run; parse (without rendering) just those.
+        unparsed = [pdf_file for pdf_file in pdf_files if results[pdf_file]['status'] == 'SKIPPED']
+        if workers == 1 or len(unparsed) <= 1:
+            parsed = [parse_file(pdf_file, text_engine) for pdf_file in unparsed]
+        else:
+            with ProcessPoolExecutor(max_workers=min(workers, len(unparsed))) as executor:
+                parsed = list(executor.map(parse_file, unparsed, [text_engine] * len(unparsed)))
+        invoices.update((pdf_file, invoice) for pdf_file, invoice in zip(unparsed, parsed) if invoice is not None)
+
+        ordered = [invoices[pdf_file] for pdf_file in pdf_files if pdf_file in invoices]
+        if ordered:
+            combined = combine_invoices(ordered, combine_path)
+
+    files = []
+    for pdf_file in pdf_files:
+        result = results[pdf_file]
+        files.append({
+            'input_file': os.path.basename(pdf_file),
+            'output_file': os.path.basename(condensed_path(pdf_file))
+            if result['status'] != 'ERROR' else None,
+            'sha256': hashes[pdf_file],
+            **result,
+        })
+
+    successful = sum(1 for r in files if r['status'] == 'SUCCESS')
+    skipped = sum(1 for r in files if r['status'] == 'SKIPPED')
+    failed = sum(1 for r in files if r['status'] == 'ERROR')
+    summary = {
+        'started_at': started_at,
+        'finished_at': _now(),
+        'directory': os.path.abspath(directory),
+        'parser_version': PARSER_VERSION,
+        'text_engine': text_engine,
+        'workers': workers,
+        'totals': {
+            'files': len(files),
+            'processed': successful,
+            'skipped': skipped,
+            'failed': failed,
+            'items': sum(r.get('items') or 0 for r in files if r['status'] == 'SUCCESS'),
+            'seconds': round(time.perf_counter() - run_start, 3),
+        },
+        'files': files,
+    }
+    if combined is not None:
+        summary['combined'] = combined
+    write_summary(summary_path, summary)
+
     # Summary
     print("\n" + "=" * 70)
     print("PROCESSING SUMMARY")
     print("=" * 70)
-    
-    successful = sum(1 for r in results if r['status'] == 'SUCCESS')
-    failed = sum(1 for r in results if r['status'] == 'ERROR')
-    
-    print(f"Total files processed: {len(results)}")
-    print(f"Successful: {successful}")
+
+    print(f"Total files: {len(files)}")
+    print(f"Processed: {successful}")
+    print(f"Skipped (unchanged): {skipped}")
     print(f"Failed: {failed}")
-    
+    print(f"Elapsed: {summary['totals']['seconds']:.1f}s")
+
     if successful > 0:
-        print(f"\nTotal items processed: {sum(r.get('items', 0) for r in results if r['status'] == 'SUCCESS')}")
+        print(f"\nTotal items processed: {summary['totals']['items']}")
+    if combined is not None:
+        print(f"Combined {combined['invoices']} invoice(s) into {combined['output_file']} "
+              f"({combined['pages']} pages, {combined['seconds']:.2f}s)")
+    print(f"Summary written to {summary_path}.json and {summary_path}.csv")
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('directory', nargs='?', default='.', help='folder of invoice PDFs (default: current)')
+    parser.add_argument('--pattern', default='*.pdf', help='glob for input files (default: *.pdf)')
+    parser.add_argument('--workers', type=int, default=None, help='worker processes (default: CPU count)')
+    parser.add_argument('--force', action='store_true', help='ignore the manifest and reprocess everything')
+    parser.add_argument('--manifest', default=None, help=f'manifest path (default: DIRECTORY/{MANIFEST_FILENAME})')
+    parser.add_argument('--summary', default=None,
+                        help=f'summary path without extension (default: DIRECTORY/{SUMMARY_BASENAME})')
+    parser.add_argument('--text-engine', default=None, help='text extraction engine (default: LCBO_TEXT_ENGINE)')
+    parser.add_argument('--combine', nargs='?', const='', default=None, metavar='PATH',
+                        help=f'also write all invoices into one PDF (default PATH: DIRECTORY/{COMBINED_PDF_FILENAME})')
+    args = parser.parse_args()
+
+    try:
+        text_engines.resolve_engine(args.text_engine)
+    except ValueError as e:
+        parser.error(str(e))
+
+    batch_process_pdfs(
+        args.directory, args.pattern, workers=args.workers, force=args.force,
+        manifest_path=args.manifest, summary_path=args.summary, text_engine=args.text_engine,
+        combine_path=args.combine,
+    )
 
 
 if __name__ == "__main__":
-    import sys
-    
-    directory = sys.argv[1] if len(sys.argv) > 1 else "."
-    batch_process_pdfs(directory)
+    main()
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Processor benchmark - pages/sec, rows/sec and peak RSS per processor on synthetic documents
+
+Usage: python benchmark.py [--sizes 1,100,1000,5000] [--cases legacy,web,render,quick-order,...]
+
+Each measurement runs in a fresh interpreter so peak RSS belongs to that
+processor alone (imports included, reported separately as the baseline).
+"""
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+SCRIPTS_DIR = Path(__file__).parent
+BACKEND_DIR = SCRIPTS_DIR.parent / "backend"
+sys.path.insert(0, str(BACKEND_DIR))
+sys.path.insert(0, str(SCRIPTS_DIR))
+
+# case -> (document format, description)
+CASES = {
+    'legacy': ('legacy', 'LCBOInvoiceProcessor.process (legacy)'),
+    'web': ('web', 'LCBOInvoiceProcessor.process (web)'),
+    'render': ('web', 'LCBOInvoiceProcessor.generate_condensed_pdf'),
+    'quick-order': ('quick-order', 'WholesaleCostCalculator.parse_quick_order'),
+    'quick-order-stream': ('quick-order', 'WholesaleCostCalculator.iter_records'),
+    'supplier-skus': ('plu', 'SupplierCSVExtractor.extract_suppliers'),
+    'supplier-csv': ('plu', 'SupplierCSVExtractor.generate_chunked_csvs (streamed)'),
+    'plu-profit': ('plu', 'PluProfitCSVExtractor.extract_rows'),
+}
+
+
+def _peak_rss_mib():
+    # ru_maxrss is KiB on Linux and bytes on macOS.
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def _page_count(pdf_path):
+    import pdfplumber
+    with pdfplumber.open(pdf_path) as pdf:
+        return len(pdf.pages)
+
+
+def run_case(case, pdf_path):
+    """Run one case in this process and return its measurements."""
+    from pdf_processor import LCBOInvoiceProcessor
+    from plu_profit_csv_processor import PluProfitCSVExtractor
+    from supplier_csv_processor import SupplierCSVExtractor
+    from wholesale_cost_processor import WholesaleCostCalculator
+
+    baseline_rss = _peak_rss_mib()
+    pages = _page_count(pdf_path)
+
+    if case == 'render':
+        processor = LCBOInvoiceProcessor(pdf_path)
+        processor.process()
+        output_path = f'{pdf_path}.condensed.pdf'
+        start = time.perf_counter()
+        processor.generate_condensed_pdf(output_path)
+        elapsed = time.perf_counter() - start
+        rows = len(processor.products)
+        pages = _page_count(output_path)
+    else:
+        start = time.perf_counter()
+        if case in ('legacy', 'web'):
+            rows = len(LCBOInvoiceProcessor(pdf_path).process()[1])
+        elif case == 'quick-order':
+            rows = len(WholesaleCostCalculator(pdf_path).parse_quick_order())
+        elif case == 'quick-order-stream':
+            rows = sum(1 for _ in WholesaleCostCalculator(pdf_path).iter_records())
+        elif case == 'supplier-skus':
+            rows = len(SupplierCSVExtractor(pdf_path).extract_suppliers())
+        elif case == 'supplier-csv':
+            with tempfile.TemporaryDirectory() as output_dir:
+                SupplierCSVExtractor(pdf_path).generate_chunked_csvs(output_dir, 'bench')
+                rows = sum(
+                    sum(1 for _ in open(os.path.join(output_dir, name), encoding='utf-8')) - 1
+                    for name in os.listdir(output_dir)
+                )
+        else:
+            rows = len(PluProfitCSVExtractor(pdf_path).extract_rows())
+        elapsed = time.perf_counter() - start
+
+    return {
+        'pages': pages,
+        'rows': rows,
+        'seconds': elapsed,
+        'baseline_rss_mib': baseline_rss,
+        'peak_rss_mib': _peak_rss_mib(),
+    }
+
+
+def measure(case, pdf_path):
+    output = subprocess.run(
+        [sys.executable, __file__, '--child', case, pdf_path],
+        check=True, capture_output=True, text=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def run_benchmark(sizes, cases):
+    from synthetic_documents import build_document
+
+    print(f"{'case':<18} {'rows':>6} {'pages':>6} {'seconds':>8} {'pages/s':>8} {'rows/s':>9} {'peak RSS MiB':>13}")
+    print("-" * 74)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        documents = {}
+        for case in cases:
+            doc_format = CASES[case][0]
+            for rows in sizes:
+                pdf_path = documents.get((doc_format, rows))
+                if pdf_path is None:
+                    pdf_path = os.path.join(tmp_dir, f'{doc_format}_{rows}.pdf')
+                    build_document(doc_format, pdf_path, rows)
+                    documents[(doc_format, rows)] = pdf_path
+
+                result = measure(case, pdf_path)
+                seconds = max(result['seconds'], 1e-9)
+                print(
+                    f"{case:<18} {rows:>6} {result['pages']:>6} {seconds:>8.3f} "
+                    f"{result['pages'] / seconds:>8.1f} {result['rows'] / seconds:>9.1f} "
+                    f"{result['peak_rss_mib']:>13.1f}"
+                )
+
+    print("\nrender reports output pages. Peak RSS includes the interpreter and imports;")
+    print("a fresh process is used per measurement.")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', default='1,100,1000,5000', help='comma-separated row counts')
+    parser.add_argument('--cases', default=','.join(CASES), help='comma-separated cases: ' + ', '.join(CASES))
+    parser.add_argument('--child', nargs=2, metavar=('CASE', 'PDF'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_case(*args.child)))
+        return
+
+    cases = [case.strip() for case in args.cases.split(',') if case.strip()]
+    unknown = [case for case in cases if case not in CASES]
+    if unknown:
+        parser.error(f"unknown cases: {', '.join(unknown)}")
+    sizes = [int(size) for size in args.sizes.split(',') if size.strip()]
+    run_benchmark(sizes, cases)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Line lexer microbenchmark - Per-line classification cost, inline regexes vs shared lexer
+"""
+
+import re
+import sys
+import time
+from pathlib import Path
+
+# Add backend to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "backend"))
+import line_lexer
+from synthetic_documents import plu_list_lines, web_invoice_lines
+
+
+# The per-line checks the parsers ran before the lexer, with inline pattern strings.
+def inline_is_invoice_noise(line):
+    if not line:
+        return True
+    lowered = line.lower().strip()
+    if re.fullmatch(r'\$[\d,]+(?:\.\d{2})?', lowered):
+        return True
+    if re.fullmatch(r'(january|february|march|april|may|june|july|august|september|october|november|december)\s+\d{1,2},\s+\d{4}', lowered):
+        return True
+    return any(token in lowered for token in line_lexer.INVOICE_NOISE_TOKENS)
+
+
+def inline_invoice_line(line):
+    re.search(r'Fulfilled\s+by:\s*(.+)$', line, re.IGNORECASE)
+    re.search(r'LCBO#:\s*(\d+)\b(.*)$', line, re.IGNORECASE)
+    re.search(r'\{\s*(\d+)\s+units\s*\}', line, re.IGNORECASE)
+    re.search(r'Qty\.\s*Ordered:\s*(\d+)(?:\s*\|\s*Fulfilled:\s*(\d+))?', line, re.IGNORECASE)
+    inline_is_invoice_noise(line)
+
+
+def inline_plu_line(line):
+    lowered = line.lower().strip()
+    if lowered.startswith((
+        'plu list with cost and active price', 'printed:', 'item group:', 'price group:',
+        'cost group:', 'from plu:', '# description vendor sku', 'new dundee village market',
+    )):
+        return
+    if re.fullmatch(r'\d+\s*/\s*\d+', lowered) or re.fullmatch(r'page\s*\d+\s*/\s*\d+', lowered):
+        return
+    if re.fullmatch(r'\(\d{3}\)\s*\d{3}-\d{4}', lowered):
+        return
+    if re.fullmatch(r'\d{1,2}\s+[A-Z][A-Z0-9\s&\-/]+', line.strip()):
+        return
+    re.match(r'^\d{12,14}\b', line)
+
+
+def ns_per_line(classify, lines, repeats):
+    best = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for line in lines:
+            classify(line)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best / len(lines) * 1e9
+
+
+def run_benchmark(rows=2000, repeats=5):
+    cases = [
+        ('web invoice', web_invoice_lines(rows), inline_invoice_line, line_lexer.lex_invoice_line),
+        ('PLU list', plu_list_lines(rows), inline_plu_line, line_lexer.lex_plu_line),
+    ]
+
+    print(f"{'document':<12} {'lines':>7} {'inline ns/line':>15} {'lexer ns/line':>14}")
+    print("-" * 51)
+    for name, lines, inline, lexer in cases:
+        lines = [line for line in lines if line]
+        print(f"{name:<12} {len(lines):>7} {ns_per_line(inline, lines, repeats):>15.0f} {ns_per_line(lexer, lines, repeats):>14.0f}")
+
+    print("\nThe inline invoice checks above run once per line; the old web-style parser re-ran")
+    print("the noise check up to 3 times and the qty/units searches up to 8-9 times per line")
+    print("from its lookback/lookahead windows, while lexer tokens are computed once per line.")
+
+
+if __name__ == "__main__":
+    run_benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
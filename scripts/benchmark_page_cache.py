@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Page text cache benchmark - Compares invoice parsing pages/sec with and without the cache
+"""
+
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add backend to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "backend"))
+from page_text import PageTextCache
+from pdf_processor import LCBOInvoiceProcessor
+from synthetic_documents import WEB_INVOICE_ROWS_PER_PAGE, build_web_invoice
+
+
+class UncachedPageText(PageTextCache):
+    """Re-extract on every access, reproducing the pre-cache access pattern."""
+
+    def text(self, page_index):
+        return self.document.page_text(page_index)
+
+    def raw_lines(self, page_index):
+        return self.text(page_index).split('\n')
+
+    def lines(self, page_index):
+        return [line.strip() for line in self.raw_lines(page_index) if line.strip()]
+
+    def tokens(self, page_index, lex_line):
+        return [lex_line(line) for line in self.lines(page_index)]
+
+
+class UncachedInvoiceProcessor(LCBOInvoiceProcessor):
+    def _page_cache(self, pdf):
+        return UncachedPageText(pdf)
+
+
+def time_processor(processor_class, pdf_path, repeats):
+    """Return the best wall time of processor_class(pdf_path).process()."""
+    best = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        processor_class(pdf_path).process()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def run_benchmark(page_counts=(1, 20, 200), repeats=3):
+    print(f"{'pages':>6} {'before pages/s':>15} {'after pages/s':>14} {'speedup':>8}")
+    print("-" * 46)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for pages in page_counts:
+            pdf_path = os.path.join(tmp_dir, f"web_invoice_{pages}.pdf")
+            actual_pages = build_web_invoice(pdf_path, rows=max(1, pages * WEB_INVOICE_ROWS_PER_PAGE - 1))
+
+            before = time_processor(UncachedInvoiceProcessor, pdf_path, repeats)
+            after = time_processor(LCBOInvoiceProcessor, pdf_path, repeats)
+
+            print(f"{actual_pages:>6} {actual_pages / before:>15.1f} {actual_pages / after:>14.1f} {before / after:>7.2f}x")
+
+
+if __name__ == "__main__":
+    page_counts = tuple(int(arg) for arg in sys.argv[1:]) or (1, 20, 200)
+    run_benchmark(page_counts)
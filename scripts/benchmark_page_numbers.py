@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Page numbering benchmark - Condensed PDF write time, PyPDF2 overlay pass vs single-build numbering
+"""
+
+import os
+import sys
+import tempfile
+import time
+from io import BytesIO
+from pathlib import Path
+
+# Add backend to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "backend"))
+import pdf_processor
+from pdf_processor import LCBOInvoiceProcessor
+from synthetic_documents import build_web_invoice
+
+
+def add_page_numbers_with_pypdf2(output_path):
+    """The old post-build pass: reopen, overlay "N / total" on each page, rewrite."""
+    from PyPDF2 import PdfReader, PdfWriter
+    from reportlab.lib.pagesizes import letter
+    from reportlab.lib.units import inch
+    from reportlab.pdfgen import canvas as pdfcanvas
+
+    reader = PdfReader(output_path)
+    writer = PdfWriter()
+    total_pages = len(reader.pages)
+    for page_num, page in enumerate(reader.pages, 1):
+        packet = BytesIO()
+        can = pdfcanvas.Canvas(packet, pagesize=letter)
+        can.setFont("Helvetica", 9)
+        can.drawRightString(7.75*inch, 10.75*inch, f"{page_num} / {total_pages}")
+        can.save()
+        packet.seek(0)
+        page.merge_page(PdfReader(packet).pages[0])
+        writer.add_page(page)
+    with open(output_path, 'wb') as f:
+        writer.write(f)
+
+
+class OverlayNumberingProcessor(LCBOInvoiceProcessor):
+    """Build with a plain canvas, then number pages with the PyPDF2 pass."""
+
+    def generate_condensed_pdf(self, output_path):
+        canvasmaker = pdf_processor.NumberedCanvas
+        pdf_processor.NumberedCanvas = pdf_processor.canvas.Canvas
+        try:
+            super().generate_condensed_pdf(output_path)
+        finally:
+            pdf_processor.NumberedCanvas = canvasmaker
+        add_page_numbers_with_pypdf2(output_path)
+
+
+def time_render(processor, output_path, repeats):
+    best = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        processor.generate_condensed_pdf(output_path)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def run_benchmark(row_counts=(100, 1000, 5000), repeats=3):
+    try:
+        import PyPDF2  # noqa: F401
+    except ImportError:
+        print("PyPDF2 is needed for the 'before' timing: pip install PyPDF2")
+        sys.exit(1)
+
+    print(f"{'rows':>6} {'pages':>6} {'before s':>9} {'after s':>8} {'speedup':>8}")
+    print("-" * 41)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for rows in row_counts:
+            invoice_path = os.path.join(tmp_dir, f"invoice_{rows}.pdf")
+            output_path = os.path.join(tmp_dir, f"condensed_{rows}.pdf")
+            build_web_invoice(invoice_path, rows)
+
+            before_processor = OverlayNumberingProcessor(invoice_path)
+            before_processor.process()
+            after_processor = LCBOInvoiceProcessor(invoice_path)
+            after_processor.products = before_processor.products
+            after_processor.invoice_info = before_processor.invoice_info
+
+            before = time_render(before_processor, output_path, repeats)
+            after = time_render(after_processor, output_path, repeats)
+
+            from PyPDF2 import PdfReader
+            pages = len(PdfReader(output_path).pages)
+            print(f"{rows:>6} {pages:>6} {before:>9.3f} {after:>8.3f} {before / after:>7.2f}x")
+
+
+if __name__ == "__main__":
+    counts = tuple(int(arg) for arg in sys.argv[1:]) or (100, 1000, 5000)
+    run_benchmark(counts)
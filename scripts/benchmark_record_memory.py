@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Record memory benchmark - Compares bytes per row of dict rows with the slotted record types
+
+Usage: python benchmark_record_memory.py [rows ...]
+
+PLU rows and legacy invoice products are parsed from synthetic document
+lines into lists of dicts (what the parsers returned before; built with
+to_dict(), so they share interned labels with the records) and into lists
+of PluRecord / InvoiceProduct objects. Quick Order records compare the
+slotted WholesaleItemRecord with the same dataclass without slots. Sizes are
+measured with tracemalloc and include every string and number a row owns.
+"""
+
+import gc
+import random
+import sys
+import tracemalloc
+from dataclasses import dataclass
+from pathlib import Path
+
+# Add backend to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "backend"))
+from pdf_processor import LCBOInvoiceProcessor
+from plu_document import parse_row
+from synthetic_documents import legacy_invoice_lines, plu_list_lines
+from wholesale_cost_processor import WholesaleItemRecord
+
+
+@dataclass
+class UnslottedWholesaleItemRecord:
+    """WholesaleItemRecord as it was before slots=True."""
+    item: str
+    qty: int
+    wholesale_price: float | None = None
+    units: int | None = None
+    n_count: int = 1
+    z_ml: float | None = None
+    sku_not_found: bool = False
+
+
+def allocated_bytes(build):
+    """Return (result, bytes still allocated by build()) with nothing else held."""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = build()
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, after - before
+
+
+def plu_row_texts(rows):
+    # Rows that wrap in the source report are skipped; the rest parse on their own.
+    return [line for line in plu_list_lines(rows) if line and parse_row(line)][:rows]
+
+
+def legacy_product_lines(rows):
+    return [line for line in legacy_invoice_lines(rows) if line and line[0].isdigit()]
+
+
+def quick_order_values(rows):
+    rng = random.Random(0)
+    return [
+        (str(rng.randint(10000, 999999)), rng.randint(1, 24), round(rng.uniform(5, 400), 2),
+         rng.choice([6, 12, 24]), 1, float(rng.choice([355, 750, 1140])))
+        for _ in range(rows)
+    ]
+
+
+def measure(rows):
+    """Yield (record type, rows, dict bytes/row, slotted bytes/row)."""
+    texts = plu_row_texts(rows)
+    _, before = allocated_bytes(lambda: [parse_row(text).to_dict() for text in texts])
+    _, after = allocated_bytes(lambda: [parse_row(text) for text in texts])
+    yield 'PluRecord', len(texts), before / len(texts), after / len(texts)
+
+    processor = LCBOInvoiceProcessor('')
+    lines = legacy_product_lines(rows)
+    _, before = allocated_bytes(lambda: [processor.parse_product_line(line).to_dict() for line in lines])
+    _, after = allocated_bytes(lambda: [processor.parse_product_line(line) for line in lines])
+    yield 'InvoiceProduct', len(lines), before / len(lines), after / len(lines)
+
+    values = quick_order_values(rows)
+    _, before = allocated_bytes(lambda: [UnslottedWholesaleItemRecord(*value) for value in values])
+    _, after = allocated_bytes(lambda: [WholesaleItemRecord(*value) for value in values])
+    yield 'WholesaleItemRecord', len(values), before / len(values), after / len(values)
+
+
+def run_benchmark(row_counts=(1000, 10000, 50000)):
+    print(f"{'record':<20} {'rows':>7} {'dict B/row':>11} {'slots B/row':>12} {'saved':>7}")
+    print("-" * 61)
+    for rows in row_counts:
+        for name, count, before, after in measure(rows):
+            print(f"{name:<20} {count:>7} {before:>11.0f} {after:>12.0f} {1 - after / before:>6.0%}")
+
+
+if __name__ == "__main__":
+    row_counts = tuple(int(arg) for arg in sys.argv[1:]) or (1000, 10000, 50000)
+    run_benchmark(row_counts)
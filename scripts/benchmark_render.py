@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Render benchmark - Condensed PDF build time, one styled-per-row table vs the large-invoice layout
+
+Usage: python benchmark_render.py [rows ...]
+
+Synthetic web invoices are parsed once; every ninth product is marked short
+shipped so bold rows are exercised. Each invoice is then rendered with the
+single table (LARGE_INVOICE_ROWS raised above the row count) and with the
+chunked LongTable layout (LARGE_INVOICE_ROWS lowered to 0), and the best of
+the repeats is reported.
+"""
+
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add backend to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "backend"))
+import pdf_processor
+from pdf_processor import LCBOInvoiceProcessor
+from synthetic_documents import build_web_invoice
+
+
+def time_render(processor, output_path, large_invoice_rows, repeats):
+    threshold = pdf_processor.LARGE_INVOICE_ROWS
+    pdf_processor.LARGE_INVOICE_ROWS = large_invoice_rows
+    try:
+        best = None
+        for _ in range(repeats):
+            start = time.perf_counter()
+            processor.generate_condensed_pdf(output_path)
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        return best
+    finally:
+        pdf_processor.LARGE_INVOICE_ROWS = threshold
+
+
+def page_count(path):
+    import pdfplumber
+    with pdfplumber.open(path) as pdf:
+        return len(pdf.pages)
+
+
+def run_benchmark(row_counts=(100, 1000, 5000), repeats=3):
+    print(f"{'rows':>6} {'pages':>6} {'table s':>8} {'large s':>8} {'speedup':>8}")
+    print("-" * 40)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for rows in row_counts:
+            invoice_path = os.path.join(tmp_dir, f"invoice_{rows}.pdf")
+            table_path = os.path.join(tmp_dir, f"table_{rows}.pdf")
+            large_path = os.path.join(tmp_dir, f"large_{rows}.pdf")
+            build_web_invoice(invoice_path, rows)
+
+            processor = LCBOInvoiceProcessor(invoice_path, deterministic=True)
+            processor.process()
+            for product in processor.products[::9]:
+                product.shipped = max(0, product.ordered - 1)
+
+            table = time_render(processor, table_path, rows + 1, repeats)
+            large = time_render(processor, large_path, 0, repeats)
+
+            pages = page_count(large_path)
+            if pages != page_count(table_path):
+                print(f"{rows:>6}: page counts differ between layouts")
+            print(f"{rows:>6} {pages:>6} {table:>8.3f} {large:>8.3f} {table / large:>7.2f}x")
+
+
+if __name__ == "__main__":
+    counts = tuple(int(arg) for arg in sys.argv[1:]) or (100, 1000, 5000)
+    run_benchmark(counts)
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Parallel PLU parsing check - page-range parsing must match the serial parse exactly
+
+Usage: python check_parallel_plu.py [PDF ...] [--rows 100,700,2000] [--workers 4] [--engine pdfplumber]
+
+Without PDFs, PLU lists are generated with and without rows that wrap
+across page breaks. For each document the page ranges are split every
+possible way (one page per range up to the whole document) and the merged
+records are compared with the serial parse (with the pdfium engine when it
+is installed, to keep the many re-parses quick); then PluProfitCSVExtractor
+and SupplierCSVExtractor are run with worker processes and compared and
+timed against the serial path.
+Exits with status 1 on any mismatch.
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+SCRIPTS_DIR = Path(__file__).parent
+BACKEND_DIR = SCRIPTS_DIR.parent / "backend"
+sys.path.insert(0, str(BACKEND_DIR))
+sys.path.insert(0, str(SCRIPTS_DIR))
+
+import text_engines  # noqa: E402
+from plu_document import iter_records, merge_page_ranges, page_ranges, parse_page_range  # noqa: E402
+from plu_profit_csv_processor import PluProfitCSVExtractor  # noqa: E402
+from supplier_csv_processor import SupplierCSVExtractor  # noqa: E402
+
+
+def check_splits(pdf_path, engine):
+    """Merge every range split in-process; return the page and record counts and the split sizes that disagree."""
+    expected = list(iter_records(pdf_path, engine))
+    page_count = text_engines.page_count(pdf_path, engine)
+    failures = []
+    for range_count in range(1, page_count + 1):
+        parts = [
+            parse_page_range(pdf_path, start, stop, engine) for start, stop in page_ranges(page_count, range_count)
+        ]
+        if merge_page_ranges(parts) != expected:
+            failures.append(range_count)
+    return page_count, len(expected), failures
+
+
+def check_extractors(pdf_path, workers, engine):
+    """Compare the extractors with and without worker processes; return (ok, serial s, parallel s)."""
+    start = time.perf_counter()
+    serial_rows = PluProfitCSVExtractor(pdf_path, text_engine=engine).extract_rows()
+    serial_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    parallel_rows = PluProfitCSVExtractor(pdf_path, text_engine=engine, workers=workers).extract_rows()
+    parallel_seconds = time.perf_counter() - start
+
+    skus_match = (
+        SupplierCSVExtractor(pdf_path, text_engine=engine).extract_suppliers()
+        == SupplierCSVExtractor(pdf_path, text_engine=engine, workers=workers).extract_suppliers()
+    )
+    return serial_rows == parallel_rows and skus_match, serial_seconds, parallel_seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('pdfs', nargs='*', help='PLU PDFs to check (default: generated PLU lists)')
+    parser.add_argument('--rows', default='100,700,2000', help='rows per generated PLU list')
+    parser.add_argument('--workers', type=int, default=4, help='worker processes for the timed run')
+    parser.add_argument('--engine', default=None, help='text engine for the timed run (default: LCBO_TEXT_ENGINE)')
+    args = parser.parse_args()
+    split_engine = 'pdfium' if 'pdfium' in text_engines.available_engines() else None
+
+    failures = 0
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        pdf_paths = args.pdfs
+        if not pdf_paths:
+            from synthetic_documents import build_plu_list
+            pdf_paths = []
+            for rows in (int(value) for value in args.rows.split(',') if value.strip()):
+                for wrap in (False, True):
+                    pdf_path = os.path.join(tmp_dir, f"plu_{rows}{'_wrapped' if wrap else ''}.pdf")
+                    build_plu_list(pdf_path, rows, wrap_across_pages=wrap)
+                    pdf_paths.append(pdf_path)
+
+        print(f"{'file':<28} {'pages':>5} {'records':>7} {'splits':>8} {'serial s':>9} {'parallel s':>10}  result")
+        print("-" * 80)
+        for pdf_path in pdf_paths:
+            page_count, record_count, split_failures = check_splits(pdf_path, split_engine)
+            extractors_match, serial_seconds, parallel_seconds = check_extractors(pdf_path, args.workers, args.engine)
+
+            ok = not split_failures and extractors_match
+            failures += not ok
+            if ok:
+                result = 'ok'
+            elif split_failures:
+                result = f'MISMATCH with {split_failures[:5]} ranges'
+            else:
+                result = 'MISMATCH in extractor output'
+            print(
+                f"{os.path.basename(pdf_path)[:28]:<28} {page_count:>5} {record_count:>7} {page_count:>8} "
+                f"{serial_seconds:>9.3f} {parallel_seconds:>10.3f}  {result}"
+            )
+
+    print(f"\n{failures} failure(s)")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
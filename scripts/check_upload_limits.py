@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Upload limit check - oversized requests must be answered with 413, with or without Content-Length
+
+Usage: python check_upload_limits.py [--limit BYTES]
+
+Runs the API in-process with LCBO_MAX_REQUEST_BYTES set to the limit and
+posts multipart /upload bodies twice the limit: once with a Content-Length
+header and once chunked (no Content-Length, counted as it arrives). A small
+synthetic invoice sent chunked must still be accepted.
+Exits with status 1 on any unexpected status code.
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+SCRIPTS_DIR = Path(__file__).parent
+BACKEND_DIR = SCRIPTS_DIR.parent / "backend"
+sys.path.insert(0, str(BACKEND_DIR))
+sys.path.insert(0, str(SCRIPTS_DIR))
+
+BOUNDARY = "lcbo-upload-limit-check"
+
+
+def multipart_parts(filename, payload, chunk_size=1024):
+    """Yield a one-file multipart body in chunks, so the client sends it chunked."""
+    yield (
+        f'--{BOUNDARY}\r\nContent-Disposition: form-data; name="files"; filename="{filename}"\r\n'
+        'Content-Type: application/pdf\r\n\r\n'
+    ).encode()
+    for start in range(0, len(payload), chunk_size):
+        yield payload[start:start + chunk_size]
+    yield f'\r\n--{BOUNDARY}--\r\n'.encode()
+
+
+def run_checks(limit):
+    # The limit is read when the API modules are imported.
+    os.environ["LCBO_MAX_REQUEST_BYTES"] = str(limit)
+    os.environ.setdefault("LCBO_CACHE_DIR", tempfile.mkdtemp(prefix="lcbo_cache_"))
+    from fastapi.testclient import TestClient
+
+    import main
+    from synthetic_documents import build_web_invoice
+
+    headers = {"content-type": f"multipart/form-data; boundary={BOUNDARY}"}
+    oversized = b"%PDF-" + b"x" * (2 * limit)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        invoice_path = os.path.join(tmp_dir, "invoice.pdf")
+        build_web_invoice(invoice_path, 5)
+        invoice = Path(invoice_path).read_bytes()
+        if len(invoice) >= limit:
+            print(f"The sample invoice ({len(invoice)} bytes) does not fit under --limit {limit}")
+            return False
+
+        checks = [
+            ("oversized, Content-Length", b"".join(multipart_parts("big.pdf", oversized)), 413),
+            ("oversized, chunked", multipart_parts("big.pdf", oversized), 413),
+            ("within limit, chunked", multipart_parts("invoice.pdf", invoice), 200),
+        ]
+        ok = True
+        with TestClient(main.app) as client:
+            for name, body, expected in checks:
+                response = client.post("/upload", content=body, headers=headers)
+                passed = response.status_code == expected
+                ok &= passed
+                print(f"{'✓' if passed else '✗'} {name}: {response.status_code} (expected {expected})")
+                if response.status_code == 200:
+                    client.delete(f"/cleanup/{response.json()['session_id']}")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--limit', type=int, default=20000, help='LCBO_MAX_REQUEST_BYTES to test (default: 20000)')
+    args = parser.parse_args()
+    sys.exit(0 if run_checks(args.limit) else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Text engine parity check - every processor must produce identical rows under each engine
+
+Usage: python engine_parity.py [PDF ...] [--engines pdfplumber,pdfium] [--rows 200]
+
+Without PDFs, synthetic documents of all four formats are generated. Each
+processor runs on each PDF under every engine; rows are compared with the
+pdfplumber results and the time per engine is reported. Exits with status 1
+on any mismatch, so a new engine (or a change to one) can be checked against
+real invoices before it is made the default.
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from dataclasses import asdict
+from pathlib import Path
+
+SCRIPTS_DIR = Path(__file__).parent
+BACKEND_DIR = SCRIPTS_DIR.parent / "backend"
+sys.path.insert(0, str(BACKEND_DIR))
+sys.path.insert(0, str(SCRIPTS_DIR))
+
+import text_engines  # noqa: E402
+from pdf_processor import LCBOInvoiceProcessor  # noqa: E402
+from plu_profit_csv_processor import PluProfitCSVExtractor  # noqa: E402
+from supplier_csv_processor import SupplierCSVExtractor  # noqa: E402
+from wholesale_cost_processor import WholesaleCostCalculator  # noqa: E402
+
+REFERENCE_ENGINE = text_engines.DEFAULT_TEXT_ENGINE
+
+
+def _invoice(pdf_path, engine):
+    invoice_info, products = LCBOInvoiceProcessor(pdf_path, engine).process()
+    return [invoice_info] + products
+
+
+def _quick_order(pdf_path, engine):
+    return [asdict(record) for record in WholesaleCostCalculator(pdf_path, engine).parse_quick_order()]
+
+
+def _supplier_skus(pdf_path, engine):
+    return SupplierCSVExtractor(pdf_path, text_engine=engine).extract_suppliers()
+
+
+def _plu_profit(pdf_path, engine):
+    return PluProfitCSVExtractor(pdf_path, text_engine=engine).extract_rows()
+
+
+PROCESSORS = {
+    'LCBOInvoiceProcessor': _invoice,
+    'WholesaleCostCalculator': _quick_order,
+    'SupplierCSVExtractor': _supplier_skus,
+    'PluProfitCSVExtractor': _plu_profit,
+}
+
+
+def _timed(run, pdf_path, engine):
+    """Return (rows, seconds); rows is an "error" marker when the PDF cannot be read."""
+    start = time.perf_counter()
+    try:
+        rows = run(pdf_path, engine)
+    except Exception as e:
+        # Engines raise different exception types; failing under both counts as a match.
+        rows = [f"error: {type(e).__name__}"]
+    return rows, time.perf_counter() - start
+
+
+def _failed(rows):
+    return len(rows) == 1 and isinstance(rows[0], str) and rows[0].startswith("error: ")
+
+
+def _first_difference(expected, actual):
+    for index, (left, right) in enumerate(zip(expected, actual)):
+        if left != right:
+            return f"row {index}: {left!r} != {right!r}"
+    return f"row count {len(expected)} != {len(actual)}"
+
+
+def check(pdf_paths, engines):
+    """Run every processor under every engine and return the number of mismatches."""
+    mismatches = 0
+    print(f"{'file':<28} {'processor':<24} {'engine':<11} {'rows':>6} {'seconds':>8} {'speedup':>8}  result")
+    print("-" * 98)
+    for pdf_path in pdf_paths:
+        for processor_name, run in PROCESSORS.items():
+            expected, reference_seconds = _timed(run, pdf_path, REFERENCE_ENGINE)
+
+            for engine in engines:
+                if engine == REFERENCE_ENGINE:
+                    actual, seconds = expected, reference_seconds
+                else:
+                    actual, seconds = _timed(run, pdf_path, engine)
+
+                matches = actual == expected or (_failed(actual) and _failed(expected))
+                result = 'ok' if matches else 'MISMATCH ' + _first_difference(expected, actual)
+                mismatches += not matches
+                print(
+                    f"{os.path.basename(pdf_path)[:28]:<28} {processor_name:<24} {engine:<11} {len(actual):>6} "
+                    f"{seconds:>8.3f} {reference_seconds / max(seconds, 1e-9):>7.1f}x  {result}"
+                )
+    return mismatches
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('pdfs', nargs='*', help='PDFs to check (default: generated synthetic documents)')
+    parser.add_argument('--engines', default=','.join(text_engines.available_engines()),
+                        help='comma-separated engines to compare with pdfplumber')
+    parser.add_argument('--rows', type=int, default=200, help='rows per synthetic document')
+    args = parser.parse_args()
+
+    engines = [engine.strip() for engine in args.engines.split(',') if engine.strip()]
+    for engine in engines:
+        try:
+            text_engines.resolve_engine(engine)
+        except ValueError as e:
+            parser.error(str(e))
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        pdf_paths = args.pdfs
+        if not pdf_paths:
+            from synthetic_documents import BUILDERS, build_document
+            pdf_paths = []
+            for doc_format in BUILDERS:
+                pdf_path = os.path.join(tmp_dir, f'{doc_format}_{args.rows}.pdf')
+                build_document(doc_format, pdf_path, args.rows)
+                pdf_paths.append(pdf_path)
+
+        mismatches = check(pdf_paths, engines)
+
+    print(f"\n{mismatches} mismatch(es)")
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+"""
+Synthetic LCBO document generator - Builds realistic test PDFs with reportlab
+
+Usage: python synthetic_documents.py <legacy|web|quick-order|plu> <rows> <output.pdf> [seed]
+"""
+
+import random
+import sys
+
+from reportlab.lib.pagesizes import letter
+from reportlab.lib.units import inch
+from reportlab.pdfgen import canvas
+
+
+PRODUCT_WORDS = [
+    'CABERNET', 'SAUVIGNON', 'MERLOT', 'CHARDONNAY', 'PINOT', 'NOIR', 'GRIGIO',
+    'RIESLING', 'LAGER', 'PILSNER', 'IPA', 'VODKA', 'GIN', 'RUM', 'WHISKY',
+    'BOURBON', 'CIDER', 'SELTZER', 'RESERVE', 'ESTATE', 'VALLEY', 'CREEK',
+]
+SIZES_ML = [355, 473, 500, 750, 1000, 1140, 1750]
+CASE_UNITS = [6, 12, 24]
+SUPPLIERS = ['LCBO', 'Brewers Retail Inc.', 'Ontario Craft Wineries']
+PLU_SECTIONS = ['WINE', 'BEER & CIDER', 'SPIRITS', 'COOLERS / RTD']
+PLU_LABELS = ['EA', 'BTL', 'CAN', '6PK']
+
+LINE_HEIGHT = 14
+TOP_Y = letter[1] - 0.75 * inch
+BOTTOM_Y = 0.75 * inch
+
+# Product blocks in the web-style invoice are five lines tall, plus section headers.
+WEB_INVOICE_ROWS_PER_PAGE = int((TOP_Y - BOTTOM_Y) // (LINE_HEIGHT * 6))
+# PLU rows are one line (occasionally two), below a four-line page header.
+PLU_ROWS_PER_PAGE = int((TOP_Y - BOTTOM_Y) // LINE_HEIGHT) - 12
+# Lines _write_lines fits on one page.
+LINES_PER_PAGE = int((TOP_Y - BOTTOM_Y) // LINE_HEIGHT) + 1
+
+LEGACY_TABLE_HEADER = 'PRODUCT # SIZE (mL) DESCRIPTION DEP ORDERED SHIPPED RETAIL DISCOUNT EXTENDED'
+
+
+def _product_name(rng):
+    return ' '.join(rng.choice(PRODUCT_WORDS) for _ in range(rng.randint(2, 4)))
+
+
+def _write_lines(output_path, lines):
+    """Write text lines top to bottom, starting a new page when one fills up."""
+    pdf = canvas.Canvas(output_path, pagesize=letter)
+    pdf.setFont('Helvetica', 10)
+    y = TOP_Y
+    page_count = 1
+
+    for line in lines:
+        if line is None or y < BOTTOM_Y:
+            pdf.showPage()
+            pdf.setFont('Helvetica', 10)
+            y = TOP_Y
+            page_count += 1
+            if line is None:
+                continue
+        pdf.drawString(0.75 * inch, y, line)
+        y -= LINE_HEIGHT
+
+    pdf.save()
+    return page_count
+
+
+def web_invoice_lines(rows, seed=0):
+    """Return the text lines of a web-style invoice; None marks a page break."""
+    rng = random.Random(seed)
+    lines = [
+        'Order # 900123456',
+        'Date: April 15, 2026',
+        'Status: Complete',
+    ]
+
+    section_size = max(1, rows // len(SUPPLIERS))
+    rows_on_page = 0
+    for row_idx in range(rows):
+        if row_idx % section_size == 0:
+            supplier = SUPPLIERS[(row_idx // section_size) % len(SUPPLIERS)]
+            lines.append(f'Fulfilled by: {supplier} Fulfillment method: Delivery')
+        if rows_on_page == WEB_INVOICE_ROWS_PER_PAGE:
+            lines.append(None)
+            rows_on_page = 0
+
+        ordered = rng.randint(1, 10)
+        price = rng.uniform(20, 400)
+        lines.extend([
+            f'{_product_name(rng)} Wholesale price: ${price:,.2f}',
+            f'LCBO#: {rng.randint(10000, 999999)} {rng.choice(SIZES_ML)} mL',
+            f'{{ {rng.choice(CASE_UNITS)} units }}',
+            f'Qty. Ordered: {ordered}',
+            f'${price * ordered:,.2f}',
+        ])
+        rows_on_page += 1
+
+    lines.extend(['Delivery Address', 'NEW DUNDEE VILLAGE MARKET', 'Order total: $1,234.56'])
+    return lines
+
+
+def build_web_invoice(output_path, rows, seed=0):
+    """Build a web-style invoice with LCBO#:/Qty. Ordered: product blocks."""
+    return _write_lines(output_path, web_invoice_lines(rows, seed))
+
+
+def plu_list_lines(rows, seed=0, wrap_across_pages=False):
+    """Return the text lines of a PLU list with cost and active price; None marks a page break.
+
+    With wrap_across_pages the last row of every page but the last wraps onto
+    the top of the next page, below its header.
+    """
+    rng = random.Random(seed)
+    total_pages = max(1, -(-rows // PLU_ROWS_PER_PAGE))
+    lines = []
+    carried_line = None
+
+    for page_idx in range(total_pages):
+        if page_idx:
+            lines.append(None)
+        lines.extend([
+            'PLU List with Cost and Active Price',
+            'NEW DUNDEE VILLAGE MARKET',
+            'Printed: 2026-04-15 08:30',
+            '# Description Vendor SKU Label Price Cost Profit %Profit',
+        ])
+        if carried_line is not None:
+            lines.append(carried_line)
+            carried_line = None
+        page_rows = range(page_idx * PLU_ROWS_PER_PAGE, min(rows, (page_idx + 1) * PLU_ROWS_PER_PAGE))
+        for row_idx in page_rows:
+            if row_idx % 40 == 0:
+                lines.append(f'{10 + row_idx // 40 % 80} {rng.choice(PLU_SECTIONS)}')
+            price = rng.uniform(2, 90)
+            cost = price * rng.uniform(0.55, 0.95)
+            profit = price - cost
+            row = (
+                f'{rng.randint(10 ** 11, 10 ** 13 - 1):013d} {_product_name(rng)} '
+                f'{rng.randint(10000, 999999)} {rng.choice(PLU_LABELS)} '
+                f'${price:,.2f} ${cost:,.2f} ${profit:,.2f} {profit / price * 100:.2f}'
+            )
+            if wrap_across_pages and row_idx == page_rows[-1] and page_idx < total_pages - 1:
+                split_at = row.index(' ', 20)
+                lines.append(row[:split_at])
+                carried_line = row[split_at + 1:]
+            # Long descriptions wrap onto a second line in the source report.
+            elif rng.random() < 0.15:
+                split_at = row.index(' ', 20)
+                lines.extend([row[:split_at], row[split_at + 1:]])
+            else:
+                lines.append(row)
+        lines.append(f'Page {page_idx + 1} / {total_pages}')
+
+    return lines
+
+
+def build_plu_list(output_path, rows, seed=0, wrap_across_pages=False):
+    """Build a PLU list with cost and active price, with section headings and wrapped rows."""
+    return _write_lines(output_path, plu_list_lines(rows, seed, wrap_across_pages))
+
+
+def _legacy_page_header(page_idx):
+    header = []
+    if page_idx == 0:
+        header.extend([
+            'LIQUOR CONTROL BOARD OF ONTARIO',
+            'ORDER # 4471203 ORDER DATE 04/15/2026',
+            'SOLD TO RECIPIENT SHIP TO RECIPIENT',
+            'NEW DUNDEE VILLAGE MARKET',
+            'Customer #: 204518',
+            'HST 13% INCLUDED',
+        ])
+    header.append(LEGACY_TABLE_HEADER)
+    return header
+
+
+def legacy_invoice_lines(rows, seed=0):
+    """Return the text lines of a legacy tabular invoice; None marks a page break.
+
+    Most rows carry their description inline; about a quarter put it on the
+    following line, as the printed invoices do for long names.
+    """
+    rng = random.Random(seed)
+    pages = [[]]
+    page_lines = _legacy_page_header(0)
+
+    for _ in range(rows):
+        if rng.random() < 0.2:
+            size = f'{rng.choice(CASE_UNITS)} x {rng.choice([355, 473])}'
+            dep = '0.60' if size.startswith('6 ') else '1.20' if size.startswith('12 ') else '2.40'
+        else:
+            size = str(rng.choice(SIZES_ML))
+            dep = '0.20' if int(size) > 630 else '0.10'
+        ordered = rng.randint(1, 12)
+        shipped = ordered if rng.random() < 0.9 else rng.randint(0, ordered)
+        retail = rng.uniform(2, 90)
+        number = rng.randint(10000, 999999)
+        name = _product_name(rng)
+        amounts = f'{dep} {ordered} {shipped} {retail:.2f} 0.00 {retail * shipped:.2f}'
+
+        if rng.random() < 0.25:
+            row_lines = [f'{number} {size} {amounts}', name]
+        else:
+            row_lines = [f'{number} {size} {name} {amounts}']
+
+        # Leave room for the footer line at the bottom of each page.
+        if len(page_lines) + len(row_lines) > LINES_PER_PAGE - 1:
+            pages[-1] = page_lines
+            pages.append([])
+            page_lines = _legacy_page_header(len(pages) - 1)
+        page_lines.extend(row_lines)
+    pages[-1] = page_lines
+
+    lines = []
+    for page_idx, page_lines in enumerate(pages):
+        if page_idx:
+            lines.append(None)
+        lines.extend(page_lines)
+        lines.append(f'CUSTOMER COPY PAGE {page_idx + 1} OF {len(pages)}')
+    return lines
+
+
+def build_legacy_invoice(output_path, rows, seed=0):
+    """Build a legacy invoice with the PRODUCT #/SIZE (mL) product table."""
+    return _write_lines(output_path, legacy_invoice_lines(rows, seed))
+
+
+def quick_order_lines(rows, seed=0, items=None):
+    """Return the text lines of a Quick Order; items optionally fixes the LCBO numbers used.
+
+    Each item is an "<item> <qty> Remove" row followed by its name, LCBO#,
+    size, case units and wholesale price; a few are flagged "sku was not found".
+    """
+    rng = random.Random(seed)
+    lines = ['Quick Order', 'Item # Qty']
+
+    for row_idx in range(rows):
+        item = items[row_idx % len(items)] if items else str(rng.randint(10000, 999999))
+        qty = rng.randint(1, 6)
+        units = rng.choice(CASE_UNITS)
+        if rng.random() < 0.25:
+            size = f'{rng.choice([6, 12, 24])} x {rng.choice([355, 473])} mL'
+        elif rng.random() < 0.1:
+            size = f'{rng.choice(["1.5", "3"])} L'
+        else:
+            size = f'{rng.choice(SIZES_ML)} mL'
+
+        lines.extend([
+            f'{item} {qty} Remove',
+            _product_name(rng),
+            f'LCBO#: {item}',
+            size,
+            f'{{ {units} units }}',
+        ])
+        if rng.random() < 0.03:
+            lines.append('This sku was not found')
+        lines.append(f'Wholesale price: ${rng.uniform(20, 600) * qty:,.2f}')
+
+    return lines
+
+
+def build_quick_order(output_path, rows, seed=0, items=None):
+    """Build a Quick Order with Remove rows; items blocks flow across page breaks."""
+    return _write_lines(output_path, quick_order_lines(rows, seed, items))
+
+
+BUILDERS = {
+    'legacy': build_legacy_invoice,
+    'web': build_web_invoice,
+    'quick-order': build_quick_order,
+    'plu': build_plu_list,
+}
+
+
+def build_document(kind, output_path, rows, seed=0):
+    """Build one synthetic document of the given format and return its page count."""
+    if kind not in BUILDERS:
+        raise ValueError(f"Unknown document format: {kind}")
+    return BUILDERS[kind](output_path, rows, seed)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 4:
+        print(__doc__.strip().splitlines()[-1])
+        sys.exit(1)
+    kind, rows, output_path = sys.argv[1], int(sys.argv[2]), sys.argv[3]
+    seed = int(sys.argv[4]) if len(sys.argv) > 4 else 0
+    page_count = build_document(kind, output_path, rows, seed)
+    print(f"Wrote {output_path}: {rows} rows, {page_count} pages")
@@ -0,0 +1,322 @@
+#!/usr/bin/env python3
+"""
+Watch-folder daemon - condense invoice PDFs as they arrive in a folder
+
+Usage: python watch_folder.py [directory] [--workers N] [--settle SECONDS] [--poll]
+
+New or changed PDFs are picked up with inotify on Linux (polling elsewhere,
+or with --poll). A file is only processed once its size and modification
+time have stayed the same for --settle seconds, so invoices still being
+written by a scanner or mail rule are left alone. Settled files are
+condensed in a pool of --workers processes and <name>_condensed.pdf is
+written next to each one. If a worker dies (OOM kill, segfault), the invoices
+it had in flight are reported as failed and a new pool is started.
+
+Handled files are recorded in the same batch_manifest.json that
+batch_process.py keeps (input SHA-256, parser version and text engine), so
+after a restart only new or changed invoices are processed. Stop with
+Ctrl+C or SIGTERM; invoices already being condensed are finished first.
+"""
+
+import argparse
+import ctypes
+import ctypes.util
+import fnmatch
+import os
+import select
+import shutil
+import signal
+import struct
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+
+SCRIPTS_DIR = Path(__file__).parent
+sys.path.insert(0, str(SCRIPTS_DIR.parent / "backend"))
+sys.path.insert(0, str(SCRIPTS_DIR))
+
+import text_engines  # noqa: E402
+from pdf_processor import COMBINED_PDF_FILENAME  # noqa: E402
+from batch_process import (  # noqa: E402
+    MANIFEST_FILENAME, condense_file, condensed_path, file_sha256, load_manifest, manifest_entry,
+    reusable_output, save_manifest,
+)
+
+# inotify(7) constants
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_Q_OVERFLOW = 0x00004000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+_EVENT_HEADER = struct.Struct('iIII')
+
+
+class InotifyWatcher:
+    """Directory change notifications from Linux inotify, via libc."""
+
+    def __init__(self, directory):
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or None, use_errno=True)
+        if not hasattr(libc, 'inotify_init1'):
+            raise OSError("inotify is not available on this platform")
+        self.fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        mask = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+        if libc.inotify_add_watch(self.fd, os.fsencode(directory), mask) < 0:
+            error = ctypes.get_errno()
+            os.close(self.fd)
+            raise OSError(error, f"inotify_add_watch failed for {directory}")
+
+    def wait(self, timeout):
+        """Return the names changed within timeout seconds, or None when the whole folder must be rescanned."""
+        try:
+            ready, _, _ = select.select([self.fd], [], [], timeout)
+        except InterruptedError:
+            return set()
+        if not ready:
+            return set()
+
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return set()
+        names = set()
+        offset = 0
+        while offset < len(data):
+            _, mask, _, length = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            if mask & IN_Q_OVERFLOW:
+                return None
+            name = data[offset:offset + length].rstrip(b'\0')
+            offset += length
+            if name:
+                names.add(os.fsdecode(name))
+        return names
+
+    def close(self):
+        os.close(self.fd)
+
+
+class PollingWatcher:
+    """Fallback that asks for a full rescan every interval."""
+
+    def __init__(self, interval):
+        self.interval = interval
+
+    def wait(self, timeout):
+        time.sleep(min(timeout, self.interval))
+        return None
+
+    def close(self):
+        pass
+
+
+class FolderWatcher:
+    """Debounce arriving PDFs and condense them in a bounded process pool."""
+
+    def __init__(self, directory, pattern="*.pdf", workers=None, settle=2.0, text_engine=None,
+                 manifest_path=None, poll=False, poll_interval=2.0, rescan_interval=300.0):
+        self.directory = directory
+        self.pattern = pattern
+        self.workers = max(1, workers or os.cpu_count() or 1)
+        self.settle = settle
+        self.text_engine = text_engines.resolve_engine(text_engine)
+        self.manifest_path = manifest_path or os.path.join(directory, MANIFEST_FILENAME)
+        self.manifest = load_manifest(self.manifest_path)
+        self.poll = poll
+        self.poll_interval = poll_interval
+        # A safety net for events inotify can miss (network filesystems, queue overflow).
+        self.rescan_interval = rescan_interval
+
+        # path -> (size, mtime_ns) of the version last processed or skipped
+        self.handled = {}
+        # path -> ((size, mtime_ns), monotonic time that version was first seen)
+        self.settling = {}
+        # future -> (path, output path, sha256, (size, mtime_ns))
+        self.running = {}
+        self.processed = 0
+        self.skipped = 0
+        self.failed = 0
+        self.executor = None
+        self._stopping = False
+
+    def _wants(self, name):
+        return fnmatch.fnmatch(name, self.pattern) and '_condensed' not in name and name != COMBINED_PDF_FILENAME
+
+    def _observe(self, name):
+        """Note the current version of a file, restarting its settle time if it changed."""
+        if not self._wants(name):
+            return
+        path = os.path.join(self.directory, name)
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            self.settling.pop(path, None)
+            self.handled.pop(path, None)
+            return
+        signature = (stat.st_size, stat.st_mtime_ns)
+        if self.handled.get(path) == signature:
+            return
+        previous = self.settling.get(path)
+        if previous is None or previous[0] != signature:
+            self.settling[path] = (signature, time.monotonic())
+
+    def _scan(self):
+        for entry in os.scandir(self.directory):
+            if entry.is_file():
+                self._observe(entry.name)
+
+    def _replace_executor(self):
+        """Swap in a fresh pool after a worker died (OOM kill, segfault) and broke the current one."""
+        print("A worker process died; starting a new pool", flush=True)
+        self.executor.shutdown(wait=False)
+        self.executor = ProcessPoolExecutor(max_workers=self.workers)
+
+    def _dispatch(self):
+        """Submit settled files while the pool has a free worker."""
+        now = time.monotonic()
+        busy = {path for path, _, _, _ in self.running.values()}
+        for path, (signature, since) in list(self.settling.items()):
+            if len(self.running) >= self.workers:
+                return
+            if path in busy or now - since < self.settle or signature[0] == 0:
+                continue
+            del self.settling[path]
+
+            output_file = condensed_path(path)
+            try:
+                sha256 = file_sha256(path)
+            except FileNotFoundError:
+                continue
+            existing_output = reusable_output(self.manifest.get(sha256), self.text_engine, output_file, self.directory)
+            if existing_output is not None:
+                if existing_output != output_file:
+                    shutil.copyfile(existing_output, output_file)
+                self.handled[path] = signature
+                self.skipped += 1
+                continue
+
+            try:
+                future = self.executor.submit(condense_file, path, output_file, self.text_engine)
+            except BrokenProcessPool:
+                # The pool broke while idle; this file was not the cause, so submit it to a new one.
+                self._replace_executor()
+                future = self.executor.submit(condense_file, path, output_file, self.text_engine)
+            self.running[future] = (path, output_file, sha256, signature)
+            busy.add(path)
+
+    def _collect(self, futures):
+        broken = False
+        for future in futures:
+            path, output_file, sha256, signature = self.running.pop(future)
+            try:
+                result = future.result()
+            except BrokenProcessPool:
+                # Every invoice in flight on the broken pool fails, not only the one that crashed it.
+                broken = True
+                result = {'status': 'ERROR', 'error': 'worker process died while condensing'}
+            except Exception as e:
+                result = {'status': 'ERROR', 'error': str(e)}
+
+            # Failed files are retried when they change or the watcher restarts.
+            self.handled[path] = signature
+            name = os.path.basename(path)
+            if result['status'] == 'SUCCESS':
+                self.processed += 1
+                self.manifest[sha256] = manifest_entry(result, path, output_file, self.text_engine)
+                save_manifest(self.manifest_path, self.manifest)
+                print(f"✓ {name}: Order #{result['order_number']} | {result['items']} items | "
+                      f"{result['seconds']:.2f}s → {os.path.basename(output_file)}", flush=True)
+            else:
+                self.failed += 1
+                print(f"✗ {name}: {result['error']}", flush=True)
+
+        if broken and self.executor._broken and not self._stopping:
+            self._replace_executor()
+
+    def _open_watcher(self):
+        if not self.poll:
+            try:
+                return InotifyWatcher(self.directory), 'inotify'
+            except OSError as e:
+                print(f"inotify unavailable ({e}); polling instead", flush=True)
+        return PollingWatcher(self.poll_interval), 'polling'
+
+    def stop(self, *_):
+        self._stopping = True
+
+    def run(self):
+        previous_handlers = {sig: signal.signal(sig, self.stop) for sig in (signal.SIGINT, signal.SIGTERM)}
+        watcher, mode = self._open_watcher()
+        print(f"Watching {os.path.abspath(self.directory)} for {self.pattern} ({mode}, "
+              f"{self.workers} worker(s), settle {self.settle:g}s)", flush=True)
+        try:
+            self.executor = ProcessPoolExecutor(max_workers=self.workers)
+            self._scan()
+            last_scan = time.monotonic()
+            while not self._stopping:
+                self._dispatch()
+                # Wake up often while files are settling or being condensed, and at
+                # least once a second so a stop request is noticed.
+                timeout = 0.25 if self.settling or self.running else 1.0
+                names = watcher.wait(timeout)
+
+                done = [future for future in self.running if future.done()]
+                self._collect(done)
+
+                if names is None or time.monotonic() - last_scan >= self.rescan_interval:
+                    self._scan()
+                    last_scan = time.monotonic()
+                else:
+                    for name in names:
+                        self._observe(name)
+
+            if self.running:
+                print(f"Finishing {len(self.running)} invoice(s) in progress...", flush=True)
+                self._collect(wait(list(self.running)).done)
+        finally:
+            if self.executor is not None:
+                self.executor.shutdown(wait=True)
+            watcher.close()
+            for sig, handler in previous_handlers.items():
+                signal.signal(sig, handler)
+
+        print(f"Stopped: {self.processed} processed, {self.skipped} already condensed, {self.failed} failed",
+              flush=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('directory', nargs='?', default='.', help='folder to watch (default: current)')
+    parser.add_argument('--pattern', default='*.pdf', help='glob for input files (default: *.pdf)')
+    parser.add_argument('--workers', type=int, default=None, help='worker processes (default: CPU count)')
+    parser.add_argument('--settle', type=float, default=2.0,
+                        help='seconds a file must stay unchanged before it is processed (default: 2)')
+    parser.add_argument('--poll', action='store_true', help='poll the folder instead of using inotify')
+    parser.add_argument('--poll-interval', type=float, default=2.0, help='seconds between polls (default: 2)')
+    parser.add_argument('--rescan-interval', type=float, default=300.0,
+                        help='seconds between full rescans when using inotify (default: 300)')
+    parser.add_argument('--manifest', default=None, help=f'manifest path (default: DIRECTORY/{MANIFEST_FILENAME})')
+    parser.add_argument('--text-engine', default=None, help='text extraction engine (default: LCBO_TEXT_ENGINE)')
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.directory):
+        parser.error(f"{args.directory} is not a directory")
+    try:
+        text_engines.resolve_engine(args.text_engine)
+    except ValueError as e:
+        parser.error(str(e))
+
+    FolderWatcher(
+        args.directory, args.pattern, workers=args.workers, settle=args.settle, text_engine=args.text_engine,
+        manifest_path=args.manifest, poll=args.poll, poll_interval=args.poll_interval,
+        rescan_interval=args.rescan_interval,
+    ).run()
+
+
+if __name__ == "__main__":
+    main()